@@ -0,0 +1,37 @@
+"""
+Measures what the middleware chain adds to every call of `TronEnergy.make_request`.
+
+The network is stubbed out, so the numbers are the per-call cost of the chain itself. A client without
+middleware should stay well under a microsecond above calling `_dispatch` directly; the script exits
+with status 1 when it does not. Run from the repository root:
+
+    python -m benchmarks.bench_middleware [--number 200000]
+"""
+import sys
+import timeit
+import argparse
+from tron_energy import TronEnergy
+
+
+def per_call(function, number:int):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main(number:int):
+    client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+    client._dispatch = lambda method, url, data=None, priority=None: None
+    direct = per_call(lambda: client._dispatch("GET", "/api/v1/frontend/index-data", None, None), number)
+    empty = per_call(lambda: client.make_request("GET", "/api/v1/frontend/index-data"), number)
+    client.use(lambda request, call_next: call_next(request))
+    one = per_call(lambda: client.make_request("GET", "/api/v1/frontend/index-data"), number)
+
+    print(f"direct _dispatch     {direct * 1e9:8.0f} ns")
+    print(f"empty chain          {empty * 1e9:8.0f} ns  (+{(empty - direct) * 1e9:.0f} ns)")
+    print(f"one no-op middleware {one * 1e9:8.0f} ns  (+{(one - direct) * 1e9:.0f} ns)")
+    return 0 if empty - direct < 1e-6 else 1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200000)
+    sys.exit(main(parser.parse_args().number))
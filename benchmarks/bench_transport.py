@@ -0,0 +1,81 @@
+"""
+Compares HTTP/1.1 and HTTP/2 for bursts of concurrent calls against local servers.
+
+Both servers answer every request after the same delay, so the difference is the cost of opening
+connections. Run from the repository root with httpx[http2] installed:
+
+    python -m benchmarks.bench_transport [--concurrency 200] [--rounds 5]
+"""
+import time
+import asyncio
+import argparse
+import statistics
+from aiohttp import web, TCPConnector
+from tron_energy import AsyncTronEnergy
+from tron_energy.transport import AiohttpTransport, AsyncHttpxTransport
+from tests.test_transport import H2Stub, DELAY
+
+
+async def serve_http1(peers:set):
+    async def index_data(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(DELAY)
+        return web.json_response({"balance": 1, "api_key": request.headers.get("API-KEY")})
+
+    app = web.Application()
+    app.router.add_get("/api/v1/frontend/index-data", index_data)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+
+async def burst(client:AsyncTronEnergy, concurrency:int):
+    start = time.perf_counter()
+    await asyncio.gather(*(client.get_public_data() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def measure(make_client, concurrency:int, rounds:int):
+    # Every round uses a fresh client, so HTTP/1.1 pays for its connections each time as a cold start would.
+    timings = []
+    for _ in range(rounds):
+        async with make_client() as fresh:
+            timings.append(await burst(fresh, concurrency))
+    return timings
+
+
+async def main(concurrency:int, rounds:int):
+    peers, stats = set(), {"connections": 0}
+    runner, http1_url = await serve_http1(peers)
+    h2_server = await asyncio.get_running_loop().create_server(lambda: H2Stub(stats), "127.0.0.1", 0)
+    h2_url = f"http://127.0.0.1:{h2_server.sockets[0].getsockname()[1]}/"
+
+    def http1():
+        return AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=http1_url,
+                               transport=AiohttpTransport(connector=TCPConnector(limit=0)))
+
+    def http2():
+        return AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=h2_url,
+                               transport=AsyncHttpxTransport(http1=False))
+
+    try:
+        http1_timings = await measure(http1, concurrency, rounds)
+        http2_timings = await measure(http2, concurrency, rounds)
+    finally:
+        await runner.cleanup()
+        h2_server.close()
+
+    print(f"{concurrency} concurrent calls, {rounds} rounds, server delay {DELAY * 1000:.0f} ms")
+    for name, timings, connections in (("HTTP/1.1", http1_timings, len(peers)), ("HTTP/2", http2_timings, stats["connections"])):
+        print(f"{name:9} median {statistics.median(timings) * 1000:7.1f} ms  best {min(timings) * 1000:7.1f} ms  "
+              f"{connections / rounds:.0f} connections per round")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.rounds))
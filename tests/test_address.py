@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+from tron_energy import address
+from tron_energy.address import is_valid_address, validate_address, check_addresses, b58decode_check
+
+
+class TestAddressValidation(unittest.TestCase):
+
+    def test_valid_address(self):
+        self.assertTrue(is_valid_address("TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"))
+        self.assertEqual(b58decode_check("TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t")[0], 0x41)
+
+    def test_invalid_addresses(self):
+        self.assertFalse(is_valid_address("TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6u"))  # Bad checksum
+        self.assertFalse(is_valid_address("TR7NHnXw5423f8j766h899234567890"))  # Wrong length
+        self.assertFalse(is_valid_address("TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj0t"))  # '0' is not base58
+        self.assertFalse(is_valid_address("1BvBMSEYstWetqTFn5Au4m4GFg7xJaNVN2"))  # Bitcoin address
+        self.assertFalse(is_valid_address(None))
+
+    def test_validate_address_raises(self):
+        with self.assertRaises(ValueError):
+            validate_address("TR7NHnXw5423f8j766h899234567890")
+
+    def test_check_addresses(self):
+        # Arrange
+        addresses = ["TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t", "invalid", "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"]
+
+        # Act
+        results = check_addresses(addresses)
+
+        # Assert
+        self.assertEqual(results, [True, False, True])
+
+    def test_cache_evicts_least_recently_used(self):
+        # Arrange
+        address._cache.clear()
+        first, second, third = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t", "TQn9Y2khEsLJW1ChVWFMSMeRDow5KcbLSE", "TLa2f6VPqDgRE67v1736s7bJ8Ray5wYjU7"
+
+        # Act
+        with patch.object(address, "CACHE_SIZE", 2):
+            is_valid_address(first)
+            is_valid_address(second)
+            is_valid_address(first)
+            is_valid_address("invalid1")
+            is_valid_address(third)
+
+        # Assert
+        self.assertEqual(list(address._cache), [first, third])
+
+    def test_remembered_addresses_are_trusted(self):
+        # Arrange
+        address._cache.clear()
+
+        # Act
+        with patch.object(address, "_decode_address") as decode:
+            address.remember_addresses(["TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"])
+            valid = is_valid_address("TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t")
+
+        # Assert
+        self.assertTrue(valid)
+        decode.assert_not_called()
+        self.assertEqual(address.known_addresses(), ["TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"])
+
+if __name__ == '__main__':
+    unittest.main()
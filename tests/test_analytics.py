@@ -0,0 +1,125 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+from tron_energy import analytics
+from tron_energy.analytics import OrderAnalytics
+
+MONDAY = 1696809600  # 2023-10-09T00:00:00Z
+
+
+def sample_store():
+    store = OrderAnalytics()
+    store.add({
+        "errno": 0,
+        "receive_address": "TExWKszFWYTKZH8LYiovAPKzS3L9MLZ4kw",
+        "order_no": "58b451473d290f92443eabf0322b9907",
+        "energy_amount": 32000,
+        "amount": 3800000,
+        "create_time": "2023-10-09T21:42:13.200565+08:00",
+        "period": 0,
+        "status": 30,
+    })
+    store.add({"errno": 0, "serial": "7297a8a2a9e39b86fc5bad0d2e9edda2", "amount": 3120000, "balance": 813900029257},
+              spec={"receive_address": "TR7NHnXw5423f8j766h899234567890", "energy_amount": 65000, "period": "3D"},
+              timestamp=MONDAY + 86400)
+    for i in range(10):
+        store.add({"receive_address": "TR7NHnXw5423f8j766h899234567890", "energy_amount": 65000, "amount": (i + 1) * 1000,
+                   "period": "1H"}, product="bandwidth" if i % 2 else None, timestamp=MONDAY + 7 * 86400 + i)
+    return store
+
+
+class TestOrderAnalytics(unittest.TestCase):
+
+    def test_report_by_address(self):
+        # Arrange
+        store = sample_store()
+
+        # Act
+        report = store.report(("address",))
+
+        # Assert
+        self.assertEqual(len(store), 12)
+        self.assertEqual(report[("TExWKszFWYTKZH8LYiovAPKzS3L9MLZ4kw",)], {"sum": 3800000, "count": 1})
+        self.assertEqual(report[("TR7NHnXw5423f8j766h899234567890",)], {"sum": 3120000 + 55000, "count": 11})
+
+    def test_report_by_period_product_and_week(self):
+        # Arrange
+        store = sample_store()
+
+        # Act
+        report = store.report(("period", "product"), bucket="1W", value="energy", percentiles=(50, 100))
+
+        # Assert
+        self.assertEqual(set(report), {("1H", "energy", MONDAY), ("3D", "energy", MONDAY),
+                                       ("1H", "energy", MONDAY + 7 * 86400), ("1H", "bandwidth", MONDAY + 7 * 86400)})
+        self.assertEqual(report[("1H", "bandwidth", MONDAY + 7 * 86400)], {"sum": 325000, "count": 5, "p50": 65000, "p100": 65000})
+
+    def test_percentiles_and_time_range(self):
+        # Arrange
+        store = sample_store()
+
+        # Act
+        report = store.report((), percentiles=(50, 90), since=MONDAY + 7 * 86400, until=MONDAY + 7 * 86400 + 10)
+
+        # Assert
+        self.assertEqual(report, {(): {"sum": 55000, "count": 10, "p50": 5000, "p90": 9000}})
+
+    def test_rejects_unknown_columns(self):
+        store = sample_store()
+        with self.assertRaises(ValueError):
+            store.report(("status",))
+        with self.assertRaises(ValueError):
+            store.report(value="balance")
+        with self.assertRaises(ValueError):
+            store.report(bucket="1M")
+
+    def test_save_and_memory_map(self):
+        # Arrange
+        store = sample_store()
+        with tempfile.TemporaryDirectory() as path:
+            store.save(path)
+
+            # Act
+            loaded = OrderAnalytics.load(path)
+            before = loaded.report(("address", "period"), bucket="1D", percentiles=(95,))
+            loaded.add({"receive_address": "TNew", "amount": 1, "period": "1H"}, timestamp=MONDAY)
+
+            # Assert
+            self.assertEqual(before, store.report(("address", "period"), bucket="1D", percentiles=(95,)))
+            self.assertEqual(len(loaded), 13)
+            self.assertEqual(loaded.report()[("TNew",)], {"sum": 1, "count": 1})
+
+    def test_save_over_mapped_files(self):
+        # Arrange
+        store = sample_store()
+        with tempfile.TemporaryDirectory() as path:
+            store.save(path)
+            loaded = OrderAnalytics.load(path)
+
+            # Act
+            loaded.save(path)
+            loaded.close()
+            with OrderAnalytics.load(path) as reloaded:
+                report = reloaded.report(("address", "period"))
+
+            # Assert
+            self.assertEqual(report, store.report(("address", "period")))
+            self.assertEqual(len(loaded), 0)
+
+    @unittest.skipUnless(analytics.np is not None, "numpy is not installed")
+    def test_numpy_matches_python(self):
+        # Arrange
+        store = sample_store()
+        args = (("address", "product"), "1D", "amount", (25, 50, 99))
+
+        # Act
+        vectorized = store.report(*args)
+        with patch.object(analytics, "np", None):
+            python = store.report(*args)
+
+        # Assert
+        self.assertEqual(vectorized, python)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import json
+import asyncio
 import unittest
 from unittest.mock import AsyncMock, patch
 from tron_energy import AsyncTronEnergy
@@ -25,7 +27,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertTrue(result)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.get')
+    @patch('tron_energy.transport.ClientSession.get')
     async def test_get_public_data(self, mock_get):
         # Arrange
         expected_response = {
@@ -44,7 +46,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -56,7 +58,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.get')
+    @patch('tron_energy.transport.ClientSession.get')
     async def test_get_wallet_balance(self, mock_get):
         # Arrange
         expected_response = {
@@ -75,7 +77,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -87,7 +89,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response['balance'])
 
-    @patch('tron_energy.async_tron_energy.ClientSession.get')
+    @patch('tron_energy.transport.ClientSession.get')
     async def test_get_platform_avail_energy(self, mock_get):
         # Arrange
         expected_response = {
@@ -106,7 +108,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -118,7 +120,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response['platform_avail_energy'])
 
-    @patch('tron_energy.async_tron_energy.ClientSession.post')
+    @patch('tron_energy.transport.ClientSession.post')
     async def test_place_order(self, mock_get):
         # Arrange
         expected_response = {
@@ -130,7 +132,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -148,7 +150,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.post')
+    @patch('tron_energy.transport.ClientSession.post')
     async def test_transfer_small_trx_amount(self, mock_get):
         # Arrange
         expected_response = {
@@ -160,7 +162,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -177,7 +179,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.post')
+    @patch('tron_energy.transport.ClientSession.post')
     async def test_purchase_by_number_of_transfers(self, mock_get):
         # Arrange
         expected_response = {
@@ -188,7 +190,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -205,7 +207,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.get')
+    @patch('tron_energy.transport.ClientSession.get')
     async def test_list_purchases_by_number_of_transfers(self, mock_get):
         # Arrange
         expected_response = {
@@ -238,7 +240,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -254,7 +256,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.post')
+    @patch('tron_energy.transport.ClientSession.post')
     async def test_create_smart_delegate(self, mock_get):
         # Arrange
         expected_response = {
@@ -267,7 +269,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -284,7 +286,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.get')
+    @patch('tron_energy.transport.ClientSession.get')
     async def test_list_smart_delegate(self, mock_get):
         # Arrange
         expected_response = {
@@ -318,7 +320,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -334,7 +336,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.post')
+    @patch('tron_energy.transport.ClientSession.post')
     async def test_modify_smart_delegate(self, mock_get):
         # Arrange
         expected_response = {
@@ -344,7 +346,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -361,7 +363,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.get')
+    @patch('tron_energy.transport.ClientSession.get')
     async def test_get_order(self, mock_get):
         # Arrange
         expected_response = {
@@ -391,7 +393,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -407,7 +409,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.post')
+    @patch('tron_energy.transport.ClientSession.post')
     async def test_recycle_order(self, mock_get):
         # Arrange
         expected_response = {
@@ -418,7 +420,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -434,7 +436,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.get')
+    @patch('tron_energy.transport.ClientSession.get')
     async def test_estimate_order(self, mock_get):
         # Arrange
         expected_response = {
@@ -448,7 +450,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -465,7 +467,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.async_tron_energy.ClientSession.get')
+    @patch('tron_energy.transport.ClientSession.get')
     async def test_get_api_usage_summary(self, mock_get):
         # Arrange
         expected_response = {
@@ -485,7 +487,7 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Mock the response object
         mock_response = AsyncMock()
         mock_response.status = 200
-        mock_response.json = AsyncMock(return_value=expected_response)
+        mock_response.read = AsyncMock(return_value=json.dumps(expected_response).encode())
 
         # Mock the context manager
         mock_get.return_value.__aenter__.return_value = mock_response
@@ -497,6 +499,49 @@ class TestTronEnergyMethods(unittest.IsolatedAsyncioTestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
+    async def test_session_rebuilt_after_fork(self):
+        # Arrange
+        parent_session = self.tron_energy.sess
+
+        # Act
+        with patch('tron_energy.async_tron_energy.os.getpid', return_value=-1):
+            child_session = self.tron_energy.sess
+            reused_session = self.tron_energy.sess
+
+        # Assert
+        self.assertIsNot(parent_session, child_session)
+        self.assertIs(reused_session, child_session)
+        await parent_session.close()
+
+    @patch('tron_energy.transport.ClientSession.post')
+    async def test_place_order_rejects_invalid_address(self, mock_post):
+        # Arrange
+        self.tron_energy.validate_addresses = True
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            await self.tron_energy.place_order(receive_address="TR7NHnXw5423f8j766h899234567890", energy_amount=65000)
+        mock_post.assert_not_called()
+
+
+class TestEventLoopSafety(unittest.TestCase):
+
+    def test_session_rebuilt_per_event_loop(self):
+        # Arrange
+        tron_energy = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+
+        async def get_session():
+            return tron_energy.sess
+
+        # Act
+        first_session = asyncio.run(get_session())
+        second_session = asyncio.run(get_session())
+        asyncio.run(tron_energy.close())
+
+        # Assert
+        self.assertIsNot(first_session, second_session)
+        self.assertIsNone(tron_energy.transport._session)
+
 
 if __name__ == '__main__':
     unittest.main()
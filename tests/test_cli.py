@@ -0,0 +1,181 @@
+import io
+import os
+import json
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch, AsyncMock
+from tron_energy import AsyncTronEnergy
+from tron_energy.cli import read_records, run_batch, resume_output, main
+
+
+class TestReadRecords(unittest.TestCase):
+
+    def test_formats(self):
+        csv_input = io.StringIO("receive_address,energy_amount,period\nTA,65000,\nTB,32000,3D\n")
+        jsonl_input = io.StringIO('{"order_no": "s1"}\n\n"s2"\n')
+        lines_input = io.StringIO("TA\n\n TB \n")
+
+        self.assertEqual(list(read_records(csv_input, "csv", "receive_address")),
+                         [{"receive_address": "TA", "energy_amount": "65000"},
+                          {"receive_address": "TB", "energy_amount": "32000", "period": "3D"}])
+        self.assertEqual(list(read_records(jsonl_input, "jsonl", "order_no")), [{"order_no": "s1"}, {"order_no": "s2"}])
+        self.assertEqual(list(read_records(lines_input, "lines", "receive_address")),
+                         [{"receive_address": "TA"}, {"receive_address": "TB"}])
+
+
+class TestRunBatch(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.tmp.name, "checkpoint.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_writes_outcomes_in_input_order(self):
+        # Arrange
+        client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+
+        async def dispatch(method, url, data=None, priority=None):
+            await asyncio.sleep(0.001 * (10 - len(data["receive_address"])))
+            if data["energy_amount"] < 0:
+                raise ValueError("bad amount")
+            return {"errno": 0, "serial": data["receive_address"]}
+
+        client._dispatch = dispatch
+        records = [{"receive_address": "T" * (i + 1), "energy_amount": "-1" if i == 3 else "65000", "note": "x"} for i in range(8)]
+        output = io.StringIO()
+
+        # Act
+        report = await run_batch(client, "place_order", records, output, concurrency=4, defaults={"period": "1D"},
+                                 converters={"energy_amount": int})
+
+        # Assert
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([line["index"] for line in lines], list(range(8)))
+        self.assertEqual(lines[0]["result"], {"errno": 0, "serial": "T"})
+        self.assertEqual(lines[3], dict(lines[3], ok=False, error="ValueError: bad amount"))
+        self.assertEqual((report.requests, report.errors), (8, 1))
+
+    async def test_resumes_from_checkpoint(self):
+        # Arrange
+        client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        client._dispatch = AsyncMock(return_value={"errno": 0})
+
+        def records(fail_at=None):
+            for i in range(10):
+                if i == fail_at:
+                    raise RuntimeError("interrupted")
+                yield {"order_no": f"s{i}"}
+
+        first, second = io.StringIO(), io.StringIO()
+
+        # Act
+        with self.assertRaises(RuntimeError):
+            await run_batch(client, "recycle_order", records(fail_at=6), first, concurrency=1, checkpoint=self.checkpoint)
+        await run_batch(client, "recycle_order", records(), second, concurrency=1, checkpoint=self.checkpoint)
+
+        # Assert
+        written = [json.loads(line)["index"] for line in (first.getvalue() + second.getvalue()).splitlines()]
+        self.assertEqual(written, list(range(10)))
+        self.assertEqual(client._dispatch.await_count, 10)
+
+    async def test_interrupted_run_keeps_finished_calls(self):
+        # Arrange
+        client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        placed = []
+
+        async def dispatch(method, url, data=None, priority=None):
+            placed.append(data["receive_address"])
+            if data["receive_address"] == "T0" and placed.count("T0") == 1:
+                await asyncio.sleep(10)
+            return {"errno": 0, "serial": data["receive_address"]}
+
+        client._dispatch = dispatch
+        records = [{"receive_address": f"T{i}", "energy_amount": 65000} for i in range(10)]
+        first, second = io.StringIO(), io.StringIO()
+
+        # Act
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(run_batch(client, "place_order", records, first, concurrency=10,
+                                             checkpoint=self.checkpoint), 0.2)
+        with open(self.checkpoint) as f:
+            interrupted = json.load(f)
+        await run_batch(client, "place_order", records, second, concurrency=10, checkpoint=self.checkpoint)
+
+        # Assert
+        self.assertEqual((interrupted["done"], sorted(map(int, interrupted["pending"]))), (0, list(range(1, 10))))
+        self.assertEqual(first.getvalue(), "")
+        self.assertEqual([json.loads(line)["index"] for line in second.getvalue().splitlines()], list(range(10)))
+        self.assertEqual(sorted(placed), sorted(["T0"] + [f"T{i}" for i in range(10)]))
+
+    async def test_resume_skips_records_already_in_the_output(self):
+        # Arrange
+        client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        client._dispatch = AsyncMock(return_value={"errno": 0})
+        target = os.path.join(self.tmp.name, "results.jsonl")
+        with open(target, "w") as f:
+            for i in range(4):
+                f.write(json.dumps({"index": i, "ok": True}) + "\n")
+            f.write('{"index": 4, "o')
+        with open(self.checkpoint, "w") as f:
+            json.dump({"done": 2}, f)
+
+        # Act
+        resume_output(target, self.checkpoint)
+        with open(target, "a") as output:
+            await run_batch(client, "recycle_order", ({"order_no": f"s{i}"} for i in range(6)), output,
+                            checkpoint=self.checkpoint)
+
+        # Assert
+        with open(target) as f:
+            written = [json.loads(line)["index"] for line in f]
+        self.assertEqual(written, list(range(6)))
+        self.assertEqual(client._dispatch.await_count, 2)
+
+    async def test_progress_only_on_a_terminal(self):
+        # Arrange
+        client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        client._dispatch = AsyncMock(return_value={"errno": 0})
+        log, terminal = io.StringIO(), io.StringIO()
+        terminal.isatty = lambda: True
+
+        # Act
+        await run_batch(client, "recycle_order", [{"order_no": "s1"}], io.StringIO(), progress=log)
+        await run_batch(client, "recycle_order", [{"order_no": "s1"}], io.StringIO(), progress=terminal)
+
+        # Assert
+        self.assertEqual(log.getvalue(), "")
+        self.assertIn("\r1 done, 0 failed", terminal.getvalue())
+
+
+class TestMain(unittest.TestCase):
+
+    def test_place_orders_from_csv(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "addresses.csv")
+            target = os.path.join(tmp, "results.jsonl")
+            with open(source, "w") as f:
+                f.write("receive_address\nTA\nTB\nTC\n")
+            dispatch = AsyncMock(return_value={"errno": 0, "serial": "s"})
+
+            # Act
+            with patch.dict(os.environ, {"TRON_ENERGY_API_KEY": "key", "TRON_ENERGY_API_SECRET": "secret"}), \
+                    patch.object(AsyncTronEnergy, "_dispatch", dispatch), patch("sys.stderr", io.StringIO()) as stderr:
+                status = main(["place-order", source, "-o", target, "--energy-amount", "65000", "--period", "1H",
+                               "--concurrency", "2"])
+
+            # Assert
+            with open(target) as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(status, 0)
+            self.assertEqual(len(lines), 3)
+            self.assertEqual(dispatch.await_args_list[0].args[2],
+                             {"receive_address": "TA", "energy_amount": 65000, "period": "1H"})
+            self.assertIn("3 calls, 0 failed", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from email.utils import formatdate
+from unittest.mock import patch
+from tron_energy import TronEnergy
+from tron_energy.clock import ClockOffset
+
+
+class TestClockOffset(unittest.TestCase):
+
+    def test_first_sample_sets_offset(self):
+        # Arrange
+        clock = ClockOffset()
+
+        # Act
+        clock.update(formatdate(1000.0 + 30, usegmt=True), sent=999.9, received=1000.1)
+
+        # Assert
+        self.assertAlmostEqual(clock.offset, 30.5)
+        self.assertEqual(clock.samples, 1)
+
+    def test_slow_samples_weigh_less(self):
+        # Arrange
+        clock = ClockOffset(alpha=0.5)
+        clock.update(formatdate(1000.0, usegmt=True), sent=999.95, received=1000.05)
+
+        # Act
+        clock.update(formatdate(2000.0 + 60, usegmt=True), sent=1999.0, received=2001.0)
+
+        # Assert
+        self.assertAlmostEqual(clock.offset, 0.5 + 0.5 * (0.1 / 2.0) * 60)
+
+    def test_invalid_date_is_ignored(self):
+        # Arrange
+        clock = ClockOffset()
+
+        # Act
+        clock.update("not a date", sent=0, received=1)
+        clock.observe(object(), sent=0, received=1)
+
+        # Assert
+        self.assertEqual((clock.offset, clock.samples), (0.0, 0))
+
+    @patch('tron_energy.transport.requests.Session.post')
+    def test_client_timestamp_uses_server_time(self, mock_post):
+        # Arrange
+        tron_energy = TronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        mock_post.return_value.headers = {"Date": formatdate(10_000_000.0, usegmt=True)}
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.content = b'{"errno": 0}'
+
+        # Act
+        with patch('tron_energy.tron_energy.time', return_value=10_000_100.0), \
+             patch('tron_energy.clock.time', return_value=10_000_100.0):
+            tron_energy.recycle_order("58b451473d290f92443eabf0322b9907")
+            timestamp = tron_energy._get_timestamp()
+
+        # Assert
+        self.assertAlmostEqual(tron_energy.clock_offset, -99.5)
+        self.assertEqual(timestamp, "10000000")
+
+
+if __name__ == '__main__':
+    unittest.main()
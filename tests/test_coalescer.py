@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+from tron_energy import AsyncTronEnergy, AsyncTronEnergyPool
+from tron_energy.coalescer import OrderCoalescer
+
+ADDRESS = "TR7NHnXw5423f8j766h899234567890"
+
+
+class TestOrderCoalescer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        self.client.place_order = AsyncMock(return_value={"errno": 0, "serial": "s1", "amount": 3120000})
+
+    async def test_merges_requests_within_the_window(self):
+        # Arrange
+        coalescer = OrderCoalescer(self.client, window=0.05)
+        loop = asyncio.get_running_loop()
+
+        # Act
+        with patch.object(loop, "call_later", wraps=loop.call_later) as call_later:
+            responses = await asyncio.gather(coalescer.place_order(ADDRESS, 32000), coalescer.place_order(ADDRESS, 33000),
+                                             coalescer.place_order(ADDRESS, 65000, period="1D"))
+
+        # Assert
+        self.assertEqual(responses[0], responses[1])
+        self.assertIsNot(responses[0], responses[1])
+        self.assertEqual(sorted(call.args for call in self.client.place_order.await_args_list),
+                         [(ADDRESS, 65000, "1D"), (ADDRESS, 65000, "1H")])
+        self.assertEqual(coalescer.stats, {"requests": 3, "orders": 2})
+        self.assertEqual([call.args[0] for call in call_later.call_args_list], [0.05, 0.05])
+
+    async def test_max_energy_sends_the_batch_early(self):
+        # Arrange
+        coalescer = OrderCoalescer(self.client, window=10, max_energy=100000)
+
+        # Act
+        first = asyncio.ensure_future(coalescer.place_order(ADDRESS, 65000))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(coalescer.place_order(ADDRESS, 65000))
+        await asyncio.wait_for(first, 1)
+        await coalescer.flush()
+        await second
+
+        # Assert
+        self.assertEqual([call.args for call in self.client.place_order.await_args_list],
+                         [(ADDRESS, 65000, "1H"), (ADDRESS, 65000, "1H")])
+
+    async def test_errors_reach_every_waiter(self):
+        # Arrange
+        self.client.place_order.side_effect = ValueError("insufficient balance")
+        coalescer = OrderCoalescer(self.client, window=0.01)
+
+        # Act
+        results = await asyncio.gather(coalescer.place_order(ADDRESS, 32000), coalescer.place_order(ADDRESS, 32000),
+                                       return_exceptions=True)
+
+        # Assert
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(self.client.place_order.await_count, 1)
+
+    async def test_identified_orders_are_not_merged(self):
+        # Arrange
+        coalescer = OrderCoalescer(self.client, window=10)
+
+        # Act
+        await coalescer.place_order(ADDRESS, 32000, out_trade_no="trade-1")
+
+        # Assert
+        self.client.place_order.assert_awaited_once_with(ADDRESS, 32000, "1H", "trade-1", None)
+
+    async def test_wraps_a_pool(self):
+        # Arrange
+        pool = AsyncTronEnergyPool([("key1", "secret1"), ("key2", "secret2")], validate_addresses=True)
+        pool.clients[0].place_order = pool.clients[1].place_order = self.client.place_order
+        coalescer = OrderCoalescer(pool, window=0.01)
+
+        # Act
+        response = await coalescer.place_order("TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t", 32000)
+
+        # Assert
+        self.assertEqual(response["serial"], "s1")
+        with self.assertRaises(ValueError):
+            await coalescer.place_order(ADDRESS, 32000)
+
+
+if __name__ == '__main__':
+    unittest.main()
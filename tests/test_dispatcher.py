@@ -0,0 +1,164 @@
+import os
+import json
+import asyncio
+import tempfile
+from time import sleep
+import unittest
+from tron_energy.dispatcher import OrderDispatcher, RateBudget, DispatchError
+
+
+class FakeTronEnergy:
+
+    def __init__(self, api_key=None, api_secret=None):
+        self.api_key = api_key
+
+    def place_order(self, receive_address, energy_amount, period='1H'):
+        if energy_amount < 0:
+            raise ValueError("invalid energy amount")
+        return {"errno": 0, "receive_address": receive_address, "pid": os.getpid()}
+
+
+class SlowFirstTronEnergy(FakeTronEnergy):
+
+    def place_order(self, receive_address, energy_amount, period='1H'):
+        if receive_address == "T0":
+            sleep(0.3)
+        return super().place_order(receive_address, energy_amount, period)
+
+
+class RejectingTronEnergy(FakeTronEnergy):
+
+    def place_order(self, receive_address, energy_amount, period='1H'):
+        raise ValueError("placed twice")
+
+
+class FakeAsyncTronEnergy(FakeTronEnergy):
+
+    async def place_order(self, receive_address, energy_amount, period='1H'):
+        return super().place_order(receive_address, energy_amount, period)
+
+
+class CountingAsyncTronEnergy(FakeTronEnergy):
+    """Reports the most orders in flight in its worker and appends to the file named by its key on close."""
+
+    in_flight = 0
+    peak = 0
+
+    async def place_order(self, receive_address, energy_amount, period='1H'):
+        cls = CountingAsyncTronEnergy
+        cls.in_flight += 1
+        cls.peak = max(cls.peak, cls.in_flight)
+        await asyncio.sleep(0.01)
+        cls.in_flight -= 1
+        return {"errno": 0, "receive_address": receive_address, "peak": cls.peak}
+
+    async def close(self):
+        with open(self.api_key, "a") as f:
+            f.write("closed\n")
+
+
+def make_specs(count):
+    return [{"receive_address": f"T{i}", "energy_amount": 65000} for i in range(count)]
+
+
+class TestRateBudget(unittest.TestCase):
+
+    def test_reserve_spaces_requests(self):
+        # Arrange
+        budget = RateBudget(rate=100, burst=2)
+
+        # Act
+        delays = [budget.reserve() for _ in range(4)]
+
+        # Assert
+        self.assertEqual(delays[:2], [0.0, 0.0])
+        self.assertAlmostEqual(delays[2], 0.01, delta=0.005)
+        self.assertAlmostEqual(delays[3], 0.02, delta=0.005)
+
+
+class TestOrderDispatcher(unittest.TestCase):
+
+    def test_results_in_spec_order(self):
+        # Arrange
+        specs = make_specs(50)
+        specs[7]["energy_amount"] = -1
+        dispatcher = OrderDispatcher('key', 'secret', processes=3, chunksize=4, client_class=FakeTronEnergy)
+
+        # Act
+        results = list(dispatcher.run(specs))
+
+        # Assert
+        self.assertEqual(len(results), 50)
+        self.assertIsInstance(results[7], DispatchError)
+        self.assertEqual(results[7].spec, specs[7])
+        addresses = [r["receive_address"] for i, r in enumerate(results) if i != 7]
+        self.assertEqual(addresses, [s["receive_address"] for i, s in enumerate(specs) if i != 7])
+
+    def test_async_workers(self):
+        # Arrange
+        dispatcher = OrderDispatcher('key', 'secret', processes=2, concurrency=4, rate=1000, burst=10,
+                                     client_class=FakeAsyncTronEnergy)
+
+        # Act
+        results = list(dispatcher.run(make_specs(20)))
+
+        # Assert
+        self.assertEqual([r["receive_address"] for r in results], [f"T{i}" for i in range(20)])
+
+    def test_async_workers_keep_concurrency_in_flight_and_close_clients(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Arrange
+            closed = os.path.join(tmp, "closed")
+            dispatcher = OrderDispatcher(closed, 'secret', processes=2, concurrency=8, chunksize=2,
+                                         client_class=CountingAsyncTronEnergy)
+
+            # Act
+            results = list(dispatcher.run(make_specs(32)))
+
+            # Assert
+            self.assertEqual(dispatcher.chunksize, 8)
+            self.assertEqual(max(r["peak"] for r in results), 8)
+            with open(closed) as f:
+                self.assertEqual(f.read(), "closed\n" * 2)
+
+    def test_resume_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Arrange
+            checkpoint = os.path.join(tmp, "job.json")
+            dispatcher = OrderDispatcher('key', 'secret', processes=2, chunksize=5, checkpoint=checkpoint,
+                                         client_class=FakeTronEnergy)
+            run = dispatcher.run(make_specs(30))
+            first = [next(run) for _ in range(12)]
+            run.close()
+
+            # Act
+            rest = list(dispatcher.run(make_specs(30)))
+
+            # Assert
+            self.assertEqual(len(first) + len(rest), 30)
+            self.assertEqual(rest[0]["receive_address"], "T12")
+            with open(checkpoint) as f:
+                self.assertEqual(json.load(f), {"done": 30})
+
+    def test_chunks_finished_out_of_order_are_not_placed_again(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Arrange
+            checkpoint = os.path.join(tmp, "job.json")
+            run = OrderDispatcher('key', 'secret', processes=2, chunksize=5, checkpoint=checkpoint,
+                                  client_class=SlowFirstTronEnergy).run(make_specs(30))
+            first = next(run)
+            run.close()
+
+            # Act
+            rest = list(OrderDispatcher('key', 'secret', processes=2, chunksize=5, checkpoint=checkpoint,
+                                        client_class=RejectingTronEnergy).run(make_specs(30)))
+
+            # Assert
+            self.assertEqual(first["receive_address"], "T0")
+            self.assertEqual([r["receive_address"] for r in rest], [f"T{i}" for i in range(1, 30)])
+            with open(checkpoint) as f:
+                self.assertEqual(json.load(f), {"done": 30})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import gc
+import socket
+import asyncio
+import unittest
+from time import monotonic
+from aiohttp import web
+from tron_energy import TronEnergy, AsyncTronEnergy
+from tron_energy.endpoints import EndpointSelector
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def unused_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/"
+
+
+class TestEndpointSelector(unittest.TestCase):
+
+    def test_prefers_fast_healthy_endpoints(self):
+        # Arrange
+        clock = FakeClock()
+        selector = EndpointSelector(["https://a/", "https://b/"], max_failures=2, probe_interval=5, clock=clock)
+
+        # Act
+        selector.observe("https://a/", 0.2)
+        selector.observe("https://b/", 0.05)
+        fastest = selector.choose()
+        selector.observe("https://b/", 1.0, failed=True)
+        selector.observe("https://b/", 1.0, failed=True)
+        after_failures = selector.choose()
+
+        # Assert
+        self.assertEqual(fastest, "https://b/")
+        self.assertEqual(after_failures, "https://a/")
+        self.assertFalse(selector.stats()["https://b/"]["healthy"])
+        self.assertEqual(selector.choose(exclude=["https://a/"]), "https://b/")
+
+    def test_probes_bring_endpoints_back(self):
+        # Arrange
+        clock = FakeClock()
+        selector = EndpointSelector(["https://a/", "https://b/"], max_failures=1, probe_interval=5, clock=clock)
+        selector.observe("https://b/", 0.5)
+        selector.observe("https://a/", 0.1, failed=True)
+
+        # Act
+        early = selector.due_probes()
+        clock.now = 5
+        due = selector.due_probes()
+        again = selector.due_probes()
+        selector.probed("https://a/", 0.01, failed=False)
+
+        # Assert
+        self.assertEqual((early, due, again), ([], ["https://a/"], []))
+        self.assertTrue(selector.stats()["https://a/"]["healthy"])
+        self.assertEqual(selector.choose(), "https://a/")
+
+
+class TestMultiEndpointClients(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.runners = []
+        self.fast = await self.serve("fast", 0.0)
+        self.slow = await self.serve("slow", 0.03)
+        self.dead = unused_url()
+
+    async def asyncTearDown(self):
+        for runner in self.runners:
+            await runner.cleanup()
+
+    async def serve(self, name:str, delay:float):
+        async def index_data(request):
+            await asyncio.sleep(delay)
+            return web.json_response({"balance": 1, "server": name})
+
+        app = web.Application()
+        app.router.add_get("/api/v1/frontend/index-data", index_data)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self.runners.append(runner)
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+    async def test_async_client_fails_over_and_settles_on_fastest(self):
+        # Arrange
+        client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret',
+                                 base_url=[self.dead, self.slow, self.fast])
+        # A collector pause during the first sample of the fast server would rank it behind the slow one.
+        gc.disable()
+        self.addCleanup(gc.enable)
+
+        # Act
+        async with client:
+            first = await client.get_public_data()
+            for _ in range(5):
+                await client.get_public_data()
+            start = monotonic()
+            settled = [await client.get_public_data() for _ in range(10)]
+            elapsed = (monotonic() - start) / 10
+
+        # Assert
+        self.assertEqual(first["balance"], 1)
+        self.assertFalse(client.endpoints.stats()[self.dead]["healthy"])
+        self.assertEqual({response["server"] for response in settled}, {"fast"})
+        self.assertLess(elapsed, 0.03)
+
+    async def test_sync_client_fails_over(self):
+        # Arrange
+        client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=[self.dead, self.fast])
+        loop = asyncio.get_running_loop()
+
+        # Act
+        responses = [await loop.run_in_executor(None, client.get_public_data) for _ in range(4)]
+        client.close()
+
+        # Assert
+        self.assertEqual([response["server"] for response in responses], ["fast"] * 4)
+        self.assertGreater(client.endpoints.stats()[self.dead]["errors"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
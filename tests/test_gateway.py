@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import hmac
+import unittest
+from aiohttp import web
+from tron_energy import AsyncTronEnergy
+from tron_energy.gateway import Gateway, GatewayClient, AsyncGatewayClient
+
+
+class FakeItrx:
+    """A local stand-in for the itrx API that verifies signatures."""
+
+    def __init__(self):
+        self.calls = []
+
+    @property
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/api/v1/frontend/index-data", self.index_data)
+        app.router.add_get("/api/v1/frontend/order/price", self.price)
+        app.router.add_get("/api/v1/frontend/auto-delegate-policy", self.policies)
+        app.router.add_post("/api/v1/frontend/order", self.order)
+        return app
+
+    async def index_data(self, request):
+        self.calls.append(request.path)
+        await asyncio.sleep(0.01)
+        return web.json_response({"balance": 813892429257, "platform_avail_energy": 603249})
+
+    async def price(self, request):
+        self.calls.append(request.path)
+        await asyncio.sleep(0.05)
+        return web.json_response({"energy_amount": int(request.query["energy_amount"]), "price": 100})
+
+    async def policies(self, request):
+        self.calls.append(request.path)
+        return web.json_response({"count": 0, "next": f"https://itrx.io{request.path}?page=2", "results": []})
+
+    async def order(self, request):
+        self.calls.append(request.path)
+        body = await request.text()
+        expected = hmac.new(b"your_api_secret", f"{request.headers['TIMESTAMP']}&{body}".encode(), hashlib.sha256).hexdigest()
+        if request.headers.get("SIGNATURE") != expected:
+            return web.json_response({"errno": 1, "detail": "bad signature"}, status=400)
+        if request.headers.get("API-KEY") != "your_api_key":
+            return web.json_response({"errno": 2, "detail": "bad key"}, status=400)
+        return web.json_response({"errno": 0, "serial": "7297a8a2a9e39b86fc5bad0d2e9edda2"})
+
+
+async def serve(app):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+class TestGateway(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.itrx = FakeItrx()
+        self.itrx_runner, itrx_port = await serve(self.itrx.app)
+        self.upstream = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        self.upstream.base_url = f"http://127.0.0.1:{itrx_port}/"
+        self.gateway = Gateway(self.upstream)
+        port = await self.gateway.start("127.0.0.1", 0)
+        self.gateway_url = f"http://127.0.0.1:{port}/"
+        self.client = AsyncGatewayClient(self.gateway_url)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.gateway.stop()
+        await self.upstream.close()
+        await self.itrx_runner.cleanup()
+
+    async def test_public_data_is_cached(self):
+        # Act
+        first = await self.client.get_public_data()
+        second = await self.client.get_wallet_balance()
+
+        # Assert
+        self.assertEqual(first["balance"], second)
+        self.assertEqual(self.itrx.calls, ["/api/v1/frontend/index-data"])
+        self.assertEqual(self.gateway.stats["cache_hits"], 1)
+
+    async def test_concurrent_reads_are_coalesced(self):
+        # Arrange
+        self.gateway.cache_ttl = {}
+
+        # Act
+        responses = await asyncio.gather(*(self.client.estimate_order(energy_amount=65000) for _ in range(10)))
+
+        # Assert
+        self.assertEqual({r["energy_amount"] for r in responses}, {65000})
+        self.assertEqual(self.itrx.calls, ["/api/v1/frontend/order/price"])
+        self.assertEqual(self.gateway.stats["coalesced"], 9)
+
+    async def test_orders_are_signed_by_the_gateway(self):
+        # Act
+        response = await self.client.place_order(receive_address="TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t", energy_amount=65000)
+
+        # Assert
+        self.assertEqual(response["errno"], 0)
+        self.assertNotIn("SIGNATURE", self.client.sess.headers)
+        self.assertNotIn("API-KEY", self.client.sess.headers)
+
+    async def test_pagination_links_point_at_the_gateway(self):
+        # Act
+        response = await self.client.list_smart_delegate()
+
+        # Assert
+        self.assertEqual(response["next"], "/api/v1/frontend/auto-delegate-policy?page=2")
+
+    async def test_sync_gateway_client(self):
+        # Arrange
+        client = GatewayClient(self.gateway_url)
+
+        # Act
+        response = await asyncio.get_running_loop().run_in_executor(None, client.get_public_data)
+        client.close()
+
+        # Assert
+        self.assertEqual(response["platform_avail_energy"], 603249)
+        self.assertNotIn("API-KEY", client.sess.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
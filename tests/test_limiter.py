@@ -0,0 +1,151 @@
+import os
+import asyncio
+import tempfile
+import unittest
+import requests
+from unittest.mock import AsyncMock, Mock
+from aiohttp import ClientResponseError, ClientConnectionError
+from tron_energy.core import HTTPStatusError
+from tron_energy.limiter import AdaptiveLimit, is_overload
+from tron_energy.outbox import OrderOutbox
+from tron_energy.scheduler import PriorityScheduler, AsyncPriorityScheduler
+from tron_energy.transport import RequestsHTTPStatusError
+
+
+class TestIsOverload(unittest.TestCase):
+
+    def test_classifies_errors(self):
+        response = Mock(status_code=503)
+        self.assertTrue(is_overload(requests.exceptions.HTTPError(response=response)))
+        self.assertTrue(is_overload(ClientResponseError(Mock(), (), status=429)))
+        self.assertTrue(is_overload(requests.exceptions.ConnectionError()))
+        self.assertTrue(is_overload(ClientConnectionError()))
+        self.assertTrue(is_overload(asyncio.TimeoutError()))
+        self.assertFalse(is_overload(ClientResponseError(Mock(), (), status=400)))
+        self.assertTrue(is_overload(HTTPStatusError(503, "unavailable")))
+        self.assertFalse(is_overload(RequestsHTTPStatusError(400, {"detail": "insufficient balance"})))
+        self.assertFalse(is_overload(ValueError("bad address")))
+
+
+class TestAdaptiveLimit(unittest.TestCase):
+
+    def test_grows_while_latency_is_stable(self):
+        # Arrange
+        limit = AdaptiveLimit(initial=10, max_limit=100)
+
+        # Act
+        for _ in range(50):
+            limit.update(0.1, in_flight=limit.limit)
+
+        # Assert
+        self.assertGreater(limit.limit, 10)
+        self.assertLessEqual(limit.limit, 100)
+
+    def test_does_not_grow_when_idle(self):
+        # Arrange
+        limit = AdaptiveLimit(initial=10)
+
+        # Act
+        for _ in range(50):
+            limit.update(0.1, in_flight=1)
+
+        # Assert
+        self.assertEqual(limit.limit, 10)
+
+    def test_shrinks_when_latency_inflates(self):
+        # Arrange
+        limit = AdaptiveLimit(initial=50)
+        limit.update(0.1, in_flight=50)
+
+        # Act
+        for _ in range(30):
+            limit.update(0.5, in_flight=50)
+
+        # Assert
+        self.assertLess(limit.limit, 50)
+
+    def test_backs_off_on_overload(self):
+        # Arrange
+        limit = AdaptiveLimit(initial=20, min_limit=2, backoff=0.5)
+
+        # Act
+        limit.update(0.1, error=True)
+        after_one = limit.limit
+        for _ in range(10):
+            limit.update(0.1, error=True)
+
+        # Assert
+        self.assertEqual(after_one, 10)
+        self.assertEqual(limit.limit, 2)
+
+
+class TestAdaptiveScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def test_scheduler_follows_limit(self):
+        # Arrange
+        limit = AdaptiveLimit(initial=4, backoff=0.5)
+        scheduler = PriorityScheduler(limit)
+
+        # Act
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            with scheduler.slot("GET", "/api/v1/frontend/index-data"):
+                raise requests.exceptions.ConnectionError()
+
+        # Assert
+        stats = scheduler.stats()
+        self.assertEqual(stats["slots"], 2)
+        self.assertEqual(stats["active"], 0)
+        self.assertIn("queue_time", stats)
+
+    async def test_async_scheduler_limits_in_flight(self):
+        # Arrange
+        scheduler = AsyncPriorityScheduler(AdaptiveLimit(initial=3, max_limit=3))
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with scheduler.slot("GET", "/api/v1/frontend/index-data"):
+                peak = max(peak, scheduler.active)
+                await asyncio.sleep(0.001)
+
+        # Act
+        await asyncio.gather(*(request() for _ in range(20)))
+
+        # Assert
+        self.assertEqual(peak, 3)
+        self.assertEqual(scheduler.stats()["active"], 0)
+
+    async def test_outbox_drain_accepts_adaptive_limit(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp:
+            with OrderOutbox(os.path.join(tmp, "outbox.log")) as outbox:
+                for i in range(10):
+                    outbox.enqueue({"receive_address": f"T{i}", "energy_amount": 65000})
+                client = Mock(place_order=AsyncMock(return_value={"errno": 0}))
+
+                # Act
+                outcomes = await outbox.drain(client, concurrency=AdaptiveLimit(initial=2, max_limit=4))
+
+                # Assert
+                self.assertEqual(len(outcomes), 10)
+                self.assertEqual(len(outbox.pending), 0)
+
+    async def test_drain_errors_reach_adaptive_limit(self):
+        # Arrange
+        limit = AdaptiveLimit(initial=50, max_limit=100)
+        with tempfile.TemporaryDirectory() as tmp:
+            with OrderOutbox(os.path.join(tmp, "outbox.log")) as outbox:
+                for i in range(40):
+                    outbox.enqueue({"receive_address": f"T{i}", "energy_amount": 65000})
+                client = Mock(place_order=AsyncMock(side_effect=ClientResponseError(Mock(), (), status=503)))
+
+                # Act
+                outcomes = await outbox.drain(client, concurrency=limit)
+
+        # Assert
+        self.assertEqual(len(outcomes), 40)
+        self.assertLess(limit.limit, 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from unittest.mock import patch, AsyncMock, Mock
+from tron_energy import TronEnergy, AsyncTronEnergy
+from tron_energy.middleware import Interceptor, Request, compose
+
+
+class Recorder(Interceptor):
+
+    def __init__(self):
+        self.events = []
+
+    def before(self, request):
+        self.events.append(("before", request.url))
+
+    def after(self, request, response):
+        self.events.append(("after", response))
+        return dict(response, seen=True)
+
+    def failed(self, request, error):
+        self.events.append(("failed", str(error)))
+
+
+class TestCompose(unittest.TestCase):
+
+    def test_runs_outermost_first(self):
+        # Arrange
+        calls = []
+
+        def outer(request, call_next):
+            calls.append("outer")
+            request.data = dict(request.data, outer=1)
+            return call_next(request)
+
+        def inner(request, call_next):
+            calls.append("inner")
+            return call_next(request)
+
+        chain = compose([outer, inner], lambda request: request.data)
+
+        # Act
+        response = chain(Request("GET", "/api/v1/frontend/index-data", {"a": 1}))
+
+        # Assert
+        self.assertEqual(calls, ["outer", "inner"])
+        self.assertEqual(response, {"a": 1, "outer": 1})
+
+    def test_rejects_non_callables(self):
+        with self.assertRaises(ValueError):
+            compose([42], lambda request: None)
+
+
+class TestTronEnergyMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        self.tron_energy = TronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+
+    def test_middleware_can_short_circuit(self):
+        # Arrange
+        cache = {"/api/v1/frontend/index-data": {"balance": 1}}
+
+        def cached(request, call_next):
+            if request.url in cache:
+                return cache[request.url]
+            return call_next(request)
+
+        self.tron_energy.use(cached)
+        self.tron_energy._dispatch = Mock()
+
+        # Act
+        response = self.tron_energy.get_public_data()
+
+        # Assert
+        self.assertEqual(response, {"balance": 1})
+        self.tron_energy._dispatch.assert_not_called()
+
+    @patch('tron_energy.transport.requests.Session.get')
+    def test_interceptor_sees_responses_and_errors(self, mock_get):
+        # Arrange
+        recorder = Recorder()
+        tron_energy = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', middleware=[recorder])
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.headers = {}
+        mock_get.return_value.content = b'{"balance": 1}'
+
+        # Act
+        response = tron_energy.get_public_data()
+        mock_get.side_effect = ConnectionError("down")
+        with self.assertRaises(ConnectionError):
+            tron_energy.get_public_data()
+
+        # Assert
+        self.assertEqual(response, {"balance": 1, "seen": True})
+        self.assertEqual(recorder.events, [("before", "/api/v1/frontend/index-data"), ("after", {"balance": 1}),
+                                           ("before", "/api/v1/frontend/index-data"), ("failed", "down")])
+
+    def test_empty_chain_dispatches_directly(self):
+        # The per-call cost of the chain is timed by benchmarks/bench_middleware.py.
+        # Arrange
+        self.tron_energy._dispatch = Mock(return_value={"balance": 1})
+
+        # Act
+        response = self.tron_energy.make_request("GET", "/api/v1/frontend/index-data")
+
+        # Assert
+        self.assertIsNone(self.tron_energy._pipeline)
+        self.assertEqual(response, {"balance": 1})
+        self.tron_energy._dispatch.assert_called_once_with("GET", "/api/v1/frontend/index-data", None, None)
+
+
+class TestAsyncTronEnergyMiddleware(unittest.IsolatedAsyncioTestCase):
+
+    async def test_async_middleware_and_interceptor(self):
+        # Arrange
+        recorder = Recorder()
+        priorities = []
+
+        async def tag(request, call_next):
+            priorities.append(request.priority)
+            request.priority = "critical"
+            return await call_next(request)
+
+        tron_energy = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret', middleware=[tag, recorder])
+        tron_energy._dispatch = AsyncMock(return_value={"errno": 0})
+
+        # Act
+        response = await tron_energy.recycle_order("58b451473d290f92443eabf0322b9907")
+
+        # Assert
+        self.assertEqual(response, {"errno": 0, "seen": True})
+        self.assertEqual(priorities, [None])
+        self.assertEqual(tron_energy._dispatch.await_args.args,
+                         ("POST", "/api/v1/frontend/order/reclaim", {"serial": "58b451473d290f92443eabf0322b9907"}, "critical"))
+        self.assertEqual(recorder.events[0], ("before", "/api/v1/frontend/order/reclaim"))
+
+
+if __name__ == '__main__':
+    unittest.main()
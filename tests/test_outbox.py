@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from time import perf_counter
+from unittest.mock import AsyncMock, Mock
+from tron_energy.outbox import OrderOutbox
+
+
+class TestOrderOutbox(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "outbox.log")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_pending_entries_survive_restart(self):
+        # Arrange
+        with OrderOutbox(self.path) as outbox:
+            first = outbox.enqueue({"receive_address": "TA", "energy_amount": 65000})
+            second = outbox.enqueue({"receive_address": "TB", "energy_amount": 65000}, sync=True)
+            outbox.ack(first)
+
+        # Act
+        with OrderOutbox(self.path) as outbox:
+            pending = dict(outbox.pending)
+            third = outbox.enqueue({"receive_address": "TC", "energy_amount": 65000})
+
+        # Assert
+        self.assertEqual(list(pending), [second])
+        self.assertEqual(third, second + 1)
+
+    def test_torn_last_line_is_ignored(self):
+        # Arrange
+        with OrderOutbox(self.path) as outbox:
+            entry_id = outbox.enqueue({"receive_address": "TA", "energy_amount": 65000})
+        with open(self.path, "a") as f:
+            f.write('{"id":2,"spec":{"rec')
+
+        # Act
+        with OrderOutbox(self.path) as outbox:
+            pending = list(outbox.pending)
+            next_id = outbox.enqueue({"receive_address": "TB", "energy_amount": 65000})
+        with OrderOutbox(self.path) as outbox:
+            reopened = dict(outbox.pending)
+
+        # Assert
+        self.assertEqual(pending, [entry_id])
+        self.assertEqual(next_id, entry_id + 1)
+        self.assertEqual(list(reopened), [entry_id, next_id])
+        self.assertEqual(reopened[next_id]["receive_address"], "TB")
+
+    def test_enqueue_does_not_wait_for_fsync(self):
+        # Arrange
+        with OrderOutbox(self.path, flush_interval=0.05) as outbox:
+            start = perf_counter()
+
+            # Act
+            for i in range(1000):
+                outbox.enqueue({"receive_address": f"T{i}", "energy_amount": 65000})
+            elapsed = perf_counter() - start
+
+        # Assert
+        self.assertLess(elapsed / 1000, 0.001)
+        with open(self.path) as f:
+            self.assertEqual(len(f.readlines()), 1000)
+
+    async def test_drain_acknowledges_successes(self):
+        # Arrange
+        client = Mock()
+        client.place_order = AsyncMock(side_effect=[{"errno": 0}, Exception("rejected"), {"errno": 0}])
+        outbox = OrderOutbox(self.path)
+        ids = [outbox.enqueue({"receive_address": f"T{i}", "energy_amount": 65000}) for i in range(3)]
+
+        # Act
+        outcomes = await outbox.drain(client, concurrency=1, batch_size=2)
+        outbox.close()
+        with OrderOutbox(self.path) as reopened:
+            pending = list(reopened.pending)
+
+        # Assert
+        self.assertEqual(client.place_order.await_count, 3)
+        self.assertIsInstance(outcomes[ids[1]], Exception)
+        self.assertEqual(pending, [ids[1]])
+
+    def test_drain_sync_and_compact(self):
+        # Arrange
+        client = Mock()
+        client.place_order.return_value = {"errno": 0}
+        outbox = OrderOutbox(self.path)
+        for i in range(10):
+            outbox.enqueue({"receive_address": f"T{i}", "energy_amount": 65000})
+
+        # Act
+        outcomes = outbox.drain_sync(client, concurrency=4)
+        outbox.compact()
+        outbox.close()
+
+        # Assert
+        self.assertEqual(len(outcomes), 10)
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+import unittest
+from tron_energy.pool import AsyncTronEnergyPool
+
+CREDENTIALS = [("key1", "secret1"), ("key2", "secret2"), ("key3", "secret3")]
+
+
+def mock_dispatch(pool, balances=None, delay=0):
+    calls = []
+    for index, client in enumerate(pool.clients):
+        async def dispatch(method, url, data=None, priority=None, index=index):
+            calls.append((index, method, url))
+            await asyncio.sleep(delay)
+            if url.endswith("index-data"):
+                return {"balance": balances[index]}
+            if url.endswith("/order"):
+                return {"errno": 0, "serial": f"s-{data['receive_address']}", "balance": 100}
+            return {"errno": 0}
+        client._dispatch = dispatch
+    return calls
+
+
+class TestAsyncTronEnergyPool(unittest.IsolatedAsyncioTestCase):
+
+    async def test_least_loaded_spreads_concurrent_calls(self):
+        # Arrange
+        pool = AsyncTronEnergyPool(CREDENTIALS)
+        calls = mock_dispatch(pool, delay=0.01)
+
+        # Act
+        await asyncio.gather(*(pool.estimate_order(65000) for _ in range(6)))
+
+        # Assert
+        self.assertEqual(sorted(index for index, _, _ in calls), [0, 0, 1, 1, 2, 2])
+        self.assertEqual([account["in_flight"] for account in pool.stats()], [0, 0, 0])
+
+    async def test_sticky_routes_an_address_to_one_account(self):
+        # Arrange
+        pool = AsyncTronEnergyPool(CREDENTIALS, policy="sticky")
+        calls = mock_dispatch(pool)
+
+        # Act
+        for _ in range(3):
+            await pool.place_order("TR7NHnXw5423f8j766h899234567890", 65000)
+            await pool.purchase_by_number_of_transfers(times=5, receive_address="TR7NHnXw5423f8j766h899234567890")
+
+        # Assert
+        self.assertEqual(len({index for index, _, _ in calls}), 1)
+
+    async def test_balance_prefers_richest_account(self):
+        # Arrange
+        pool = AsyncTronEnergyPool(CREDENTIALS, policy="balance")
+        calls = mock_dispatch(pool, balances=[10, 500, 20])
+
+        # Act
+        await pool.place_order("TA", 65000)
+        await pool.place_order("TB", 65000)
+
+        # Assert
+        orders = [index for index, method, _ in calls if method == "POST"]
+        self.assertEqual(orders, [1, 1])
+        self.assertEqual([account["balance"] for account in pool.stats()], [10, 100, 20])
+
+    async def test_order_lookups_go_to_the_placing_account(self):
+        # Arrange
+        pool = AsyncTronEnergyPool(CREDENTIALS)
+        calls = mock_dispatch(pool)
+        order = await pool.place_order("TA", 65000)
+
+        # Act
+        await pool.get_order(order["serial"])
+        await pool.recycle_order(order_no=order["serial"])
+
+        # Assert
+        self.assertEqual(len({index for index, _, _ in calls}), 1)
+
+    async def test_sticky_spreads_addresses_evenly(self):
+        # Arrange
+        pool = AsyncTronEnergyPool(CREDENTIALS, policy="sticky")
+
+        # Act
+        owners = [pool._sticky(f"TAddress{i}").index for i in range(3000)]
+
+        # Assert
+        for index in range(len(CREDENTIALS)):
+            self.assertGreater(owners.count(index), 800)
+
+    async def test_unknown_order_is_looked_up_on_every_account(self):
+        # Arrange
+        pool = AsyncTronEnergyPool(CREDENTIALS)
+        calls = []
+        for index, client in enumerate(pool.clients):
+            async def dispatch(method, url, data=None, priority=None, index=index):
+                calls.append((index, method, url))
+                if index != 2:
+                    raise ValueError("order not found")
+                return {"errno": 0, "serial": data["serial"]}
+            client._dispatch = dispatch
+
+        # Act
+        order = await pool.get_order("s-unknown")
+        await pool.recycle_order("s-unknown")
+
+        # Assert
+        self.assertEqual(order["serial"], "s-unknown")
+        self.assertEqual([call for call in calls if call[1] == "POST"], [(2, "POST", "/api/v1/frontend/order/reclaim")])
+        self.assertEqual(len([call for call in calls if call[1] == "GET"]), 3)
+
+    async def test_lists_fan_out_and_policies_keep_their_account(self):
+        # Arrange
+        pool = AsyncTronEnergyPool(CREDENTIALS)
+        calls = []
+        for index, client in enumerate(pool.clients):
+            async def dispatch(method, url, data=None, priority=None, index=index):
+                calls.append((index, method, url))
+                if url.endswith("summary"):
+                    return {"today_count": 10 * (index + 1), "plan": "basic"}
+                if method == "GET":
+                    return {"count": 1, "next": None, "results": [{"id": 100 + index, "receive_address": f"T{index}"}]}
+                if url.endswith("auto-delegate-policy"):
+                    return {"errno": 0, "id": 200 + index}
+                return {"errno": 0}
+            client._dispatch = dispatch
+
+        # Act
+        policies = await pool.list_smart_delegate()
+        summary = await pool.get_api_usage_summary()
+        created = await pool.create_smart_delegate(1, "TA")
+        await pool.modify_smart_delegate(101, False)
+        await pool.modify_smart_delegate(created["id"], False)
+
+        # Assert
+        self.assertEqual(policies["count"], 3)
+        self.assertEqual(sorted(record["id"] for record in policies["results"]), [100, 101, 102])
+        self.assertEqual(summary, {"today_count": 60, "plan": "basic"})
+        changes = [(index, url) for index, method, url in calls if url.endswith("change-status")]
+        self.assertEqual(changes, [(1, "/api/v1/frontend/auto-delegate-policy/101/change-status"),
+                                   (created["id"] - 200, f"/api/v1/frontend/auto-delegate-policy/{created['id']}/change-status")])
+
+    async def test_per_account_rate_budget(self):
+        # Arrange
+        pool = AsyncTronEnergyPool([{"api_key": "key1", "api_secret": "secret1", "rate": 1000},
+                                    {"api_key": "key2", "api_secret": "secret2"}])
+        mock_dispatch(pool)
+
+        # Act
+        response = await pool.clients[0].recycle_order("58b451473d290f92443eabf0322b9907")
+
+        # Assert
+        self.assertEqual(response, {"errno": 0})
+        self.assertEqual(len(pool.clients[0].middleware), 1)
+        self.assertEqual(pool.clients[1].middleware, [])
+
+    async def test_same_surface_as_client(self):
+        # Arrange
+        pool = AsyncTronEnergyPool(CREDENTIALS)
+        signature = pool.clients[1]._sign("1700000000&")
+
+        # Act / Assert
+        self.assertTrue(pool.verify_signature(signature, "1700000000", {}))
+        with self.assertRaises(AttributeError):
+            pool.not_a_method
+        with self.assertRaises(TypeError):
+            await pool.place_order()
+        with self.assertRaises(ValueError):
+            AsyncTronEnergyPool(CREDENTIALS, policy="random")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import math
+import unittest
+from unittest.mock import AsyncMock
+from tron_energy import AsyncTronEnergy
+from tron_energy.preorder import DemandModel, PreorderScheduler, HOUR, DAY
+
+ADDRESS = "TR7NHnXw5423f8j766h899234567890"
+OTHER = "TQn9Y2khEsLJW1ChVWFMSMeRDow5KcbLSE"
+MIDNIGHT = 1700006400.0  # 2023-11-15 00:00 UTC
+
+
+class FakeClock:
+
+    def __init__(self, now:float):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestDemandModel(unittest.TestCase):
+
+    def test_recent_rate_decays(self):
+        # Arrange
+        model = DemandModel(halflife=HOUR, profile_halflife=7 * DAY)
+        model.record(ADDRESS, 65000, MIDNIGHT)
+
+        # Act
+        rate = model.rate(ADDRESS, MIDNIGHT + HOUR)
+
+        # Assert
+        self.assertAlmostEqual(rate, 65000 * math.log(2) / HOUR / 2)
+
+    def test_daily_profile_predicts_the_same_hour(self):
+        # Arrange
+        model = DemandModel()
+        for day in range(5):
+            model.record(ADDRESS, 260000, MIDNIGHT + day * DAY + 9 * HOUR)
+
+        # Act
+        morning = model.expected(ADDRESS, MIDNIGHT + 5 * DAY + 9 * HOUR, MIDNIGHT + 5 * DAY + 10 * HOUR)
+        night = model.expected(ADDRESS, MIDNIGHT + 5 * DAY + 2 * HOUR, MIDNIGHT + 5 * DAY + 3 * HOUR)
+
+        # Assert
+        self.assertAlmostEqual(morning, 260000, delta=30000)
+        self.assertLess(night, 1000)
+
+
+class TestPreorderScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(MIDNIGHT)
+        self.client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        self.client.place_order = AsyncMock(return_value={"errno": 0, "serial": "s1", "amount": 1000000})
+        self.client.estimate_order = AsyncMock(return_value={"total_price": 1000000})
+
+    async def learn_mornings(self, scheduler:PreorderScheduler, address:str, days:int=5, energy:int=65000):
+        for day in range(days):
+            for minute in (0, 10, 20, 30):
+                self.clock.now = MIDNIGHT + day * DAY + 9 * HOUR + minute * 60
+                await scheduler.place_order(address, energy)
+        self.client.place_order.reset_mock()
+
+    async def test_orders_shortly_before_the_daily_peak(self):
+        # Arrange
+        scheduler = PreorderScheduler(self.client, budget=5000000, lead_time=180, clock=self.clock)
+        await self.learn_mornings(scheduler, ADDRESS)
+
+        # Act
+        self.clock.now = MIDNIGHT + 5 * DAY + 8 * HOUR
+        early = await scheduler.tick()
+        self.clock.now = MIDNIGHT + 5 * DAY + 9 * HOUR - 170
+        placed = await scheduler.tick()
+        self.clock.now = MIDNIGHT + 5 * DAY + 9 * HOUR + 60
+        response = await scheduler.place_order(ADDRESS, 65000)
+        energy = self.client.place_order.await_args.args[1]
+        longer = await scheduler.place_order(ADDRESS, 65000, period="1D")
+
+        # Assert
+        self.assertEqual((early, placed), ([], [ADDRESS]))
+        self.assertGreater(energy, 200000)
+        self.assertEqual(self.client.place_order.await_count, 2)
+        self.assertEqual(self.client.place_order.await_args.args, (ADDRESS, 65000, "1D", None, None))
+        self.assertTrue(response["preordered"])
+        self.assertNotIn("preordered", longer)
+        self.assertEqual(scheduler.covered(ADDRESS), energy - 65000)
+
+    async def test_budget_goes_to_the_largest_demand(self):
+        # Arrange
+        scheduler = PreorderScheduler(self.client, budget=1500000, lead_time=180, clock=self.clock)
+        await self.learn_mornings(scheduler, OTHER, energy=32000)
+        await self.learn_mornings(scheduler, ADDRESS)
+
+        # Act
+        self.clock.now = MIDNIGHT + 5 * DAY + 9 * HOUR - 120
+        placed = await scheduler.tick()
+        self.clock.now += DAY
+        next_day = await scheduler.tick()
+
+        # Assert
+        self.assertEqual((placed, next_day), ([ADDRESS], [ADDRESS]))
+        self.assertEqual(scheduler.stats["over_budget"], 2)
+        self.assertEqual(scheduler.spent(), 1000000)
+
+    async def test_occasional_addresses_are_not_predicted(self):
+        # Arrange
+        scheduler = PreorderScheduler(self.client, budget=5000000, clock=self.clock)
+        await scheduler.place_order(ADDRESS, 65000)
+
+        # Act
+        placed = await scheduler.tick()
+
+        # Assert
+        self.assertEqual(placed, [])
+        self.assertEqual(scheduler.stats["misses"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch, AsyncMock, Mock
+from tron_energy import TronEnergy
+from tron_energy.quota import QuotaTracker, QuotaExceeded
+
+
+class TestQuotaTracker(unittest.TestCase):
+
+    def test_remaining_counts_local_calls(self):
+        # Arrange
+        tracker = QuotaTracker(quota=100)
+        tracker.update({"today_count": 40})
+
+        # Act
+        for _ in range(5):
+            tracker.acquire("POST", "/api/v1/frontend/order")
+
+        # Assert
+        self.assertEqual(tracker.remaining, 55)
+        tracker.update({"today_count": 46})
+        self.assertEqual(tracker.remaining, 54)
+
+    def test_sheds_low_priority_only(self):
+        # Arrange
+        tracker = QuotaTracker(quota=100, reserved=10)
+        tracker.update({"today_count": 90})
+
+        # Act / Assert
+        with self.assertRaises(QuotaExceeded):
+            tracker.acquire("GET", "/api/v1/frontend/order/price")
+        with self.assertRaises(QuotaExceeded):
+            tracker.acquire("GET", "https://itrx.io/api/v1/frontend/auto-delegate-policy?page=2")
+        tracker.acquire("POST", "/api/v1/frontend/order")
+        self.assertEqual(tracker.shed_count, 2)
+        self.assertEqual(tracker.remaining, 9)
+
+    def test_reserve_and_release(self):
+        # Arrange
+        tracker = QuotaTracker(quota=100)
+        tracker.update({"today_count": 50})
+
+        # Act
+        tracker.reserve(50)
+
+        # Assert
+        with self.assertRaises(QuotaExceeded):
+            tracker.acquire("GET", "/api/v1/frontend/index-data")
+        tracker.release(1)
+        tracker.acquire("GET", "/api/v1/frontend/index-data")
+
+    @patch('tron_energy.transport.requests.Session.get')
+    def test_client_consults_tracker(self, mock_get):
+        # Arrange
+        tracker = QuotaTracker(quota=100, reserved=10)
+        client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', quota_tracker=tracker)
+        mock_get.return_value = Mock(status_code=200, headers={}, content=b'{"today_count": 95}')
+
+        # Act
+        tracker.poll(client)
+
+        # Assert
+        with self.assertRaises(QuotaExceeded):
+            client.estimate_order(energy_amount=65000)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(tracker.remaining, 5)
+
+
+class TestAsyncQuotaTracker(unittest.IsolatedAsyncioTestCase):
+
+    async def test_async_poll(self):
+        # Arrange
+        tracker = QuotaTracker(quota=100)
+        client = Mock()
+        client.get_api_usage_summary = AsyncMock(return_value={"today_count": 12})
+
+        # Act
+        await tracker.async_poll(client)
+
+        # Assert
+        self.assertEqual(tracker.remaining, 88)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock
+from tron_energy.reconciler import SmartDelegateReconciler, DelegatePolicy, Change
+
+
+def make_policy(id, address, status=1, period=3, max_energy=65000):
+    return {"id": id, "receive_address": address, "status": status, "period": period, "max_energy": max_energy}
+
+
+class TestSmartDelegateReconciler(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        async def iter_smart_delegate():
+            for policy in (make_policy(1, "TA"), make_policy(2, "TB", status=0), make_policy(3, "TC")):
+                yield policy
+
+        self.client = Mock()
+        self.client.iter_smart_delegate = iter_smart_delegate
+        self.client.create_smart_delegate = AsyncMock(return_value={"errno": 0})
+        self.client.modify_smart_delegate = AsyncMock(return_value={"errno": 0})
+        self.desired = [
+            DelegatePolicy("TA", 3, 65000, True),
+            {"receive_address": "TB", "period": 3, "max_energy": 65000, "enabled": True},
+            DelegatePolicy("TC", 7, 65000, True),
+            DelegatePolicy("TD", 1),
+        ]
+
+    async def test_plan_contains_only_required_changes(self):
+        # Arrange
+        reconciler = SmartDelegateReconciler(self.client)
+
+        # Act
+        changes = await reconciler.plan(self.desired)
+
+        # Assert
+        self.assertEqual(changes, [
+            Change("enable", "TB", {"id": 2, "status": True}),
+            Change("create", "TC", {"period": 7, "receive_address": "TC", "max_energy": 65000}),
+            Change("create", "TD", {"period": 1, "receive_address": "TD"}),
+        ])
+
+    async def test_plan_ignores_max_energy_none(self):
+        # Arrange
+        reconciler = SmartDelegateReconciler(self.client)
+
+        # Act
+        changes = await reconciler.plan([DelegatePolicy("TA", 3, None, True), DelegatePolicy("TC", 3, None, True)])
+
+        # Assert
+        self.assertEqual(changes, [])
+
+    async def test_apply_creates_before_enabling(self):
+        # Arrange
+        calls = []
+
+        async def create_smart_delegate(**params):
+            calls.append("create start")
+            await asyncio.sleep(0.01)
+            calls.append("create end")
+            return {"errno": 0}
+
+        async def modify_smart_delegate(**params):
+            calls.append("enable")
+            return {"errno": 0}
+
+        self.client.create_smart_delegate = create_smart_delegate
+        self.client.modify_smart_delegate = modify_smart_delegate
+        reconciler = SmartDelegateReconciler(self.client, concurrency=2)
+
+        # Act
+        results = await reconciler.apply([DelegatePolicy("TB", 7, 65000, True)])
+
+        # Assert
+        self.assertEqual([change.action for change, _ in results], ["create", "enable"])
+        self.assertEqual(calls, ["create start", "create end", "enable"])
+
+    async def test_dry_run_sends_nothing(self):
+        # Arrange
+        reconciler = SmartDelegateReconciler(self.client, disable_missing=True)
+
+        # Act
+        results = await reconciler.apply([DelegatePolicy("TA", 3, 65000, False)], dry_run=True)
+
+        # Assert
+        self.assertEqual([change.action for change, _ in results], ["disable", "disable"])
+        self.client.modify_smart_delegate.assert_not_awaited()
+
+    async def test_apply(self):
+        # Arrange
+        self.client.create_smart_delegate.side_effect = [{"errno": 0}, Exception("not activated")]
+        reconciler = SmartDelegateReconciler(self.client, concurrency=2)
+
+        # Act
+        results = await reconciler.apply(self.desired)
+
+        # Assert
+        self.client.modify_smart_delegate.assert_awaited_once_with(id=2, status=True)
+        self.assertEqual(self.client.create_smart_delegate.await_count, 2)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(sum(isinstance(result, Exception) for _, result in results), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
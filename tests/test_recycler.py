@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import AsyncMock, Mock
+from tron_energy.recycler import RecycleScheduler, TimerWheel, period_seconds
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def test_expiry_across_rounds(self):
+        # Arrange
+        wheel = TimerWheel(tick=1.0, slots=8)
+        wheel.schedule("a", 3)
+        wheel.schedule("b", 11)  # Same slot as "a", one round later
+        wheel.schedule("c", 5)
+        wheel.cancel("c")
+
+        # Act
+        first = wheel.advance(4)
+        second = wheel.advance(10)
+        third = wheel.advance(100)
+
+        # Assert
+        self.assertEqual((first, second, third), (["a"], [], ["b"]))
+        self.assertEqual(len(wheel), 0)
+
+    def test_period_seconds(self):
+        self.assertEqual(period_seconds('1H'), 3600)
+        self.assertEqual(period_seconds('3D'), 3 * 86400)
+        self.assertEqual(period_seconds(0), 3600)
+
+
+class TestRecycleScheduler(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.client = Mock()
+        self.client.recycle_order = AsyncMock(return_value={"errno": 0, "message": "request accept"})
+
+    async def test_recycles_before_expiry(self):
+        # Arrange
+        scheduler = RecycleScheduler(self.client, expiry_margin=60, clock=self.clock)
+        scheduler.track({"serial": "s1"}, period='1H')
+
+        # Act
+        self.clock.now += 3600 - 61
+        early = await scheduler.recycle_due()
+        self.clock.now += 1
+        late = await scheduler.recycle_due()
+
+        # Assert
+        self.assertEqual(early, {})
+        self.assertEqual(list(late), ["s1"])
+        self.assertEqual(len(scheduler), 0)
+
+    async def test_idle_touch_and_release(self):
+        # Arrange
+        scheduler = RecycleScheduler(self.client, idle_after=30, batch_size=2, clock=self.clock)
+        for serial in ("s1", "s2", "s3"):
+            scheduler.track({"serial": serial}, period='1D')
+
+        # Act
+        self.clock.now += 20
+        scheduler.touch("s1")
+        scheduler.release("s3")
+        released = await scheduler.recycle_due()
+        self.clock.now += 15
+        idle = await scheduler.recycle_due()
+
+        # Assert
+        self.assertEqual(list(released), ["s3"])
+        self.assertEqual(list(idle), ["s2"])
+        self.assertEqual(len(scheduler), 1)
+        self.client.recycle_order.assert_awaited_with("s2")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, Mock
+from tron_energy import TronEnergy
+from tron_energy.replay import TrafficRecorder, load_records, replay, replay_sync, percentile, REDACTED
+
+
+class TestRecordReplay(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "traffic.jsonl.gz")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_record_async_client(self):
+        # Arrange
+        client = Mock()
+        client.make_request = AsyncMock(side_effect=[{"errno": 0, "serial": "s1"}, Exception("bad request")])
+        with TrafficRecorder(self.path) as recorder:
+            recorder.attach(client)
+
+            # Act
+            await client.make_request("POST", "/api/v1/frontend/order", {"receive_address": "TA", "callback_url": "https://x/?token=1"})
+            with self.assertRaises(Exception):
+                await client.make_request("GET", "/api/v1/frontend/order/query", {"serial": "s1"})
+
+        # Assert
+        records = list(load_records(self.path))
+        self.assertEqual(records[0]["d"]["callback_url"], REDACTED)
+        self.assertEqual(records[0]["r"], {"errno": 0, "serial": "s1"})
+        self.assertEqual(records[1]["e"], "Exception: bad request")
+        self.assertLessEqual(records[0]["t"], records[1]["t"])
+
+    def test_record_sync_client(self):
+        # Arrange
+        client = Mock()
+        client.make_request.return_value = {"balance": 1}
+        with TrafficRecorder(self.path) as recorder:
+            recorder.attach(client)
+
+            # Act
+            response = client.make_request("GET", "/api/v1/frontend/index-data")
+
+        # Assert
+        self.assertEqual(response, {"balance": 1})
+        self.assertEqual(list(load_records(self.path))[0]["u"], "/api/v1/frontend/index-data")
+
+    def test_recorded_client_keeps_priority(self):
+        # Arrange
+        client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        client._dispatch = Mock(return_value={"balance": 1})
+        with TrafficRecorder(self.path) as recorder:
+            recorder.attach(client)
+
+            # Act
+            response = client.make_request("GET", "/api/v1/frontend/index-data", priority="critical")
+
+        # Assert
+        self.assertEqual(response, {"balance": 1})
+        client._dispatch.assert_called_once_with("GET", "/api/v1/frontend/index-data", None, "critical")
+
+    def write_recording(self):
+        client = Mock()
+        client.make_request.return_value = {"errno": 0}
+        with TrafficRecorder(self.path) as recorder:
+            recorder.attach(client)
+            for i in range(20):
+                client.make_request("GET", "/api/v1/frontend/order/query", {"serial": str(i)})
+
+    async def test_replay(self):
+        # Arrange
+        self.write_recording()
+        client = Mock()
+        client.make_request = AsyncMock(side_effect=[Exception("down")] + [{"errno": 0}] * 19)
+
+        # Act
+        report = await replay(client, self.path, speed=100)
+
+        # Assert
+        self.assertEqual(report.requests, 20)
+        self.assertEqual(report.errors, 1)
+        self.assertEqual(client.make_request.await_args_list[5].args, ("GET", "/api/v1/frontend/order/query", {"serial": "5"}))
+        self.assertEqual(set(report.summary()), {"requests", "errors", "duration", "throughput", "p50", "p90", "p99"})
+
+    def test_replay_sync(self):
+        # Arrange
+        self.write_recording()
+        client = Mock()
+
+        # Act
+        report = replay_sync(client, self.path, speed=100, concurrency=4)
+
+        # Assert
+        self.assertEqual(report.requests, 20)
+        self.assertEqual(client.make_request.call_count, 20)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([], 50), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
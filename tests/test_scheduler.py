@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch, AsyncMock, Mock
+from tron_energy import TronEnergy, AsyncTronEnergy
+from tron_energy.scheduler import PriorityScheduler, AsyncPriorityScheduler, request_priority, classify
+
+
+class TestClassify(unittest.TestCase):
+
+    def test_default_classes(self):
+        self.assertEqual(classify("POST", "/api/v1/frontend/order"), "critical")
+        self.assertEqual(classify("GET", "/api/v1/frontend/order/query"), "default")
+        self.assertEqual(classify("GET", "/api/v1/frontend/auto-delegate-policy"), "background")
+
+
+class TestPriorityScheduler(unittest.TestCase):
+
+    def test_limits_requests_in_flight(self):
+        # Arrange
+        scheduler = PriorityScheduler(slots=2)
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def request():
+            with scheduler.slot("GET", "/api/v1/frontend/index-data"):
+                with lock:
+                    in_flight.append(1)
+                    peak.append(len(in_flight))
+                threading.Event().wait(0.01)
+                with lock:
+                    in_flight.pop()
+
+        # Act
+        threads = [threading.Thread(target=request) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(scheduler.stats()["active"], 0)
+
+    @patch('tron_energy.transport.requests.Session.get')
+    def test_client_uses_scheduler(self, mock_get):
+        # Arrange
+        scheduler = PriorityScheduler(slots=1, weights={"critical": 1, "default": 1, "background": 1, "bulk": 1})
+        tron_energy = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', scheduler=scheduler)
+        mock_get.return_value = Mock(status_code=200, headers={}, content=b'{"balance": 1}')
+
+        # Act
+        with request_priority("bulk"):
+            response = tron_energy.get_public_data()
+
+        # Assert
+        self.assertEqual(response, {"balance": 1})
+        with self.assertRaises(ValueError):
+            tron_energy.make_request("GET", "/api/v1/frontend/index-data", priority="unknown")
+
+
+class TestAsyncPriorityScheduler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_critical_requests_jump_the_queue(self):
+        # Arrange
+        scheduler = AsyncPriorityScheduler(slots=1)
+        served = []
+        gate = asyncio.Event()
+
+        async def request(name, method, url):
+            async with scheduler.slot(method, url):
+                served.append(name)
+                await gate.wait()
+
+        holder = asyncio.ensure_future(request("holder", "GET", "/api/v1/frontend/index-data"))
+        await asyncio.sleep(0)
+        tasks = [asyncio.ensure_future(request(f"scan{i}", "GET", "/api/v1/frontend/auto-delegate-policy")) for i in range(4)]
+        tasks += [asyncio.ensure_future(request(f"order{i}", "POST", "/api/v1/frontend/order")) for i in range(4)]
+        await asyncio.sleep(0)
+
+        # Act
+        gate.set()
+        await asyncio.gather(holder, *tasks)
+
+        # Assert
+        self.assertEqual(served[1:5], ["order0", "order1", "order2", "order3"])
+        self.assertEqual(scheduler.stats()["active"], 0)
+
+    async def test_cancelled_waiter_releases_nothing(self):
+        # Arrange
+        scheduler = AsyncPriorityScheduler(slots=1)
+        await scheduler.acquire("critical")
+        waiter = asyncio.ensure_future(scheduler.acquire("background"))
+        await asyncio.sleep(0)
+
+        # Act
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler._release()
+
+        # Assert
+        stats = scheduler.stats()
+        self.assertEqual(stats["active"], 0)
+        self.assertEqual(stats["queued"], {"critical": 0, "default": 0, "background": 0})
+
+    async def test_client_uses_scheduler(self):
+        # Arrange
+        scheduler = AsyncPriorityScheduler(slots=1)
+        tron_energy = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret', scheduler=scheduler)
+        tron_energy._send = AsyncMock(return_value={"errno": 0})
+
+        # Act
+        response = await tron_energy.recycle_order("58b451473d290f92443eabf0322b9907")
+
+        # Assert
+        self.assertEqual(response, {"errno": 0})
+        self.assertEqual(scheduler.stats()["active"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
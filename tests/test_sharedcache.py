@@ -0,0 +1,189 @@
+import os
+import time
+import asyncio
+import tempfile
+import unittest
+import multiprocessing
+from unittest.mock import AsyncMock, patch
+from tron_energy import TronEnergy, AsyncTronEnergy
+from tron_energy.sharedcache import SharedCache, shared_cache, async_shared_cache, _HEADER, _SEQUENCE, _STRIPES, _key_hash
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fill_from_worker(path:str, calls, barrier):
+    cache = SharedCache(path, slots=64, slot_size=256)
+
+    def fetch():
+        with calls.get_lock():
+            calls.value += 1
+        time.sleep(0.2)
+        return {"balance": 1}
+
+    barrier.wait()
+    assert cache.get_or_fetch("/api/v1/frontend/index-data", 5, fetch) == {"balance": 1}
+    cache.close()
+
+
+class TestSharedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.bin")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_entries_expire(self):
+        # Arrange
+        clock = FakeClock()
+        with SharedCache(self.path, slots=16, slot_size=128, clock=clock) as cache:
+            cache.set("price", {"price": 95}, ttl=2)
+
+            # Act
+            fresh = cache.get("price")
+            clock.now += 2
+            expired = cache.get("price")
+
+        # Assert
+        self.assertEqual((fresh, expired), ({"price": 95}, None))
+
+    def test_entries_are_visible_to_other_handles(self):
+        # Arrange
+        writer = SharedCache(self.path, slots=16, slot_size=128)
+        reader = SharedCache(self.path, slots=16, slot_size=128)
+
+        # Act
+        writer.set("key", [1, 2, 3], ttl=10)
+        value = reader.get("key")
+        writer.close()
+        reader.close()
+
+        # Assert
+        self.assertEqual(value, [1, 2, 3])
+
+    def test_size_is_bounded(self):
+        # Arrange
+        with SharedCache(self.path, slots=8, slot_size=64) as cache:
+            size = os.path.getsize(self.path)
+
+            # Act
+            for i in range(100):
+                cache.set(f"key-{i}", i, ttl=60)
+            stored_large = cache.set("large", "x" * 100, ttl=60)
+
+            # Assert
+            self.assertEqual(os.path.getsize(self.path), size)
+            self.assertEqual(cache.get("key-99"), 99)
+            self.assertGreater(cache.stats["evictions"], 0)
+            self.assertFalse(stored_large)
+
+    def test_write_after_a_dead_writer_is_not_read_torn(self):
+        # Arrange
+        with SharedCache(self.path, slots=1, slot_size=128) as cache:
+            cache.set("price", {"price": 95}, ttl=60)
+            _SEQUENCE.pack_into(cache._mm, _HEADER.size, _SEQUENCE.unpack_from(cache._mm, _HEADER.size)[0] + 1)
+
+            # Act
+            cache.set("price", {"price": 96}, ttl=60)
+            sequence = _SEQUENCE.unpack_from(cache._mm, _HEADER.size)[0]
+            value = cache.get("price")
+
+        # Assert
+        self.assertEqual(sequence % 2, 0)
+        self.assertEqual(value, {"price": 96})
+
+    def test_rejects_mismatched_geometry(self):
+        SharedCache(self.path, slots=8, slot_size=64).close()
+        with self.assertRaises(ValueError):
+            SharedCache(self.path, slots=16, slot_size=64)
+
+    def test_processes_make_one_upstream_call(self):
+        # Arrange
+        context = multiprocessing.get_context("spawn")
+        calls = context.Value("i", 0)
+        barrier = context.Barrier(4)
+        workers = [context.Process(target=fill_from_worker, args=(self.path, calls, barrier)) for _ in range(4)]
+
+        # Act
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+
+        # Assert
+        self.assertEqual([worker.exitcode for worker in workers], [0] * 4)
+        self.assertEqual(calls.value, 1)
+
+    def test_middleware_caches_read_endpoints(self):
+        # Arrange
+        cache = SharedCache(self.path, slots=16, slot_size=256)
+        client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', middleware=[shared_cache(cache)])
+
+        # Act
+        with patch.object(client, "_send", return_value={"balance": 1}) as send:
+            responses = [client.get_public_data() for _ in range(3)]
+            client.make_request("POST", "/api/v1/frontend/order", {"receive_address": "T"})
+        cache.close()
+
+        # Assert
+        self.assertEqual(responses, [{"balance": 1}] * 3)
+        self.assertEqual(send.call_count, 2)
+
+
+class TestAsyncSharedCache(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_misses_fetch_once(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SharedCache(os.path.join(tmp, "cache.bin"), slots=16, slot_size=256)
+            client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret',
+                                     middleware=[async_shared_cache(cache)])
+
+            async def send(method, url, data=None):
+                await asyncio.sleep(0.02)
+                return {"price": 95}
+
+            client._send = AsyncMock(side_effect=send)
+
+            # Act
+            responses = await asyncio.gather(*(client.estimate_order(65000) for _ in range(5)))
+            cache.close()
+
+        # Assert
+        self.assertEqual(responses, [{"price": 95}] * 5)
+        self.assertEqual(client._send.await_count, 1)
+
+    async def test_sync_fetch_during_async_fetch_of_the_same_stripe(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SharedCache(os.path.join(tmp, "cache.bin"), slots=16, slot_size=256)
+            stripe = _key_hash("a") % _STRIPES
+            other = next(f"b{i}" for i in range(10000) if _key_hash(f"b{i}") % _STRIPES == stripe)
+            release = asyncio.Event()
+
+            async def fetch():
+                await release.wait()
+                return {"key": "a"}
+
+            # Act
+            pending = asyncio.ensure_future(cache.async_get_or_fetch("a", 5, fetch))
+            await asyncio.sleep(0.01)
+            value = cache.get_or_fetch(other, 5, lambda: {"key": other})
+            release.set()
+            first = await pending
+            cache.close()
+
+        # Assert
+        self.assertEqual((first, value), ({"key": "a"}, {"key": other}))
+
+
+if __name__ == '__main__':
+    unittest.main()
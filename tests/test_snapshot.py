@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+from time import monotonic, time
+from unittest.mock import Mock, patch
+from tron_energy import TronEnergy, AsyncTronEnergy, AsyncTronEnergyPool
+from tron_energy import address
+from tron_energy.gateway import Gateway
+from tron_energy.recycler import RecycleScheduler
+from tron_energy.snapshot import save_snapshot, load_snapshot
+
+ADDRESS = "TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"
+
+
+class FakeClock:
+
+    def __init__(self, now:float):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "state.json.gz")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_client_round_trip(self):
+        # Arrange
+        client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', validate_addresses=True,
+                            base_url=["https://a.example/", "https://b.example/"])
+        client.clock.offset, client.clock.samples = 2.5, 10
+        client.endpoints.observe("https://b.example/", 0.05)
+        client._check_address(ADDRESS)
+        save_snapshot(self.path, client=client)
+        address._cache.clear()
+        fresh = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', validate_addresses=True,
+                           base_url=["https://a.example/", "https://b.example/"])
+
+        # Act
+        restored = load_snapshot(self.path, client=fresh, missing=Mock())
+
+        # Assert
+        self.assertEqual(restored, ["client"])
+        self.assertEqual(fresh.clock_offset, 2.5)
+        self.assertEqual(fresh.endpoints.stats()["https://b.example/"]["latency"], 0.05)
+        self.assertIn(ADDRESS, address.known_addresses())
+
+    def test_tampered_addresses_are_ignored(self):
+        # Arrange
+        client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', validate_addresses=True)
+        client._check_address(ADDRESS)
+        state = client.snapshot()
+        state["addresses"].append("TR7NHnXw5423f8j766h899234567890")
+        address._cache.clear()
+
+        # Act
+        client.restore(state)
+
+        # Assert
+        self.assertEqual(address.known_addresses(), [])
+
+    def test_stale_measurements_are_dropped(self):
+        # Arrange
+        client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        client.clock.offset, client.clock.samples = 2.5, 10
+        save_snapshot(self.path, client=client)
+        fresh = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+
+        # Act
+        with patch("tron_energy.snapshot.time", return_value=time() + 7 * 3600):
+            load_snapshot(self.path, client=fresh)
+
+        # Assert
+        self.assertEqual(fresh.clock_offset, 0.0)
+
+    def test_gateway_cache_keeps_unexpired_entries(self):
+        # Arrange
+        gateway = Gateway(Mock())
+        gateway._cache[("/api/v1/frontend/index-data", ())] = (monotonic() + 30, {"balance": 1})
+        gateway._cache[("/api/v1/frontend/order/price", (("energy_amount", "65000"),))] = (monotonic() - 1, {"price": 1})
+        save_snapshot(self.path, gateway=gateway)
+        fresh = Gateway(Mock())
+
+        # Act
+        load_snapshot(self.path, gateway=fresh)
+
+        # Assert
+        self.assertEqual([key for key in fresh._cache], [("/api/v1/frontend/index-data", ())])
+        expires, response = fresh._cache[("/api/v1/frontend/index-data", ())]
+        self.assertEqual(response, {"balance": 1})
+        self.assertAlmostEqual(expires - monotonic(), 30, delta=1)
+
+    def test_recycler_resumes_tracking(self):
+        # Arrange
+        scheduler = RecycleScheduler(Mock(), expiry_margin=60, clock=FakeClock(1000.0))
+        scheduler.track({"serial": "s1"}, period="1H")
+        scheduler._due.append("s0")
+        save_snapshot(self.path, recycler=scheduler)
+        clock = FakeClock(50.0)
+        fresh = RecycleScheduler(Mock(), expiry_margin=60, clock=clock)
+
+        # Act
+        load_snapshot(self.path, recycler=fresh)
+        clock.now += 3600 - 62
+        early = fresh.due()
+        clock.now += 2
+        due = fresh.due()
+
+        # Assert
+        self.assertEqual((early, due), ([], ["s1"]))
+        self.assertEqual(fresh._due, ["s0"])
+
+    def test_pool_restores_order_owners(self):
+        # Arrange
+        credentials = [("key1", "secret1"), ("key2", "secret2")]
+        pool = AsyncTronEnergyPool(credentials, policy="balance")
+        pool._track(pool._accounts[1], {"serial": "s1", "balance": 500})
+        save_snapshot(self.path, pool=pool)
+        fresh = AsyncTronEnergyPool(credentials, policy="balance")
+
+        # Act
+        load_snapshot(self.path, pool=fresh)
+
+        # Assert
+        self.assertIs(fresh._owners["s1"], fresh._accounts[1])
+        self.assertEqual([account["balance"] for account in fresh.stats()], [None, 500])
+
+    def test_missing_snapshot_restores_nothing(self):
+        self.assertEqual(load_snapshot(self.path, client=Mock()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import json
+import random
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch, MagicMock
+from aiohttp import web
+from tron_energy import TronEnergy, AsyncTronEnergy
+from tron_energy.core import HttpResponse
+from tron_energy.scheduler import PriorityScheduler, AsyncPriorityScheduler
+from tron_energy.streaming import RecordStream
+from tron_energy.transport import Transport
+
+
+def make_page(ids, next=None):
+    return {
+        "count": 5,
+        "code": 0,
+        "next": next,
+        "previous": None,
+        "results": [{"id": i, "receive_address": f"T{i}", "status": 1, "status_display": "启用"} for i in ids],
+    }
+
+
+class TestRecordStream(unittest.TestCase):
+
+    def test_arbitrary_chunk_boundaries(self):
+        # Arrange
+        page = make_page(range(200), next="https://itrx.io/api/v1/frontend/auto-delegate-policy?page=2")
+        body = json.dumps(page, indent=2, ensure_ascii=False).encode()
+        rng = random.Random(7)
+
+        for _ in range(20):
+            stream = RecordStream()
+            records = []
+            pos = 0
+
+            # Act
+            while pos < len(body):
+                size = rng.randint(1, 64)
+                records.extend(stream.feed(body[pos:pos + size]))
+                pos += size
+            records.extend(stream.close())
+
+            # Assert
+            self.assertEqual(records, page["results"])
+            self.assertEqual(stream.meta["next"], page["next"])
+            self.assertEqual(stream.meta["count"], 5)
+
+    def test_truncated_body(self):
+        stream = RecordStream()
+        stream.feed(b'{"count": 1, "results": [{"id": 1}')
+        with self.assertRaises(ValueError):
+            stream.close()
+
+
+class TestSyncStreaming(unittest.TestCase):
+
+    @patch('tron_energy.transport.requests.Session.get')
+    def test_iter_smart_delegate_follows_pages(self, mock_get):
+        # Arrange
+        pages = [
+            json.dumps(make_page([1, 2, 3], next="https://itrx.io/api/v1/frontend/auto-delegate-policy?page=2")).encode(),
+            json.dumps(make_page([4, 5])).encode(),
+        ]
+        responses = []
+        for body in pages:
+            response = MagicMock()
+            response.__enter__.return_value = response
+            response.status_code = 200
+            response.iter_content.side_effect = lambda size, body=body: (body[i:i + 7] for i in range(0, len(body), 7))
+            responses.append(response)
+        mock_get.side_effect = responses
+        tron_energy = TronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+
+        # Act
+        records = list(tron_energy.iter_smart_delegate())
+
+        # Assert
+        self.assertEqual([r["id"] for r in records], [1, 2, 3, 4, 5])
+        self.assertEqual(mock_get.call_args_list[1].args[0], "https://itrx.io/api/v1/frontend/auto-delegate-policy?page=2")
+        self.assertTrue(mock_get.call_args_list[0].kwargs["stream"])
+
+    def test_slot_is_released_before_records_are_yielded(self):
+        # Arrange
+        class PagedTransport(Transport):
+            def send(self, request):
+                page = make_page([4, 5]) if "page=2" in request.url else \
+                    make_page([1, 2, 3], next="https://itrx.io/api/v1/frontend/auto-delegate-policy?page=2")
+                return HttpResponse(200, {}, json.dumps(page).encode())
+
+        scheduler = PriorityScheduler(slots=1)
+        tron_energy = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', scheduler=scheduler,
+                                 transport=PagedTransport())
+
+        # Act
+        active = [scheduler.stats()["active"] for _ in tron_energy.iter_smart_delegate()]
+
+        # Assert
+        self.assertEqual(active, [0] * 5)
+
+    def test_records_are_yielded_as_they_arrive(self):
+        # Arrange
+        body = json.dumps(make_page(range(100))).encode()
+        received = []
+
+        class ChunkedTransport(Transport):
+            @contextmanager
+            def stream(self, request, chunk_size=65536):
+                def chunks():
+                    for i in range(0, len(body), 64):
+                        received.append(i)
+                        yield body[i:i + 64]
+                yield HttpResponse(200, {}, chunks())
+
+        tron_energy = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', transport=ChunkedTransport())
+
+        # Act
+        first = next(tron_energy.iter_smart_delegate())
+
+        # Assert
+        self.assertEqual(first["id"], 0)
+        self.assertLess(len(received) * 64, len(body) // 10)
+
+
+class TestAsyncStreaming(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        async def handler(request):
+            page = int(request.query.get("page", 1))
+            if page == 1:
+                body = make_page([1, 2, 3], next=str(request.url.with_query(page=2)))
+            else:
+                body = make_page([4, 5])
+            return web.json_response(body)
+
+        app = web.Application()
+        app.router.add_get("/api/v1/frontend/count-delegate-policy", handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.tron_energy = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        self.tron_energy.base_url = f"http://127.0.0.1:{port}/"
+
+    async def asyncTearDown(self):
+        await self.tron_energy.close()
+        await self.runner.cleanup()
+
+    async def test_iter_purchases_by_number_of_transfers(self):
+        # Act
+        records = [record async for record in self.tron_energy.iter_purchases_by_number_of_transfers()]
+
+        # Assert
+        self.assertEqual([r["id"] for r in records], [1, 2, 3, 4, 5])
+
+    async def test_slot_is_released_before_records_are_yielded(self):
+        # Arrange
+        scheduler = AsyncPriorityScheduler(slots=1)
+        self.tron_energy.scheduler = scheduler
+
+        # Act
+        active = [scheduler.stats()["active"] async for _ in self.tron_energy.iter_purchases_by_number_of_transfers()]
+
+        # Assert
+        self.assertEqual(active, [0] * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from unittest.mock import AsyncMock
+from tron_energy import AsyncTronEnergy, AsyncTronEnergyPool
+from tron_energy.topup import CountDelegateManager, TopUpRule, remaining_transfers
+
+ADDRESS = "TR7NHnXw5423f8j766h899234567890"
+OTHER = "TQn9Y2khEsLJW1ChVWFMSMeRDow5KcbLSE"
+NEW = "TNewAddressWithoutPolicy1234567890"
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCountDelegateManager(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.records = []
+        self.client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+        self.client.iter_purchases_by_number_of_transfers = self.iter_records
+        self.client.purchase_by_number_of_transfers = AsyncMock(return_value={"errno": 0})
+        self.scans = 0
+
+    def iter_records(self, receive_address=None):
+        self.scans += 1
+
+        async def records():
+            for record in self.records:
+                yield record
+        return records()
+
+    async def test_tops_up_addresses_below_threshold(self):
+        # Arrange
+        self.records = [
+            {"id": 1, "receive_address": ADDRESS, "remain_times": 3},
+            {"id": 2, "receive_address": ADDRESS, "remain_times": 4},
+            {"id": 3, "receive_address": OTHER, "times": 100, "used_times": 10},
+        ]
+        manager = CountDelegateManager(self.client, {ADDRESS: TopUpRule(10, 50), OTHER: 20, NEW: (5, 5)})
+
+        # Act
+        results = await manager.tick()
+
+        # Assert
+        self.assertEqual(manager.index, {ADDRESS: 7, OTHER: 90})
+        self.assertEqual(sorted(address for address, _ in results), sorted([ADDRESS, NEW]))
+        self.assertEqual(sorted(call.args for call in self.client.purchase_by_number_of_transfers.await_args_list),
+                         sorted([(50, ADDRESS), (5, NEW)]))
+        self.assertEqual(self.scans, 1)
+
+    async def test_pending_top_ups_are_not_repeated(self):
+        # Arrange
+        clock = FakeClock()
+        self.records = [{"id": 1, "receive_address": ADDRESS, "remain_times": 1}]
+        manager = CountDelegateManager(self.client, {ADDRESS: 10}, pending_timeout=300, clock=clock)
+
+        # Act
+        await manager.tick()
+        lagging = await manager.tick()
+        self.records = [{"id": 1, "receive_address": ADDRESS, "remain_times": 101}]
+        confirmed = await manager.tick()
+        self.records = [{"id": 1, "receive_address": ADDRESS, "remain_times": 2}]
+        used_up = await manager.tick()
+
+        # Assert
+        self.assertEqual((lagging, confirmed), ([], []))
+        self.assertEqual([address for address, _ in used_up], [ADDRESS])
+        self.assertEqual(self.client.purchase_by_number_of_transfers.await_count, 2)
+
+    async def test_failed_top_up_is_retried(self):
+        # Arrange
+        self.client.purchase_by_number_of_transfers.side_effect = [ValueError("insufficient balance"), {"errno": 0}]
+        manager = CountDelegateManager(self.client, {ADDRESS: 10})
+
+        # Act
+        first = await manager.tick()
+        second = await manager.tick()
+
+        # Assert
+        self.assertIsInstance(first[0][1], ValueError)
+        self.assertEqual(second, [(ADDRESS, {"errno": 0})])
+        self.assertEqual(manager.stats["errors"], 1)
+
+    async def test_unreadable_policies_are_not_topped_up(self):
+        # Arrange
+        self.records = [{"id": 1, "receive_address": ADDRESS, "status": 1}]
+        manager = CountDelegateManager(self.client, {ADDRESS: 10, NEW: 10})
+
+        # Act
+        results = await manager.tick()
+
+        # Assert
+        self.assertEqual(results, [(NEW, {"errno": 0})])
+        self.assertEqual(manager.unreadable, {ADDRESS})
+        self.assertEqual(manager.stats["unreadable"], 1)
+
+    def test_rejects_out_of_range_times(self):
+        with self.assertRaises(ValueError):
+            CountDelegateManager(self.client, {ADDRESS: TopUpRule(10, 2000)})
+
+    def test_accepts_a_pool_and_validates_addresses(self):
+        # Arrange
+        pool = AsyncTronEnergyPool([("key1", "secret1"), ("key2", "secret2")], validate_addresses=True)
+
+        # Act
+        manager = CountDelegateManager(pool, {"TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t": 10})
+
+        # Assert
+        self.assertEqual(list(manager.rules), ["TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t"])
+        with self.assertRaises(ValueError):
+            manager.set_rule(ADDRESS, 10)
+
+    def test_remaining_transfers(self):
+        self.assertEqual(remaining_transfers({"remaining_times": 5}), 5)
+        self.assertIsNone(remaining_transfers({"times": 5}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+import json
+import asyncio
+import unittest
+from unittest.mock import patch
+import requests
+from aiohttp import web, TCPConnector, ClientResponseError
+from tron_energy import TronEnergy, AsyncTronEnergy
+from tron_energy.core import HttpResponse, HTTPStatusError, build_request, parse_response, sign
+from tron_energy.transport import Transport, AiohttpTransport, RequestsTransport, HttpxTransport, AsyncHttpxTransport, httpx
+
+try:
+    import h2.config
+    import h2.events
+    import h2.connection
+except ImportError:
+    h2 = None
+
+CONCURRENCY = 200
+DELAY = 0.05
+
+
+class TestCore(unittest.TestCase):
+
+    def test_build_signed_post(self):
+        # Act
+        request = build_request("https://itrx.io/", "post", "/api/v1/frontend/order", {"b": 1, "a": 2}, "secret", "1700000000")
+
+        # Assert
+        self.assertEqual((request.method, request.url), ("POST", "https://itrx.io/api/v1/frontend/order"))
+        self.assertEqual(request.body, '{"a":2,"b":1}')
+        self.assertEqual(request.headers["SIGNATURE"], sign("secret", '1700000000&{"a":2,"b":1}'))
+
+    def test_build_get(self):
+        # Act
+        request = build_request("https://itrx.io/", "GET", "/api/v1/frontend/order/price", {"period": "1H"}, "secret", "1")
+
+        # Assert
+        self.assertEqual((request.params, request.body), ({"period": "1H"}, None))
+        self.assertNotIn("SIGNATURE", request.headers)
+
+    def test_parse_response(self):
+        self.assertEqual(parse_response(HttpResponse(200, {}, b'{"errno":0}')), {"errno": 0})
+        with self.assertRaises(HTTPStatusError) as raised:
+            parse_response(HttpResponse(429, {}, b'{"detail":"slow down"}'))
+        self.assertEqual((raised.exception.status, raised.exception.body), (429, {"detail": "slow down"}))
+
+    def test_stream_records_through_custom_transport(self):
+        # Arrange
+        class PagedTransport(Transport):
+            def __init__(self):
+                self.urls = []
+
+            def send(self, request):
+                self.urls.append(request.url)
+                if "page=2" in request.url:
+                    return HttpResponse(200, {}, b'{"next":null,"results":[{"id":3}]}')
+                return HttpResponse(200, {}, b'{"next":"https://itrx.io/api/v1/frontend/auto-delegate-policy?page=2",'
+                                             b'"results":[{"id":1},{"id":2}]}')
+
+        transport = PagedTransport()
+        client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', transport=transport)
+
+        # Act
+        records = list(client.iter_smart_delegate())
+
+        # Assert
+        self.assertEqual([record["id"] for record in records], [1, 2, 3])
+        self.assertEqual(len(transport.urls), 2)
+
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    def test_httpx_client_rebuilt_after_fork(self):
+        # Arrange
+        transport = HttpxTransport()
+        parent_client = transport.client
+
+        # Act
+        with patch('tron_energy.transport.os.getpid', return_value=-1):
+            child_client = transport.client
+            transport.close()
+
+        # Assert
+        self.assertIsNot(parent_client, child_client)
+        self.assertFalse(parent_client.is_closed)
+        parent_client.close()
+
+
+class H2Stub(asyncio.Protocol):
+    """A minimal HTTP/2 server answering every request after `DELAY` seconds."""
+
+    def __init__(self, stats:dict):
+        self.stats = stats
+        self.conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.requests = {}
+
+    def connection_made(self, transport):
+        self.stats["connections"] += 1
+        self.transport = transport
+        self.conn.local_settings.max_concurrent_streams = 1000
+        self.conn.initiate_connection()
+        transport.write(self.conn.data_to_send())
+
+    def data_received(self, data:bytes):
+        for event in self.conn.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                self.requests[event.stream_id] = dict(event.headers)
+            elif isinstance(event, h2.events.DataReceived):
+                self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+            elif isinstance(event, h2.events.StreamEnded):
+                headers = self.requests.pop(event.stream_id)
+                asyncio.get_running_loop().call_later(DELAY, self.respond, event.stream_id, headers)
+        self.transport.write(self.conn.data_to_send())
+
+    def respond(self, stream_id:int, headers:dict):
+        if self.transport.is_closing():
+            return
+        body = json.dumps({"balance": 1, "api_key": headers.get("api-key")}).encode()
+        self.conn.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json"),
+                                           ("content-length", str(len(body)))])
+        self.conn.send_data(stream_id, body, end_stream=True)
+        self.transport.write(self.conn.data_to_send())
+
+
+class TestTransports(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.stats = {"connections": 0}
+        self.peers = set()
+
+        async def index_data(request):
+            self.peers.add(request.transport.get_extra_info("peername"))
+            await asyncio.sleep(DELAY)
+            return web.json_response({"balance": 1, "api_key": request.headers.get("API-KEY")})
+
+        async def rejected(request):
+            return web.json_response({"detail": "insufficient balance"}, status=400)
+
+        app = web.Application()
+        app.router.add_get("/api/v1/frontend/index-data", index_data)
+        app.router.add_post("/api/v1/frontend/order", rejected)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.http1_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+        self.h2_server = None
+        if h2 is not None:
+            loop = asyncio.get_running_loop()
+            self.h2_server = await loop.create_server(lambda: H2Stub(self.stats), "127.0.0.1", 0)
+            self.h2_url = f"http://127.0.0.1:{self.h2_server.sockets[0].getsockname()[1]}/"
+
+    async def asyncTearDown(self):
+        await self.runner.cleanup()
+        if self.h2_server is not None:
+            self.h2_server.close()
+
+    async def test_aiohttp_transport(self):
+        # Arrange
+        client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=self.http1_url,
+                                 transport=AiohttpTransport())
+
+        # Act
+        async with client:
+            response = await client.get_public_data()
+
+        # Assert
+        self.assertEqual(response, {"balance": 1, "api_key": "your_api_key"})
+
+    async def test_requests_transport(self):
+        # Arrange
+        client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=self.http1_url,
+                            transport=RequestsTransport())
+        loop = asyncio.get_running_loop()
+
+        # Act
+        response = await loop.run_in_executor(None, client.get_public_data)
+        client.close()
+
+        # Assert
+        self.assertEqual(response, {"balance": 1, "api_key": "your_api_key"})
+
+    async def test_default_transports_raise_the_same_errors(self):
+        # Arrange
+        sync_client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=self.http1_url)
+        async_client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=self.http1_url)
+        loop = asyncio.get_running_loop()
+
+        # Act
+        with self.assertRaises(HTTPStatusError) as sync_raised:
+            await loop.run_in_executor(None, sync_client.place_order, "TA", 65000)
+        async with async_client:
+            with self.assertRaises(HTTPStatusError) as async_raised:
+                await async_client.place_order("TA", 65000)
+        sync_client.close()
+
+        # Assert
+        self.assertEqual((sync_raised.exception.status, sync_raised.exception.body), (400, {"detail": "insufficient balance"}))
+        self.assertEqual((async_raised.exception.status, async_raised.exception.body), (400, {"detail": "insufficient balance"}))
+        self.assertIsInstance(sync_raised.exception, requests.HTTPError)
+        self.assertIsInstance(async_raised.exception, ClientResponseError)
+        self.assertEqual(str(async_raised.exception), "400: {'detail': 'insufficient balance'}")
+
+    async def test_default_transports_raise_connection_error(self):
+        # Arrange
+        await self.runner.cleanup()
+        sync_client = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=self.http1_url)
+        async_client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=self.http1_url)
+        loop = asyncio.get_running_loop()
+
+        # Act
+        with self.assertRaises(ConnectionError):
+            await loop.run_in_executor(None, sync_client.get_public_data)
+        async with async_client:
+            with self.assertRaises(ConnectionError):
+                await async_client.get_public_data()
+        sync_client.close()
+
+    @unittest.skipIf(h2 is None or httpx is None, "httpx[http2] is not installed")
+    async def test_http2_multiplexes_concurrent_calls(self):
+        # Timings are compared by benchmarks/bench_transport.py; this test only checks the connections.
+        # Arrange
+        http1 = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=self.http1_url,
+                                transport=AiohttpTransport(connector=TCPConnector(limit=0)))
+        http2 = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret', base_url=self.h2_url,
+                                transport=AsyncHttpxTransport(http1=False))
+
+        # Act
+        async with http1:
+            http1_responses = await asyncio.gather(*(http1.get_public_data() for _ in range(CONCURRENCY)))
+        async with http2:
+            await http2.get_public_data()
+            http2_responses = await asyncio.gather(*(http2.get_public_data() for _ in range(CONCURRENCY)))
+
+        # Assert
+        self.assertEqual(http2_responses, http1_responses)
+        self.assertEqual(self.stats["connections"], 1)
+        self.assertGreaterEqual(len(self.peers), CONCURRENCY // 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import json
 import unittest
 from unittest.mock import patch, Mock
 from tron_energy import TronEnergy
@@ -21,7 +22,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertTrue(result)
 
-    @patch('tron_energy.tron_energy.requests.Session.get')
+    @patch('tron_energy.transport.requests.Session.get')
     def test_get_public_data(self, mock_get):
         # Arrange
         expected_response = {
@@ -36,7 +37,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             "tiered_pricing": [{"period": 0, "price": 100}, {"period": 1, "price": 200}, {"period": 3, "price": 152}, {"period ": 30, "price": 124}],
             "balance": 813892429257
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
     
         # Act
         response = self.tron_energy.get_public_data()
@@ -44,7 +45,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.get')
+    @patch('tron_energy.transport.requests.Session.get')
     def test_get_wallet_balance(self, mock_get):
         # Arrange
         expected_response = {
@@ -59,7 +60,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             "tiered_pricing": [{"period": 0, "price": 100}, {"period": 1, "price": 200}, {"period": 3, "price": 152}, {"period ": 30, "price": 124}],
             "balance": 813892429257
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
     
         # Act
         response = self.tron_energy.get_wallet_balance()
@@ -67,7 +68,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response['balance'])
 
-    @patch('tron_energy.tron_energy.requests.Session.get')
+    @patch('tron_energy.transport.requests.Session.get')
     def test_get_platform_avail_energy(self, mock_get):
         # Arrange
         expected_response = {
@@ -82,7 +83,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             "tiered_pricing": [{"period": 0, "price": 100}, {"period": 1, "price": 200}, {"period": 3, "price": 152}, {"period ": 30, "price": 124}],
             "balance": 813892429257
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
     
         # Act
         response = self.tron_energy.get_platform_avail_energy()
@@ -90,7 +91,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response['platform_avail_energy'])
 
-    @patch('tron_energy.tron_energy.requests.Session.post')
+    @patch('tron_energy.transport.requests.Session.post')
     def test_place_order(self, mock_get):
         # Arrange
         expected_response = {
@@ -99,7 +100,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             "amount": 3120000,
             "balance": 813900029257
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "receive_address": "TR7NHnXw5423f8j766h899234567890",
@@ -113,7 +114,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.post')
+    @patch('tron_energy.transport.requests.Session.post')
     def test_transfer_small_trx_amount(self, mock_get):
         # Arrange
         expected_response = {
@@ -121,7 +122,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             "txid": "9df44479551ef93c9bbfeca3cb82ef1564199d2d492ad38f7f1d2e454f5efb0f",
             "balance": 813900029257
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "receive_address": "TR7NHnXw5423f8j766h899234567890",
@@ -134,14 +135,14 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.post')
+    @patch('tron_energy.transport.requests.Session.post')
     def test_purchase_by_number_of_transfers(self, mock_get):
         # Arrange
         expected_response = {
             "errno": 0,
             "balance": 813900029257
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "receive_address": "TR7NHnXw5423f8j766h899234567890",
@@ -154,7 +155,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.get')
+    @patch('tron_energy.transport.requests.Session.get')
     def test_list_purchases_by_number_of_transfers(self, mock_get):
         # Arrange
         expected_response = {
@@ -183,7 +184,7 @@ class TestTronEnergyMethods(unittest.TestCase):
                 },
             ]
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "receive_address": "TR7NHnXw5423f8j766h899234567890",
@@ -195,7 +196,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.post')
+    @patch('tron_energy.transport.requests.Session.post')
     def test_create_smart_delegate(self, mock_get):
         # Arrange
         expected_response = {
@@ -204,7 +205,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             "balance": 813900029257
 
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "receive_address": "TR7NHnXw5423f8j766h899234567890",
@@ -217,7 +218,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.get')
+    @patch('tron_energy.transport.requests.Session.get')
     def test_list_smart_delegate(self, mock_get):
         # Arrange
         expected_response = {
@@ -247,7 +248,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             ]
         }
 
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "receive_address": "TR7NHnXw5423f8j766h899234567890",
@@ -259,13 +260,13 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.post')
+    @patch('tron_energy.transport.requests.Session.post')
     def test_modify_smart_delegate(self, mock_get):
         # Arrange
         expected_response = {
             "errno": 0
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "id": 21,
@@ -278,7 +279,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.get')
+    @patch('tron_energy.transport.requests.Session.get')
     def test_get_order(self, mock_get):
         # Arrange
         expected_response = {
@@ -304,7 +305,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             "status": 30, # 30 indicates that the commission was completely successful
             "refund_amount": 0
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "order_no": "58b451473d290f92443eabf0322b9907"
@@ -316,14 +317,14 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.post')
+    @patch('tron_energy.transport.requests.Session.post')
     def test_recycle_order(self, mock_get):
         # Arrange
         expected_response = {
             "errno": 0,
             "message": "request accept"
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "order_no": "58b451473d290f92443eabf0322b9907"
@@ -335,7 +336,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.get')
+    @patch('tron_energy.transport.requests.Session.get')
     def test_estimate_order(self, mock_get):
         # Arrange
         expected_response = {
@@ -345,7 +346,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             "total_price": 10192000,
             "addition": 600000
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         data = {
             "energy_amount": 32000,
@@ -358,7 +359,7 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
-    @patch('tron_energy.tron_energy.requests.Session.get')
+    @patch('tron_energy.transport.requests.Session.get')
     def test_get_api_usage_summary(self, mock_get):
         # Arrange
         expected_response = {
@@ -374,7 +375,7 @@ class TestTronEnergyMethods(unittest.TestCase):
             "yesterday_sum_energy": 1300000,
             "yesterday_sum_trx": 197600000
         }
-        mock_get.return_value.json.return_value = expected_response
+        mock_get.return_value = Mock(status_code=200, headers={}, content=json.dumps(expected_response).encode())
 
         # Act
         response = self.tron_energy.get_api_usage_summary()
@@ -382,6 +383,28 @@ class TestTronEnergyMethods(unittest.TestCase):
         # Assert
         self.assertEqual(response, expected_response)
 
+    def test_session_rebuilt_after_fork(self):
+        # Arrange
+        parent_session = self.tron_energy.sess
+
+        # Act
+        with patch('tron_energy.tron_energy.os.getpid', return_value=-1):
+            child_session = self.tron_energy.sess
+
+        # Assert
+        self.assertIsNot(parent_session, child_session)
+        self.assertEqual(child_session.headers["API-KEY"], 'your_api_key')
+
+    @patch('tron_energy.transport.requests.Session.post')
+    def test_place_order_rejects_invalid_address(self, mock_post):
+        # Arrange
+        tron_energy = TronEnergy(api_key='your_api_key', api_secret='your_api_secret', validate_addresses=True)
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            tron_energy.place_order(receive_address="TR7NHnXw5423f8j766h899234567890", energy_amount=65000)
+        mock_post.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
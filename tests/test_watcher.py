@@ -0,0 +1,96 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from tron_energy import AsyncTronEnergy
+from tron_energy.watcher import PublicDataWatcher, diff_fields
+
+
+def snapshots(*balances):
+    values = [{"balance": balance, "platform_avail_energy": 1000} for balance in balances]
+    return values + [values[-1]] * 1000
+
+
+class TestPublicDataWatcher(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = AsyncTronEnergy(api_key='your_api_key', api_secret='your_api_secret')
+
+    async def test_subscribers_share_one_poller(self):
+        # Arrange
+        self.client.get_public_data = AsyncMock(side_effect=snapshots(10, 10, 12))
+        streams = [self.client.watch_public_data(interval=0.01) for _ in range(3)]
+
+        # Act
+        first = await asyncio.gather(*(stream.__anext__() for stream in streams))
+        second = await asyncio.gather(*(stream.__anext__() for stream in streams))
+        polls = self.client.get_public_data.await_count
+        for stream in streams:
+            await stream.aclose()
+
+        # Assert
+        self.assertEqual(first, [{"balance": (None, 10), "platform_avail_energy": (None, 1000)}] * 3)
+        self.assertEqual(second, [{"balance": (10, 12)}] * 3)
+        self.assertLessEqual(polls, 4)
+        self.assertEqual(self.client._watchers[0.01].stats()["subscribers"], 0)
+
+    async def test_fields_filter_changes(self):
+        # Arrange
+        self.client.get_public_data = AsyncMock(side_effect=[
+            {"balance": 10, "platform_avail_energy": 1000},
+            {"balance": 10, "platform_avail_energy": 900},
+            {"balance": 11, "platform_avail_energy": 900},
+        ] + [{"balance": 11, "platform_avail_energy": 900}] * 1000)
+
+        # Act
+        stream = self.client.watch_public_data(fields=["balance"], interval=0.01)
+        changes = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+
+        # Assert
+        self.assertEqual(changes, [{"balance": (None, 10)}, {"balance": (10, 11)}])
+
+    async def test_slow_subscriber_gets_merged_diffs(self):
+        # Arrange
+        self.client.get_public_data = AsyncMock(side_effect=snapshots(1, 2, 3, 4, 5))
+        stream = self.client.watch_public_data(fields=["balance"], interval=0.005, buffer=2)
+        first = await stream.__anext__()
+
+        # Act
+        await asyncio.sleep(0.1)
+        backlog = [await stream.__anext__(), await stream.__anext__()]
+        stats = self.client._watchers[0.005].stats()
+        await stream.aclose()
+
+        # Assert
+        self.assertEqual(first, {"balance": (None, 1)})
+        self.assertEqual(backlog, [{"balance": (1, 4)}, {"balance": (4, 5)}])
+        self.assertEqual(stats["merged"], 2)
+
+    async def test_close_ends_subscriptions(self):
+        # Arrange
+        self.client.get_public_data = AsyncMock(side_effect=snapshots(10))
+        received = []
+
+        async def consume():
+            async for changes in self.client.watch_public_data(interval=0.01):
+                received.append(changes)
+
+        # Act
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.03)
+        await self.client.close()
+        await asyncio.wait_for(task, 1)
+
+        # Assert
+        self.assertEqual(len(received), 1)
+
+    def test_diff_fields(self):
+        self.assertEqual(diff_fields({"a": 1, "b": 2}, {"a": 1, "c": 3}), {"b": (2, None), "c": (None, 3)})
+
+    def test_rejects_empty_buffer(self):
+        with self.assertRaises(ValueError):
+            PublicDataWatcher(AsyncMock(), buffer=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,30 @@ __version__ = get_version()
 
 from .tron_energy import TronEnergy
 from .async_tron_energy import AsyncTronEnergy
+from .dispatcher import OrderDispatcher, RateBudget, DispatchError
+from .outbox import OrderOutbox
+from .reconciler import SmartDelegateReconciler, DelegatePolicy
+from .recycler import RecycleScheduler
+from .address import is_valid_address, validate_address, check_addresses
+from .quota import QuotaTracker, QuotaExceeded
+from .replay import TrafficRecorder, replay, replay_sync
+from .gateway import Gateway, GatewayClient, AsyncGatewayClient
+from .scheduler import PriorityScheduler, AsyncPriorityScheduler, request_priority
+from .limiter import AdaptiveLimit
+from .analytics import OrderAnalytics
+from .middleware import Interceptor
+from .pool import AsyncTronEnergyPool
+from .coalescer import OrderCoalescer
+from .endpoints import EndpointSelector
+from .snapshot import save_snapshot, load_snapshot
+from .watcher import PublicDataWatcher
+from .sharedcache import SharedCache, shared_cache, async_shared_cache
+from .preorder import DemandModel, PreorderScheduler
+from .topup import CountDelegateManager, TopUpRule
+from .transport import Transport, AsyncTransport, RequestsTransport, AiohttpTransport, HttpxTransport, AsyncHttpxTransport
+from .core import HTTPStatusError
 
     
-__all__ = ['TronEnergy', 'AsyncTronEnergy']
\ No newline at end of file
+__all__ = ['TronEnergy', 'AsyncTronEnergy', 'OrderDispatcher', 'RateBudget', 'DispatchError', 'OrderOutbox', 'SmartDelegateReconciler', 'DelegatePolicy', 'RecycleScheduler', 'is_valid_address', 'validate_address', 'check_addresses', 'QuotaTracker', 'QuotaExceeded', 'TrafficRecorder', 'replay', 'replay_sync', 'Gateway', 'GatewayClient',
+           'AsyncGatewayClient', 'PriorityScheduler', 'AsyncPriorityScheduler', 'request_priority', 'AdaptiveLimit', 'OrderAnalytics', 'Interceptor', 'AsyncTronEnergyPool', 'OrderCoalescer', 'EndpointSelector', 'save_snapshot', 'load_snapshot', 'PublicDataWatcher', 'SharedCache', 'shared_cache', 'async_shared_cache', 'DemandModel', 'PreorderScheduler', 'CountDelegateManager', 'TopUpRule', 'Transport', 'AsyncTransport', 'RequestsTransport',
+           'AiohttpTransport', 'HttpxTransport', 'AsyncHttpxTransport', 'HTTPStatusError']
\ No newline at end of file
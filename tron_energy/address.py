@@ -0,0 +1,124 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+TRON_ADDRESS_PREFIX = 0x41
+
+_BASE58_INDEX = {c: i for i, c in enumerate(BASE58_ALPHABET)}
+
+CACHE_SIZE = 65536
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def b58decode_check(value:str):
+    """
+    Decodes a base58check string.
+
+    Parameters:
+        value (str): The base58check encoded string.
+
+    Returns:
+        bytes: The payload without its 4 byte checksum.
+
+    Raises:
+        ValueError: If the string is not valid base58 or its checksum does not match.
+    """
+    number = 0
+    for c in value:
+        try:
+            number = number * 58 + _BASE58_INDEX[c]
+        except KeyError:
+            raise ValueError(f"Invalid base58 character {c!r}") from None
+    leading_zeros = len(value) - len(value.lstrip("1"))
+    raw = b"\0" * leading_zeros + number.to_bytes((number.bit_length() + 7) // 8, "big")
+    payload, checksum = raw[:-4], raw[-4:]
+    if len(raw) < 5 or hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] != checksum:
+        raise ValueError("Invalid base58check checksum")
+    return payload
+
+
+def is_valid_address(address:str):
+    """
+    Checks a Tron address offline: base58check encoding, 21 byte payload and 0x41 prefix.
+
+    Valid addresses are kept in a bounded least-recently-used cache, so repeated checks of the same address
+    are a dictionary lookup. Malformed ones are not cached and cannot evict valid ones.
+
+    Parameters:
+        address (str): The Tron address, e.g. 'TR7NHqjeKQxGTCi8q8ZY4pL8otSzgjLj6t'.
+
+    Returns:
+        bool: True if the address is well formed.
+    """
+    with _cache_lock:
+        if address in _cache:
+            _cache.move_to_end(address)
+            return True
+    if not _decode_address(address):
+        return False
+    remember_addresses((address,))
+    return True
+
+
+def _decode_address(address:str):
+    if not isinstance(address, str) or len(address) != 34 or address[0] != "T":
+        return False
+    try:
+        payload = b58decode_check(address)
+    except ValueError:
+        return False
+    return len(payload) == 21 and payload[0] == TRON_ADDRESS_PREFIX
+
+
+def known_addresses():
+    """
+    Returns:
+        list: The cached addresses, all well formed, least recently used first.
+    """
+    with _cache_lock:
+        return list(_cache)
+
+
+def remember_addresses(addresses):
+    """
+    Caches addresses as valid without decoding them, e.g. those of a verified snapshot.
+
+    Only pass addresses from a trusted source: a malformed address remembered here passes every check.
+
+    Parameters:
+        addresses (iterable): Well formed addresses, such as an earlier `known_addresses`.
+    """
+    with _cache_lock:
+        for address in addresses:
+            _cache[address] = True
+            _cache.move_to_end(address)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def validate_address(address:str):
+    """
+    Raises:
+        ValueError: If the address is not a well formed Tron address.
+    """
+    if not is_valid_address(address):
+        raise ValueError(f"Invalid Tron address: {address!r}")
+    return address
+
+
+def check_addresses(addresses):
+    """
+    Validates many addresses at once. Each distinct address is decoded only once.
+
+    Parameters:
+        addresses (iterable): The Tron addresses to check.
+
+    Returns:
+        list: One bool per address, in input order.
+    """
+    addresses = list(addresses)
+    results = {address: is_valid_address(address) for address in set(addresses)}
+    return [results[address] for address in addresses]
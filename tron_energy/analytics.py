@@ -0,0 +1,282 @@
+import os
+import sys
+import json
+import mmap
+import array
+from datetime import datetime, timezone
+from time import time
+
+from .recycler import period_seconds
+from .replay import percentile
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; reports fall back to plain Python.
+    np = None
+
+
+COLUMNS = {"time": "d", "address": "I", "period": "I", "product": "I", "energy": "q", "amount": "q"}
+CATEGORIES = ("address", "product")
+GROUPS = ("address", "period", "product")
+VALUES = ("amount", "energy")
+
+BUCKETS = {"1H": 3600, "1D": 86400, "1W": 7 * 86400}
+WEEK_ORIGIN = 4 * 86400  # 1970-01-05, the first Monday after the epoch, so weekly buckets start on Mondays.
+
+
+def _timestamp(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _period_label(seconds:int):
+    return f"{seconds // 86400}D" if seconds % 86400 == 0 else f"{seconds // 3600}H"
+
+
+class OrderAnalytics:
+    """
+    A columnar store of orders for cost reporting.
+
+    Orders are kept as typed arrays, one per column (time, address, period, product, energy and amount
+    in sun), with addresses and products dictionary-encoded, so a million orders take about 36 MB.
+    Stores can be saved to a directory and memory-mapped back without reading them into memory, and
+    `report` aggregates them by address, period, product and time bucket. The aggregations are
+    vectorized with NumPy when it is installed and computed in plain Python otherwise.
+    """
+
+    def __init__(self):
+        self._columns = {name: array.array(typecode) for name, typecode in COLUMNS.items()}
+        self._labels = {name: [] for name in CATEGORIES}
+        self._codes = {name: {} for name in CATEGORIES}
+        self._mapped = False
+        self._maps = []
+
+    def __len__(self):
+        return len(self._columns["time"])
+
+    def _encode(self, category:str, label:str):
+        code = self._codes[category].get(label)
+        if code is None:
+            code = self._codes[category][label] = len(self._labels[category])
+            self._labels[category].append(label)
+        return code
+
+    def add(self, order:dict, spec:dict=None, product:str=None, timestamp:float=None):
+        """
+        Adds one order.
+
+        Parameters:
+            order (dict): The response of `get_order`, or of `place_order` together with `spec`.
+            spec (dict, optional): The arguments passed to `place_order`, which its response does not repeat.
+            product (str, optional): The product the order is reported under. Defaults to the order's `product` or 'energy'.
+            timestamp (float, optional): The order time in seconds since the epoch. Defaults to `create_time`, or now.
+        """
+        record = dict(spec or {}, **order)
+        if timestamp is None:
+            timestamp = _timestamp(record["create_time"]) if record.get("create_time") else time()
+        if self._mapped:
+            columns = {name: array.array(COLUMNS[name], column) for name, column in self._columns.items()}
+            self._unmap()
+            self._columns = columns
+        columns = self._columns
+        columns["time"].append(timestamp)
+        columns["address"].append(self._encode("address", record["receive_address"]))
+        columns["period"].append(period_seconds(record.get("period", "1H")))
+        columns["product"].append(self._encode("product", product or record.get("product") or "energy"))
+        columns["energy"].append(int(record.get("energy_amount") or 0))
+        columns["amount"].append(int(record.get("amount") or 0))
+
+    def extend(self, orders, product:str=None):
+        """Adds every order of an iterable of `get_order` responses."""
+        for order in orders:
+            self.add(order, product=product)
+
+    def save(self, path:str):
+        """
+        Writes the store to the directory `path`, one raw file per column.
+
+        Every file is written next to its target and renamed over it, so a store can be saved over the
+        files it was loaded from while they are still memory-mapped.
+
+        Parameters:
+            path (str): The directory, created if missing.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name, column in self._columns.items():
+            target = os.path.join(path, name + ".col")
+            with open(target + ".tmp", "wb") as f:
+                f.write(memoryview(column).cast("B"))
+            os.replace(target + ".tmp", target)
+        meta = {"rows": len(self), "byteorder": sys.byteorder, "labels": self._labels}
+        with open(os.path.join(path, "meta.json.tmp"), "w") as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(path, "meta.json.tmp"), os.path.join(path, "meta.json"))
+
+    @classmethod
+    def load(cls, path:str, mmap_columns:bool=True):
+        """
+        Opens a store written by `save`.
+
+        Parameters:
+            path (str): The directory of the store.
+            mmap_columns (bool, optional): Memory-map the columns instead of reading them. Defaults to True.
+
+        Returns:
+            OrderAnalytics: The store. Mapped columns are copied into memory on the first `add`.
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"Store was written on a {meta['byteorder']}-endian host")
+        store = cls()
+        for name, typecode in COLUMNS.items():
+            with open(os.path.join(path, name + ".col"), "rb") as f:
+                if mmap_columns and meta["rows"]:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    store._maps.append(mapped)
+                    column = memoryview(mapped).cast(typecode)
+                else:
+                    column = array.array(typecode)
+                    column.frombytes(f.read())
+            if len(column) != meta["rows"]:
+                raise ValueError(f"Column {name!r} has {len(column)} rows, expected {meta['rows']}")
+            store._columns[name] = column
+        store._labels = meta["labels"]
+        store._codes = {name: {label: code for code, label in enumerate(labels)} for name, labels in meta["labels"].items()}
+        store._mapped = mmap_columns and meta["rows"] > 0
+        return store
+
+    def _unmap(self):
+        if self._mapped:
+            for column in self._columns.values():
+                column.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+        self._mapped = False
+
+    def close(self):
+        """Unmaps the column files of a store opened by `load`, leaving it empty. Stores kept in memory are not affected."""
+        if self._mapped:
+            self._unmap()
+            self.__init__()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _label(self, name:str, code):
+        if name in CATEGORIES:
+            return self._labels[name][code]
+        return _period_label(code)
+
+    def report(self, by=("address",), bucket=None, value:str="amount", percentiles=(), since:float=None,
+               until:float=None):
+        """
+        Aggregates the orders by group.
+
+        Parameters:
+            by (tuple, optional): Columns to group by, any of 'address', 'period' and 'product'. Defaults to address.
+            bucket (str or int, optional): Also group by time bucket: '1H', '1D', '1W' (starting Mondays) or seconds.
+            value (str, optional): The column aggregated, 'amount' (sun) or 'energy'. Defaults to 'amount'.
+            percentiles (tuple, optional): Nearest-rank percentiles of the value to compute per group, e.g. (50, 95).
+            since (float, optional): Only include orders at or after this time, in seconds since the epoch.
+            until (float, optional): Only include orders before this time, in seconds since the epoch.
+
+        Returns:
+            dict: `{"sum", "count", "p50", ...}` per group, keyed by a tuple of the `by` labels followed by the bucket start.
+        """
+        by = tuple(by)
+        for name in by:
+            if name not in GROUPS:
+                raise ValueError(f"Cannot group by {name!r}")
+        if value not in VALUES:
+            raise ValueError(f"Cannot aggregate {value!r}")
+        size = origin = None
+        if bucket is not None:
+            if isinstance(bucket, str) and bucket.upper() not in BUCKETS:
+                raise ValueError(f"Unknown bucket {bucket!r}")
+            size = BUCKETS[bucket.upper()] if isinstance(bucket, str) else int(bucket)
+            origin = WEEK_ORIGIN if size == BUCKETS["1W"] else 0
+        if np is not None:
+            return self._report_numpy(by, size, origin, value, percentiles, since, until)
+        return self._report_python(by, size, origin, value, percentiles, since, until)
+
+    def _report_python(self, by, size, origin, value, percentiles, since, until):
+        columns = self._columns
+        groups = {}
+        for i, timestamp in enumerate(columns["time"]):
+            if (since is not None and timestamp < since) or (until is not None and timestamp >= until):
+                continue
+            key = tuple(columns[name][i] for name in by)
+            if size is not None:
+                key += (int((timestamp - origin) // size),)
+            groups.setdefault(key, []).append(columns[value][i])
+        result = {}
+        for key, values in groups.items():
+            labels = tuple(self._label(name, code) for name, code in zip(by, key))
+            if size is not None:
+                labels += (key[-1] * size + origin,)
+            row = {"sum": sum(values), "count": len(values)}
+            if percentiles:
+                values.sort()
+                for q in percentiles:
+                    row[f"p{q:g}"] = percentile(values, q)
+            result[labels] = row
+        return result
+
+    def _report_numpy(self, by, size, origin, value, percentiles, since, until):
+        columns = {name: np.frombuffer(column, dtype=COLUMNS[name]) for name, column in self._columns.items()}
+        times = columns["time"]
+        mask = np.ones(len(times), dtype=bool)
+        if since is not None:
+            mask &= times >= since
+        if until is not None:
+            mask &= times < until
+        values = columns[value][mask]
+
+        # Combine the per-column codes into one mixed-radix key per row, then sort rows by key and value.
+        key = np.zeros(len(values), dtype=np.int64)
+        dimensions = []
+        for name in by:
+            uniques, codes = np.unique(columns[name][mask], return_inverse=True)
+            key = key * len(uniques) + codes.reshape(-1)
+            dimensions.append((name, uniques))
+        if size is not None:
+            uniques, codes = np.unique(np.floor((times[mask] - origin) / size).astype(np.int64), return_inverse=True)
+            key = key * len(uniques) + codes.reshape(-1)
+            dimensions.append((None, uniques))
+        groups, inverse = np.unique(key, return_inverse=True)
+        order = np.lexsort((values, inverse.reshape(-1)))
+        ordered = values[order]
+        counts = np.bincount(inverse.reshape(-1), minlength=len(groups))
+        starts = np.cumsum(counts) - counts
+        sums = np.add.reduceat(ordered, starts) if len(ordered) else ordered
+        ranks = {}
+        for q in percentiles:
+            rank = np.clip(np.ceil(q / 100 * counts).astype(np.int64), 1, counts) - 1
+            ranks[f"p{q:g}"] = ordered[starts + rank].tolist()
+
+        labels = []
+        remainder = groups
+        for name, uniques in reversed(dimensions):
+            remainder, index = np.divmod(remainder, len(uniques))
+            if name is None:
+                labels.append((uniques[index] * size + origin).tolist())
+            else:
+                labels.append([self._label(name, code) for code in uniques[index].tolist()])
+        labels = list(zip(*reversed(labels))) if labels else [()] * len(groups)
+
+        result = {}
+        for i, (label, total, count) in enumerate(zip(labels, sums.tolist(), counts.tolist())):
+            row = {"sum": total, "count": count}
+            for name, column in ranks.items():
+                row[name] = column[i]
+            result[tuple(label)] = row
+        return result
@@ -1,10 +1,20 @@
 import os
-import hashlib
+import asyncio
 import hmac
-import json
-from aiohttp import ClientSession, ClientResponseError, ClientResponse
-from time import time
+from time import time, monotonic
 from urllib.parse import urljoin
+from contextlib import AsyncExitStack
+
+from .address import validate_address, known_addresses, remember_addresses
+from .clock import ClockOffset
+from .streaming import RecordStream
+from .scheduler import NO_SLOT
+from .middleware import Request, compose
+from .endpoints import EndpointSelector, is_endpoint_failure, PROBE_PATH
+from .watcher import PublicDataWatcher
+from .transport import AiohttpTransport
+from . import core
+from .core import HttpRequest, HttpResponse, build_request, parse_response, session_headers, jsonify, sign
 
 
 TronAddress = str
@@ -13,7 +23,8 @@ TronAddress = str
 class AsyncTronEnergy:
     base_url = 'https://itrx.io/'
 
-    def __init__(self, api_key:str=None, api_secret:str=None):
+    def __init__(self, api_key:str=None, api_secret:str=None, validate_addresses:bool=False, quota_tracker=None,
+                 scheduler=None, middleware=None, base_url=None, transport=None):
         if not api_secret:
             api_secret = os.getenv('TRON_ENERGY_API_SECRET')
         if api_secret is None:
@@ -23,56 +34,203 @@ class AsyncTronEnergy:
         if api_key is None:
             raise ValueError("API key is required")
         
+        self._api_key = api_key
         self._api_secret = str(api_secret)
-        self.sess = ClientSession(headers={
-            'Content-Type': 'application/json',
-            'API-KEY': api_key
-        })
+        self.validate_addresses = validate_addresses
+        self.quota_tracker = quota_tracker
+        self.scheduler = scheduler
+        self.transport = transport if transport is not None else AiohttpTransport(headers=session_headers(self._api_key))
+        self.clock = ClockOffset()
+        self.endpoints = None
+        if isinstance(base_url, (list, tuple)) and len(base_url) > 1:
+            self.endpoints = EndpointSelector(base_url)
+        elif base_url:
+            self.base_url = base_url if isinstance(base_url, str) else base_url[0]
+        self._probes = set()
+        self._watchers = {}
+        self.middleware = []
+        self._pipeline = None
+        self.use(*(middleware or ()))
+
+    @property
+    def sess(self):
+        """
+        The aiohttp session of the default `AiohttpTransport`, created lazily inside the running event loop.
+
+        The session is rebuilt when the client is used after `os.fork()` or from a different event loop.
+        Other transports have no session.
+        """
+        return self.transport.session
+
+    @sess.setter
+    def sess(self, value):
+        self.transport.session = value
 
     async def close(self):
-        await self.sess.close()
+        for watcher in self._watchers.values():
+            watcher.close()
+        await self.transport.close()
 
     def _sign(self, message:str):
-        return hmac.new(self._api_secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+        return sign(self._api_secret, message)
 
     def _jsonify(self, data:dict):
-        if data:
-            return json.dumps(data, sort_keys=True, separators=(',', ':'))
-        return ""
+        return jsonify(data)
+
+    def _check_address(self, receive_address:TronAddress):
+        # Rejects malformed addresses before any network I/O when address validation is enabled.
+        if self.validate_addresses and receive_address is not None:
+            validate_address(receive_address)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: The clock offset, endpoint measurements and known-good addresses, for `save_snapshot`.
+        """
+        addresses = known_addresses() if self.validate_addresses else []
+        return {
+            "clock": self.clock.snapshot(),
+            "endpoints": self.endpoints.snapshot() if self.endpoints is not None else None,
+            "addresses": addresses,
+            "addresses_signature": self._sign("\n".join(addresses)),
+        }
+
+    def restore(self, state:dict):
+        """
+        Warms the client up from a `snapshot`, skipping measurements that are no longer fresh.
+
+        The addresses are trusted without decoding them again only if they are signed with this client's
+        API secret; otherwise they are ignored.
+        """
+        self.clock.restore(state.get("clock"))
+        if self.endpoints is not None:
+            self.endpoints.restore(state.get("endpoints"))
+        addresses = state.get("addresses") or []
+        if hmac.compare_digest(self._sign("\n".join(addresses)), state.get("addresses_signature") or ""):
+            remember_addresses(addresses)
 
     def _get_timestamp(self):
-        return str(int(time()))
+        return str(int(self.clock.time()))
+
+    @property
+    def clock_offset(self):
+        """The estimated server clock offset in seconds, as used for the TIMESTAMP header."""
+        return self.clock.offset
     
-    async def _handle_response(self, response:ClientResponse):
+    def use(self, *middleware):
+        """
+        Appends middleware to the chain every `make_request` call passes through.
+
+        Parameters:
+            *middleware: Coroutine functions called as `await middleware(request, call_next)` or `Interceptor` instances.
+
+        Returns:
+            AsyncTronEnergy: The same client.
+        """
+        self.middleware.extend(middleware)
+        self._pipeline = compose(self.middleware, self._handle, asynchronous=True) if self.middleware else None
+        return self
+
+    def _handle(self, request:Request):
+        return self._dispatch(request.method, request.url, request.data, request.priority)
+
+    async def make_request(self, method: str, url: str, data: dict = None, priority: str = None):
+        if self._pipeline is not None:
+            return await self._pipeline(Request(method, url, data, priority))
+        return await self._dispatch(method, url, data, priority)
+
+    async def _dispatch(self, method: str, url: str, data: dict = None, priority: str = None):
+        if self.quota_tracker is not None:
+            self.quota_tracker.acquire(method, url)
+        if self.scheduler is None:
+            return await self._send(method, url, data)
+        async with self.scheduler.slot(method, url, priority):
+            return await self._send(method, url, data)
+
+    async def _send(self, method: str, url: str, data: dict = None):
+        if self.endpoints is None:
+            return await self._send_to(self.base_url, method, url, data)
+        self._start_probes()
+        tried = []
+        while True:
+            base_url = self.endpoints.choose(tried)
+            started = monotonic()
+            try:
+                response = await self._send_to(base_url, method, url, data)
+            except Exception as e:
+                failed = is_endpoint_failure(e)
+                self.endpoints.observe(base_url, monotonic() - started, failed)
+                tried.append(base_url)
+                # Only reads are retried elsewhere; an order may have reached the server before the failure.
+                if failed and method.upper() != "POST" and len(tried) < len(self.endpoints):
+                    continue
+                raise
+            self.endpoints.observe(base_url, monotonic() - started)
+            return response
+
+    def _start_probes(self):
+        for base_url in self.endpoints.due_probes():
+            task = asyncio.ensure_future(self._probe(base_url))
+            self._probes.add(task)
+            task.add_done_callback(self._probes.discard)
+
+    async def _probe(self, base_url:str):
+        started = monotonic()
         try:
-            json_response = await response.json()
-        except json.JSONDecodeError as e:
-            response.raise_for_status()
-            raise Exception(f"Failed to decode JSON: {e}")
-        
-        if response.status >= 300 or response.status < 200:
-            raise ClientResponseError(
-                request_info=response.request_info,
-                history=response.history,
-                status=response.status,
-                message=json_response,
-                headers=response.headers
-            )
-        
-        return json_response
-    
-    async def make_request(self, method: str, url: str, data: dict = None):
-        timestamp = self._get_timestamp()
-        headers = {"TIMESTAMP": timestamp}
-        
-        if method.upper() == "POST":
-            json_data = self._jsonify(data)
-            headers["SIGNATURE"] = self._sign(f'{timestamp}&{json_data}')
-            async with self.sess.post(urljoin(self.base_url, url), data=json_data, headers=headers) as response:
-                return await self._handle_response(response)
-        else:
-            async with self.sess.get(urljoin(self.base_url, url), params=data, headers=headers) as response:
-                return await self._handle_response(response)
+            failed = (await self.transport.send(HttpRequest("GET", urljoin(base_url, PROBE_PATH)))).status >= 500
+        except Exception:
+            failed = True
+        self.endpoints.probed(base_url, monotonic() - started, failed)
+
+    def _build_request(self, base_url:str, method:str, url:str, data:dict=None):
+        request = build_request(base_url, method, url, data, self._api_secret, self._get_timestamp())
+        request.headers.update(session_headers(self._api_key))
+        return request
+
+    async def _send_to(self, base_url: str, method: str, url: str, data: dict = None):
+        request = self._build_request(base_url, method, url, data)
+        sent = time()
+        response = await self.transport.send(request)
+        self.clock.observe(response.headers, sent, time())
+        return parse_response(response, self.transport.status_error)
+
+    async def stream_records(self, url:str, data:dict=None, chunk_size:int=65536):
+        """
+        Streams the `results` of a paginated GET endpoint, following the `next` links.
+
+        The body is decoded incrementally as the transport receives it, so only one record is held in memory
+        at a time with a transport that streams, such as the default one. A scheduler slot is only held until
+        the response headers of each page arrive, so a slow consumer does not keep other calls waiting.
+
+        Parameters:
+            url (str): The endpoint.
+            data (dict, optional): The query parameters of the first page.
+            chunk_size (int, optional): Number of bytes read from the socket at a time. Defaults to 64KiB.
+
+        Returns:
+            async generator: The records, one at a time.
+        """
+        while url:
+            if self.quota_tracker is not None:
+                self.quota_tracker.acquire("GET", url)
+            slot = self.scheduler.slot("GET", url) if self.scheduler is not None else NO_SLOT
+            async with AsyncExitStack() as stack:
+                async with slot:
+                    base_url = self.endpoints.choose() if self.endpoints is not None else self.base_url
+                    request = self._build_request(base_url, "GET", url, data)
+                    sent = time()
+                    response = await stack.enter_async_context(self.transport.stream(request, chunk_size))
+                    self.clock.observe(response.headers, sent, time())
+                    if not 200 <= response.status < 300:
+                        body = b"".join([chunk async for chunk in response.body])
+                        parse_response(HttpResponse(response.status, response.headers, body), self.transport.status_error)
+                stream = RecordStream()
+                async for chunk in response.body:
+                    for record in stream.feed(chunk):
+                        yield record
+                for record in stream.close():
+                    yield record
+            url, data = stream.meta.get("next"), None
 
     def verify_signature(self, signature, timestamp, data):
         computed_signature = self._sign(f"{timestamp}&{self._jsonify(data)}")
@@ -85,9 +243,28 @@ class AsyncTronEnergy:
         Returns:
         dict: A dictionary containing the public data retrieved from the API.
         """
-        url = "/api/v1/frontend/index-data"
-        return await self.make_request("GET", url)
-    
+        return await self.make_request(*core.public_data())
+
+    def watch_public_data(self, fields=None, interval:float=3.0, buffer:int=16):
+        """
+        Subscribes to changes of the public data, e.g. `balance` or `platform_avail_energy`.
+
+        All subscriptions with the same `interval` share one poller, so the API sees one
+        `get_public_data` request per interval however many coroutines are watching.
+
+        Parameters:
+            fields (iterable, optional): Only report changes of these fields. Every field if not given.
+            interval (float, optional): Seconds between two polls. Defaults to 3.
+            buffer (int, optional): Most diffs held for a slow subscriber before its oldest are merged. Defaults to 16.
+
+        Returns:
+            async generator: Dicts of `{field: (old_value, new_value)}`, starting with the current values.
+        """
+        watcher = self._watchers.get(interval)
+        if watcher is None:
+            watcher = self._watchers[interval] = PublicDataWatcher(self.get_public_data, interval)
+        return watcher.subscribe(fields, buffer)
+
     async def get_wallet_balance(self):
         """
         Retrieves your wallet balance.
@@ -122,17 +299,8 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order"
-        data = {
-            "receive_address": receive_address,
-            "energy_amount": energy_amount,
-            "period": period,
-        }
-        if out_trade_no:
-            data["out_trade_no"] = out_trade_no
-        if callback_url:
-            data["callback_url"] = callback_url
-        return await self.make_request("POST", url, data)
+        self._check_address(receive_address)
+        return await self.make_request(*core.place_order(receive_address, energy_amount, period, out_trade_no, callback_url))
 
     async def transfer_small_trx_amount(self, amount:int, receive_address:TronAddress):
         """
@@ -145,12 +313,8 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order/transfer"
-        data = {
-            "amount": amount,
-            "receive_address": receive_address,
-        }
-        return await self.make_request("POST", url, data)
+        self._check_address(receive_address)
+        return await self.make_request(*core.transfer_small_trx_amount(amount, receive_address))
 
     async def purchase_by_number_of_transfers(self, times:int, receive_address:TronAddress):
         """
@@ -161,12 +325,8 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/count-delegate-policy"
-        data = {
-            "times": times,
-            "receive_address": receive_address,
-        }
-        return await self.make_request("POST", url, data)
+        self._check_address(receive_address)
+        return await self.make_request(*core.purchase_by_number_of_transfers(times, receive_address))
 
     async def list_purchases_by_number_of_transfers(self, receive_address:TronAddress=None): # Note: We will have to do something about pagination here.
         """
@@ -176,9 +336,22 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = f"/api/v1/frontend/count-delegate-policy"
-        data = {"receive_address": receive_address} if receive_address else None
-        return await self.make_request("GET", url, data)
+        self._check_address(receive_address)
+        return await self.make_request(*core.list_purchases_by_number_of_transfers(receive_address))
+
+    def iter_purchases_by_number_of_transfers(self, receive_address:TronAddress=None):
+        """
+        Streaming variant of `list_purchases_by_number_of_transfers` that follows pagination.
+
+        Parameters:
+            receive_address (TronAddress): Query a specific address, if not filled in, return all.
+
+        Returns:
+            async generator: The count-delegate policies, one at a time.
+        """
+        self._check_address(receive_address)
+        _, url, data = core.list_purchases_by_number_of_transfers(receive_address)
+        return self.stream_records(url, data)
 
     async def create_smart_delegate(self, period:int, receive_address:TronAddress, max_energy:int=None):
         """
@@ -190,14 +363,8 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/auto-delegate-policy"
-        data = {
-            "period": period,
-            "receive_address": receive_address,
-        }
-        if max_energy:
-            data["max_energy"] = max_energy
-        return await self.make_request("POST", url, data)
+        self._check_address(receive_address)
+        return await self.make_request(*core.create_smart_delegate(period, receive_address, max_energy))
 
     async def list_smart_delegate(self, receive_address:TronAddress=None): # Note: We will have to do something about pagination here.
         """
@@ -207,9 +374,22 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/auto-delegate-policy"
-        data = {"receive_address": receive_address} if receive_address else None
-        return await self.make_request("GET", url, data)
+        self._check_address(receive_address)
+        return await self.make_request(*core.list_smart_delegate(receive_address))
+
+    def iter_smart_delegate(self, receive_address:TronAddress=None):
+        """
+        Streaming variant of `list_smart_delegate` that follows pagination.
+
+        Parameters:
+            receive_address (TronAddress): Query a specific address, if not filled in, return all.
+
+        Returns:
+            async generator: The smart delegate policies, one at a time.
+        """
+        self._check_address(receive_address)
+        _, url, data = core.list_smart_delegate(receive_address)
+        return self.stream_records(url, data)
 
     async def modify_smart_delegate(self, id:int, status:bool):
         """
@@ -220,9 +400,7 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = f"/api/v1/frontend/auto-delegate-policy/{id}/change-status"
-        data = {"status": int(status)} 
-        return await self.make_request("POST", url, data)
+        return await self.make_request(*core.modify_smart_delegate(id, status))
 
     async def get_order(self, order_no:str):
         """
@@ -232,9 +410,7 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order/query"
-        data = {"serial": order_no}
-        return await self.make_request("GET", url, data)
+        return await self.make_request(*core.get_order(order_no))
 
     async def recycle_order(self, order_no:str):
         """
@@ -244,9 +420,7 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order/reclaim"
-        data = {"serial": order_no}
-        return await self.make_request("POST", url, data)
+        return await self.make_request(*core.recycle_order(order_no))
 
     async def estimate_order(self, energy_amount:int, period:str="1H"):
         """
@@ -259,12 +433,7 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order/price"
-        data = {
-            "energy_amount": energy_amount,
-            "period": period,
-        }
-        return await self.make_request("GET", url, data)
+        return await self.make_request(*core.estimate_order(energy_amount, period))
 
     async def get_api_usage_summary(self):
         """
@@ -273,9 +442,8 @@ class AsyncTronEnergy:
         Returns:
             dict: A dictionary containing the API usage summary.
         """
-        url = "/api/v1/frontend/userapi/summary"
-        return await self.make_request("GET", url)
-    
+        return await self.make_request(*core.api_usage_summary())
+
     async def __aenter__(self):
         return self
 
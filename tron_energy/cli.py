@@ -0,0 +1,301 @@
+import os
+import sys
+import csv
+import json
+import asyncio
+import inspect
+import argparse
+import itertools
+from collections import deque
+from time import monotonic
+
+from .async_tron_energy import AsyncTronEnergy
+from .dispatcher import RateBudget
+from .middleware import rate_limit
+from .replay import ReplayReport
+from .scheduler import async_concurrency_slots
+
+
+def _boolean(value:str):
+    value = value.strip().lower()
+    if value in ("1", "true", "yes", "on", "enable", "enabled"):
+        return True
+    if value in ("0", "false", "no", "off", "disable", "disabled"):
+        return False
+    raise ValueError(f"Not a boolean: {value!r}")
+
+
+# Subcommand: (client method, field of one-value-per-line input, converters applied to text values).
+COMMANDS = {
+    "place-order": ("place_order", "receive_address", {"energy_amount": int}),
+    "recycle-order": ("recycle_order", "order_no", {}),
+    "get-order": ("get_order", "order_no", {}),
+    "modify-smart-delegate": ("modify_smart_delegate", "id", {"id": int, "status": _boolean}),
+}
+
+
+def _input_format(path:str, fmt:str=None):
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson", ".json") or path == "-":
+        return "jsonl"
+    return "lines"
+
+
+def read_records(f, fmt:str, field:str):
+    """
+    Streams the records of a CSV, JSON-lines or one-value-per-line file.
+
+    Parameters:
+        f (file): The open input.
+        fmt (str): 'csv', 'jsonl' or 'lines'.
+        field (str): The field a bare value is assigned to, in 'lines' input or JSON-lines strings.
+
+    Returns:
+        generator: One dict per record. Empty CSV cells are left out.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(f):
+            yield {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+    elif fmt == "jsonl":
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record if isinstance(record, dict) else {field: record}
+    elif fmt == "lines":
+        for line in f:
+            if line.strip():
+                yield {field: line.strip()}
+    else:
+        raise ValueError(f"Unknown input format {fmt!r}")
+
+
+class _Progress:
+    # A progress line rewritten in place with `\r`, so it is only shown on a terminal; logs get the summary alone.
+
+    def __init__(self, stream, interval:float=0.5):
+        self.stream = stream
+        self.interval = interval
+        self._shown = 0.0
+        isatty = getattr(stream, "isatty", None)
+        self.enabled = bool(isatty and isatty())
+
+    def update(self, done:int, errors:int, start:float, final:bool=False):
+        now = monotonic()
+        if not self.enabled or (not final and now - self._shown < self.interval):
+            return
+        self._shown = now
+        rate = done / (now - start) if now > start else 0.0
+        self.stream.write(f"\r{done} done, {errors} failed, {rate:.1f}/s")
+        if final:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+def _load_checkpoint(path:str):
+    if not path or not os.path.exists(path):
+        return 0, {}
+    with open(path) as f:
+        state = json.load(f)
+    return int(state["done"]), {int(index): line for index, line in state.get("pending", {}).items()}
+
+
+def _save_checkpoint(path:str, done:int, pending:dict=None):
+    if not path:
+        return
+    state = {"done": done}
+    if pending:
+        state["pending"] = {str(index): line for index, line in sorted(pending.items())}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def resume_output(path:str, checkpoint:str):
+    """
+    Lines up a checkpoint with the output file of an interrupted run before it is appended to.
+
+    The output is the record of what was done: a torn last line is cut off, and the checkpoint is moved
+    past the last record written, so no record is called or written twice on resume.
+
+    Parameters:
+        path (str): The JSON-lines output of the interrupted run.
+        checkpoint (str): The checkpoint of that run.
+    """
+    if not os.path.exists(path):
+        return
+    done, pending = _load_checkpoint(checkpoint)
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        if line.strip():
+            done = max(done, json.loads(line)["index"] + 1)
+    _save_checkpoint(checkpoint, done, {index: line for index, line in pending.items() if index >= done})
+
+
+async def run_batch(client, method:str, records, output, concurrency=16, checkpoint:str=None, defaults:dict=None,
+                    converters:dict=None, progress=None):
+    """
+    Calls one client method for every record with bounded concurrency and writes the outcomes as JSON lines.
+
+    Outcomes are written in input order as `{"index", "input", "ok", "result" or "error", "latency"}`.
+    The checkpoint is updated after every written outcome and records how many leading records have been
+    written, so a rerun skips them and appends. Calls that finished but could not be written yet when the
+    run stopped are kept in the checkpoint too, and a rerun writes their outcomes instead of calling again.
+
+    Parameters:
+        client (AsyncTronEnergy): The client.
+        method (str): The client method, e.g. 'place_order'.
+        records (iterable): Keyword arguments of each call, streamed.
+        output (file): Where the JSON lines are written.
+        concurrency (int or AdaptiveLimit, optional): Maximum number of calls in flight. Defaults to 16.
+        checkpoint (str, optional): Path of the checkpoint file. Progress is not saved if not given.
+        defaults (dict, optional): Keyword arguments used when a record does not set them.
+        converters (dict, optional): Functions converting text values of a field, for CSV and plain-text input.
+        progress (file, optional): Where a progress line is shown.
+
+    Returns:
+        ReplayReport: The number of calls, failures, duration and latencies of this run.
+    """
+    call = getattr(client, method)
+    parameters = set(inspect.signature(call).parameters)
+    converters = converters or {}
+    slot = async_concurrency_slots(concurrency)
+    window = deque()
+    limit = 4 * getattr(concurrency, "max_limit", concurrency)
+    done, pending = _load_checkpoint(checkpoint)
+    latencies = []
+    errors = 0
+    start = monotonic()
+    display = _Progress(progress) if progress is not None else None
+
+    async def run(index:int, record:dict):
+        kwargs = dict(defaults or {})
+        kwargs.update((key, value) for key, value in record.items() if key in parameters)
+        sent = monotonic()
+        try:
+            for key, convert in converters.items():
+                if isinstance(kwargs.get(key), str):
+                    kwargs[key] = convert(kwargs[key])
+            # Errors are caught outside the slot so that an adaptive limit sees them.
+            async with slot():
+                sent = monotonic()
+                outcome = {"ok": True, "result": await call(**kwargs)}
+        except Exception as e:
+            outcome = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        latency = monotonic() - sent
+        return dict({"index": index, "input": record}, latency=round(latency, 6), **outcome), latency
+
+    async def recorded(line:dict):
+        return line, line["latency"]
+
+    async def write_head():
+        nonlocal done, errors
+        # The head leaves the window only once written, so an interrupted run still finds it below.
+        line, latency = await window[0]
+        window.popleft()
+        latencies.append(latency)
+        errors += not line["ok"]
+        output.write(json.dumps(line, separators=(',', ':')) + "\n")
+        done = line["index"] + 1
+        if checkpoint:
+            output.flush()
+            _save_checkpoint(checkpoint, done, pending)
+        if display is not None:
+            display.update(len(latencies), errors, start)
+
+    try:
+        for index, record in itertools.islice(enumerate(records), done, None):
+            if index in pending:
+                window.append(asyncio.ensure_future(recorded(pending.pop(index))))
+            else:
+                window.append(asyncio.ensure_future(run(index, record)))
+            while len(window) >= limit or (window and window[0].done()):
+                await write_head()
+        while window:
+            await write_head()
+    finally:
+        for task in window:
+            if task.done() and not task.cancelled():
+                line, _ = task.result()
+                pending[line["index"]] = line
+            else:
+                task.cancel()
+        output.flush()
+        _save_checkpoint(checkpoint, done, pending)
+    if display is not None:
+        display.update(len(latencies), errors, start, final=True)
+    return ReplayReport(len(latencies), errors, monotonic() - start, sorted(latencies))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="tron-energy", description="Run bulk itrx operations from CSV, JSON-lines or "
+                                     "plain-text files. Credentials are read from TRON_ENERGY_API_KEY and TRON_ENERGY_API_SECRET.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, (method, field, _) in COMMANDS.items():
+        command = commands.add_parser(name, help=f"call {method} for every record; plain-text lines are the {field}")
+        command.add_argument("input", help="input file, or - for standard input")
+        command.add_argument("-o", "--output", default="-", help="JSON-lines output file (default: standard output)")
+        command.add_argument("--format", choices=("csv", "jsonl", "lines"), help="input format (default: from the extension)")
+        command.add_argument("--concurrency", type=int, default=16, help="calls in flight (default: 16)")
+        command.add_argument("--rate", type=float, default=None, help="calls per second (default: unlimited)")
+        command.add_argument("--checkpoint", help="progress file used to resume an interrupted run")
+        command.add_argument("--base-url", help="API base url, e.g. a local gateway")
+        command.add_argument("--no-progress", action="store_true", help="do not show progress on standard error")
+        if name == "place-order":
+            command.add_argument("--energy-amount", type=int, help="energy per order when the input has none")
+            command.add_argument("--period", help="order period when the input has none, e.g. 1H or 3D")
+            command.add_argument("--callback-url", help="callback url when the input has none")
+        elif name == "modify-smart-delegate":
+            command.add_argument("--status", type=_boolean, help="enable or disable when the input has no status")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    method, field, converters = COMMANDS[args.command]
+    defaults = {key: getattr(args, key) for key in ("energy_amount", "period", "callback_url", "status")
+                if getattr(args, key, None) is not None}
+
+    async def run():
+        async with AsyncTronEnergy() as client:
+            if args.base_url:
+                client.base_url = args.base_url
+            if args.rate:
+                client.use(rate_limit(RateBudget(args.rate)))
+            source = sys.stdin if args.input == "-" else open(args.input, newline="")
+            resuming = bool(args.checkpoint) and os.path.exists(args.checkpoint)
+            if resuming and args.output != "-":
+                resume_output(args.output, args.checkpoint)
+            output = sys.stdout if args.output == "-" else open(args.output, "a" if resuming else "w")
+            try:
+                records = read_records(source, _input_format(args.input, args.format), field)
+                return await run_batch(client, method, records, output, args.concurrency, args.checkpoint, defaults,
+                                       converters, None if args.no_progress else sys.stderr)
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+                if output is not sys.stdout:
+                    output.close()
+
+    try:
+        report = asyncio.run(run())
+    except KeyboardInterrupt:
+        sys.stderr.write("\nInterrupted; rerun with the same --checkpoint to resume.\n")
+        return 130
+    summary = report.summary()
+    sys.stderr.write(f"{summary['requests']} calls, {summary['errors']} failed in {summary['duration']:.2f}s "
+                     f"({summary['throughput']:.1f}/s); latency p50 {summary['p50'] * 1000:.0f} ms, "
+                     f"p90 {summary['p90'] * 1000:.0f} ms, p99 {summary['p99'] * 1000:.0f} ms\n")
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
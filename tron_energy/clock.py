@@ -0,0 +1,70 @@
+from collections.abc import Mapping
+from email.utils import parsedate_tz, mktime_tz
+from time import time
+
+from .snapshot import is_fresh
+
+
+class ClockOffset:
+    """
+    Estimates the offset between the local clock and the server clock from HTTP `Date` headers.
+
+    Each response gives one sample: the server time (the `Date` header plus half a second, since it is
+    truncated to whole seconds) minus the local midpoint of the request. Samples are smoothed with an
+    exponentially weighted moving average whose weight shrinks with the round-trip time, so slow
+    responses, whose midpoint is the least certain, barely move the estimate.
+    """
+
+    def __init__(self, alpha:float=0.1):
+        """
+        Parameters:
+            alpha (float, optional): Smoothing factor given to a sample with the fastest round trip seen. Defaults to 0.1.
+        """
+        self.alpha = alpha
+        self.offset = 0.0
+        self.samples = 0
+        self._min_rtt = None
+
+    def time(self):
+        """
+        Returns:
+            float: The current time corrected to the server clock.
+        """
+        return time() + self.offset
+
+    def update(self, date:str, sent:float, received:float):
+        """
+        Adds one sample.
+
+        Parameters:
+            date (str): The `Date` header of the response.
+            sent (float): Local time at which the request was sent.
+            received (float): Local time at which the response was received.
+        """
+        parsed = parsedate_tz(date) if isinstance(date, str) else None
+        if parsed is None:
+            return
+        rtt = max(received - sent, 1e-6)
+        sample = mktime_tz(parsed) + 0.5 - (sent + received) / 2
+        if self._min_rtt is None or rtt < self._min_rtt:
+            self._min_rtt = rtt
+        if self.samples == 0:
+            self.offset = sample
+        else:
+            self.offset += self.alpha * (self._min_rtt / rtt) * (sample - self.offset)
+        self.samples += 1
+
+    def snapshot(self):
+        return {"offset": self.offset, "samples": self.samples, "min_rtt": self._min_rtt, "taken": time()}
+
+    def restore(self, state:dict):
+        """Resumes from a `snapshot`, unless it is too old to describe the server clock."""
+        if state and state["samples"] and is_fresh(state["taken"], "clock"):
+            self.offset = state["offset"]
+            self.samples = state["samples"]
+            self._min_rtt = state["min_rtt"]
+
+    def observe(self, headers, sent:float, received:float):
+        """Adds the sample carried by a response's headers, if any."""
+        if isinstance(headers, Mapping):
+            self.update(headers.get("Date"), sent, received)
@@ -0,0 +1,104 @@
+import asyncio
+
+from .address import validate_address
+
+
+class _Batch:
+
+    def __init__(self, future:asyncio.Future):
+        self.future = future
+        self.energy = 0
+        self.requests = 0
+        self.timer = None
+
+
+class OrderCoalescer:
+    """
+    Merges concurrent `place_order` calls for the same address and period into one order.
+
+    The first request for an `(address, period)` opens a batch that stays open for `window` seconds;
+    every request for the same key in that time adds its `energy_amount` to the batch. When the window
+    ends the batch is placed as a single order and its response is handed to every waiter, so no
+    request waits longer than `window` before its order is sent. A batch is sent early when adding a
+    request would take it above `max_energy`.
+
+    Requests with an `out_trade_no` or `callback_url` identify one order and are placed on their own.
+    """
+
+    def __init__(self, client, window:float=0.2, max_energy:int=None):
+        """
+        Parameters:
+            client (AsyncTronEnergy): The client used to place the orders.
+            window (float, optional): Seconds a batch collects requests before it is placed. Defaults to 0.2.
+            max_energy (int, optional): Largest merged `energy_amount` of one order. Unlimited if not given.
+        """
+        if window < 0:
+            raise ValueError("window must not be negative")
+        self.client = client
+        self.window = window
+        self.max_energy = max_energy
+        self.stats = {"requests": 0, "orders": 0}
+        self._batches = {}
+        self._sending = set()
+
+    async def place_order(self, receive_address:str, energy_amount:int, period:str='1H', out_trade_no:str=None,
+                          callback_url:str=None):
+        """
+        Places an energy order, merged with the other requests for the same address and period.
+
+        Parameters:
+            receive_address (str): The Tron address where the energy will be received.
+            energy_amount (int): The amount of energy this request needs.
+            period (str, optional): The period for which the energy is to be ordered. Defaults to '1H'.
+            out_trade_no (str, optional): The unique identifier for the order. Disables merging.
+            callback_url (str, optional): The URL the API calls back when the order is fulfilled. Disables merging.
+
+        Returns:
+            dict: The response of the merged order, whose `amount` covers every merged request.
+        """
+        self.stats["requests"] += 1
+        if out_trade_no or callback_url:
+            self.stats["orders"] += 1
+            return await self.client.place_order(receive_address, energy_amount, period, out_trade_no, callback_url)
+        if getattr(self.client, "validate_addresses", False):
+            validate_address(receive_address)
+        key = (receive_address, period)
+        batch = self._batches.get(key)
+        if batch is not None and self.max_energy and batch.energy + energy_amount > self.max_energy:
+            self._send(key)
+            batch = None
+        if batch is None:
+            loop = asyncio.get_running_loop()
+            batch = self._batches[key] = _Batch(loop.create_future())
+            # Nobody may be left to read the outcome if every waiter was cancelled.
+            batch.future.add_done_callback(lambda future: future.cancelled() or future.exception())
+            batch.timer = loop.call_later(self.window, self._send, key)
+        batch.energy += energy_amount
+        batch.requests += 1
+        return dict(await asyncio.shield(batch.future))
+
+    def _send(self, key:tuple):
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        self.stats["orders"] += 1
+        task = asyncio.ensure_future(self._place(key, batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _place(self, key:tuple, batch:_Batch):
+        receive_address, period = key
+        try:
+            response = await self.client.place_order(receive_address, batch.energy, period)
+        except Exception as e:
+            batch.future.set_exception(e)
+        else:
+            batch.future.set_result(response)
+
+    async def flush(self):
+        """Places every open batch now and waits until all orders have been answered."""
+        for key in list(self._batches):
+            self._send(key)
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
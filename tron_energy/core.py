@@ -0,0 +1,190 @@
+import hmac
+import json
+import hashlib
+from urllib.parse import urljoin
+
+
+class HttpRequest:
+    """A signed request ready to be sent by a transport."""
+
+    __slots__ = ("method", "url", "params", "body", "headers")
+
+    def __init__(self, method:str, url:str, params:dict=None, body:str=None, headers:dict=None):
+        self.method = method
+        self.url = url
+        self.params = params
+        self.body = body
+        self.headers = headers or {}
+
+    def __repr__(self):
+        return f"HttpRequest({self.method!r}, {self.url!r})"
+
+
+class HttpResponse:
+    """
+    The status, headers and raw body of a response, as returned by a transport.
+
+    For a streamed response `body` is an iterable of byte chunks, or an async iterable with an async transport.
+    """
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status:int, headers, body:bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class HTTPStatusError(Exception):
+    """
+    Raised by both clients for a response outside the 2xx range, whatever the transport.
+
+    `status` holds the HTTP status and `body` the decoded JSON body, or the raw text if it is not JSON.
+    """
+
+    def __init__(self, status:int, body):
+        super().__init__(f"{status}: {body}")
+        self.status = status
+        self.body = body
+
+
+def session_headers(api_key:str):
+    """
+    Returns:
+        dict: The headers sent with every request of an account.
+    """
+    return {"Content-Type": "application/json", "API-KEY": api_key}
+
+
+def jsonify(data:dict):
+    """
+    Returns:
+        str: The canonical JSON of a request body, which is also the signed payload. Empty for no data.
+    """
+    if data:
+        return json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return ""
+
+
+def sign(api_secret:str, message:str):
+    """
+    Returns:
+        str: The hex HMAC-SHA256 of `message` with the API secret.
+    """
+    return hmac.new(api_secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+def build_request(base_url:str, method:str, url:str, data:dict, api_secret:str, timestamp:str):
+    """
+    Builds the request of an API call without sending it.
+
+    POST bodies are sent as canonical JSON and signed over `timestamp&body`; GET data becomes the query string.
+
+    Parameters:
+        base_url (str): The endpoint, e.g. 'https://itrx.io/'.
+        method (str): 'GET' or 'POST'.
+        url (str): The path of the call.
+        data (dict): The body or query parameters.
+        api_secret (str): The secret the body is signed with.
+        timestamp (str): The TIMESTAMP header, in seconds since the epoch.
+
+    Returns:
+        HttpRequest: The request. Its headers do not include `session_headers`.
+    """
+    headers = {"TIMESTAMP": timestamp}
+    if method.upper() == "POST":
+        body = jsonify(data)
+        headers["SIGNATURE"] = sign(api_secret, f'{timestamp}&{body}')
+        return HttpRequest("POST", urljoin(base_url, url), body=body, headers=headers)
+    return HttpRequest(method.upper(), urljoin(base_url, url), params=data, headers=headers)
+
+
+def parse_response(response:HttpResponse, error:type=HTTPStatusError):
+    """
+    Decodes the JSON body of a response.
+
+    Parameters:
+        response (HttpResponse): The response.
+        error (type, optional): The `HTTPStatusError` subclass raised, e.g. the `status_error` of a transport.
+
+    Returns:
+        The decoded body.
+
+    Raises:
+        HTTPStatusError: If the status is not 2xx.
+    """
+    try:
+        body = json.loads(response.body) if response.body else None
+    except ValueError as e:
+        if not 200 <= response.status < 300:
+            raise error(response.status, response.body.decode(errors="replace"))
+        raise Exception(f"Failed to decode JSON: {e}")
+    if not 200 <= response.status < 300:
+        raise error(response.status, body)
+    return body
+
+
+# The endpoints of the API. Each function returns the `(method, url, data)` of one call, ready for
+# `make_request`, so that the sync and async clients only differ in how they send it.
+
+def public_data():
+    return "GET", "/api/v1/frontend/index-data", None
+
+
+def place_order(receive_address:str, energy_amount:int, period:str='1H', out_trade_no:str=None, callback_url:str=None):
+    data = {
+        "receive_address": receive_address,
+        "energy_amount": energy_amount,
+        "period": period,
+    }
+    if out_trade_no:
+        data["out_trade_no"] = out_trade_no
+    if callback_url:
+        data["callback_url"] = callback_url
+    return "POST", "/api/v1/frontend/order", data
+
+
+def transfer_small_trx_amount(amount:int, receive_address:str):
+    return "POST", "/api/v1/frontend/order/transfer", {"amount": amount, "receive_address": receive_address}
+
+
+def purchase_by_number_of_transfers(times:int, receive_address:str):
+    return "POST", "/api/v1/frontend/count-delegate-policy", {"times": times, "receive_address": receive_address}
+
+
+def list_purchases_by_number_of_transfers(receive_address:str=None):
+    return "GET", "/api/v1/frontend/count-delegate-policy", {"receive_address": receive_address} if receive_address else None
+
+
+def create_smart_delegate(period:int, receive_address:str, max_energy:int=None):
+    data = {
+        "period": period,
+        "receive_address": receive_address,
+    }
+    if max_energy:
+        data["max_energy"] = max_energy
+    return "POST", "/api/v1/frontend/auto-delegate-policy", data
+
+
+def list_smart_delegate(receive_address:str=None):
+    return "GET", "/api/v1/frontend/auto-delegate-policy", {"receive_address": receive_address} if receive_address else None
+
+
+def modify_smart_delegate(id:int, status:bool):
+    return "POST", f"/api/v1/frontend/auto-delegate-policy/{id}/change-status", {"status": int(status)}
+
+
+def get_order(order_no:str):
+    return "GET", "/api/v1/frontend/order/query", {"serial": order_no}
+
+
+def recycle_order(order_no:str):
+    return "POST", "/api/v1/frontend/order/reclaim", {"serial": order_no}
+
+
+def estimate_order(energy_amount:int, period:str="1H"):
+    return "GET", "/api/v1/frontend/order/price", {"energy_amount": energy_amount, "period": period}
+
+
+def api_usage_summary():
+    return "GET", "/api/v1/frontend/userapi/summary", None
@@ -0,0 +1,242 @@
+import os
+import json
+import asyncio
+import itertools
+import multiprocessing
+import multiprocessing.util
+from time import monotonic, sleep
+
+from .tron_energy import TronEnergy
+from .async_tron_energy import AsyncTronEnergy
+from .limiter import AdaptiveLimit
+from .scheduler import async_concurrency_slots, max_concurrency
+
+
+class RateBudget:
+    """
+    A request budget shared by every process of a pool.
+
+    The budget is a GCRA (virtual scheduling) token bucket whose single state variable lives in
+    shared memory, so all workers draw from one global rate no matter how many processes there are.
+    """
+
+    def __init__(self, rate:float, burst:int=1, context=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        context = context or multiprocessing.get_context()
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._interval = 1.0 / self.rate
+        self._tolerance = (self.burst - 1) * self._interval
+        self._tat = context.Value('d', 0.0)
+
+    def reserve(self):
+        """
+        Reserves one request slot.
+
+        Returns:
+            float: The number of seconds the caller has to wait before sending the request.
+        """
+        now = monotonic()
+        with self._tat.get_lock():
+            tat = max(self._tat.value, now)
+            self._tat.value = tat + self._interval
+        return max(0.0, tat - self._tolerance - now)
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            sleep(delay)
+
+    async def async_acquire(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class DispatchError(Exception):
+    """Returned in place of a result when the order spec at that position failed."""
+
+    def __init__(self, spec:dict, message:str):
+        super().__init__(message)
+        self.spec = spec
+
+
+_worker_client = None
+_worker_budget = None
+_worker_loop = None
+_worker_concurrency = 1
+_worker_slot = None
+
+
+def _init_worker(client_class, api_key, api_secret, budget, concurrency):
+    global _worker_client, _worker_budget, _worker_loop, _worker_concurrency
+    _worker_client = client_class(api_key=api_key, api_secret=api_secret)
+    _worker_budget = budget
+    _worker_concurrency = concurrency
+    if asyncio.iscoroutinefunction(_worker_client.place_order):
+        _worker_loop = asyncio.new_event_loop()
+    # Runs when the pool is closed and the worker exits on its own; a terminated worker is simply killed.
+    multiprocessing.util.Finalize(None, _close_worker, exitpriority=10)
+
+
+def _close_worker():
+    close = getattr(_worker_client, "close", None)
+    if _worker_loop is not None:
+        if close is not None:
+            _worker_loop.run_until_complete(close())
+        _worker_loop.close()
+    elif close is not None:
+        close()
+
+
+def _describe(error):
+    return f"{type(error).__name__}: {error}"
+
+
+def _place_order(spec):
+    if _worker_budget is not None:
+        _worker_budget.acquire()
+    try:
+        return True, _worker_client.place_order(**spec)
+    except Exception as e:
+        return False, _describe(e)
+
+
+async def _async_place_order(spec, slot):
+    # The budget is taken before the slot so that an adaptive limit only times the request itself,
+    # and errors leave the slot before they are caught so that it sees overload responses.
+    if _worker_budget is not None:
+        await _worker_budget.async_acquire()
+    try:
+        async with slot():
+            return True, await _worker_client.place_order(**spec)
+    except Exception as e:
+        return False, _describe(e)
+
+
+async def _async_run_chunk(chunk):
+    global _worker_slot
+    # One slot factory per worker, so an adaptive limit keeps what it learned from chunk to chunk.
+    if _worker_slot is None:
+        _worker_slot = async_concurrency_slots(_worker_concurrency)
+    return await asyncio.gather(*(_async_place_order(spec, _worker_slot) for _, spec in chunk))
+
+
+def _run_chunk(chunk):
+    if _worker_loop is not None:
+        outcomes = _worker_loop.run_until_complete(_async_run_chunk(chunk))
+    else:
+        outcomes = [_place_order(spec) for _, spec in chunk]
+    return [(index, ok, value if ok else (spec, value)) for (index, spec), (ok, value) in zip(chunk, outcomes)]
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class OrderDispatcher:
+    """
+    Shards a stream of `place_order` specs across a pool of worker processes.
+
+    Each worker owns its own client, so signing, JSON encoding and TLS run in parallel. With
+    `concurrency` greater than one the workers use `AsyncTronEnergy` and keep that many orders in
+    flight each. A worker finishes a chunk before it takes the next one, so chunks hold at least
+    `concurrency` specs. All workers share one `RateBudget`, and results are yielded in the order of
+    the input specs.
+    """
+
+    def __init__(self, api_key:str=None, api_secret:str=None, processes:int=None, rate:float=None, burst:int=1,
+                 concurrency=1, chunksize:int=16, checkpoint:str=None, client_class=None, context=None):
+        """
+        Parameters:
+            api_key (str, optional): The API key, read from `TRON_ENERGY_API_KEY` by the workers if not given.
+            api_secret (str, optional): The API secret, read from `TRON_ENERGY_API_SECRET` by the workers if not given.
+            processes (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            rate (float, optional): Global limit of orders per second across all workers. Unlimited if not given.
+            burst (int, optional): Number of orders that may be sent back to back before `rate` applies. Defaults to 1.
+            concurrency (int or AdaptiveLimit, optional): Orders kept in flight per worker. Values above 1 select `AsyncTronEnergy`.
+            chunksize (int, optional): Number of specs sent to a worker at a time. Defaults to 16, and is raised to
+                `concurrency` if lower. Larger chunks keep more orders in flight while the slowest of a chunk finish.
+            checkpoint (str, optional): Path of a file recording progress, used to resume an interrupted job.
+            client_class (type, optional): The client class instantiated in every worker.
+            context (optional): The multiprocessing context to use.
+        """
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self.processes = processes or os.cpu_count() or 1
+        self.concurrency = concurrency if isinstance(concurrency, AdaptiveLimit) else max(1, concurrency)
+        self.chunksize = max(1, chunksize, max_concurrency(self.concurrency))
+        self.checkpoint = checkpoint
+        self._context = context or multiprocessing.get_context()
+        self.budget = RateBudget(rate, burst, self._context) if rate else None
+        if client_class is None:
+            client_class = AsyncTronEnergy if max_concurrency(self.concurrency) > 1 else TronEnergy
+        self.client_class = client_class
+
+    def _load_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0, {}
+        with open(self.checkpoint) as f:
+            state = json.load(f)
+        return int(state["done"]), {int(index): tuple(outcome) for index, outcome in state.get("pending", {}).items()}
+
+    def _save_checkpoint(self, done:int, pending:dict):
+        if not self.checkpoint:
+            return
+        state = {"done": done}
+        if pending:
+            state["pending"] = {str(index): outcome for index, outcome in pending.items()}
+        tmp = f"{self.checkpoint}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.checkpoint)
+
+    def run(self, specs):
+        """
+        Places an order for every spec.
+
+        Chunks are recorded in the checkpoint as soon as a worker returns them, in whatever order they
+        finish, together with the results not yet yielded. A resumed job therefore never places an order
+        twice: it yields the recorded results first and only sends the specs that were never placed.
+
+        Parameters:
+            specs (iterable): Dictionaries of `place_order` keyword arguments.
+
+        Returns:
+            generator: One item per spec, in spec order. Specs that were already yielded according to
+            the checkpoint are skipped. Failed orders yield a `DispatchError` instead of a response dict and
+            count as completed, so they are not retried on resume.
+        """
+        done, pending = self._load_checkpoint()
+
+        def ready():
+            nonlocal done
+            while done in pending:
+                ok, value = pending.pop(done)
+                done += 1
+                yield value if ok else DispatchError(*value)
+
+        # The pool reads the specs from another thread while `ready` empties `pending`, so take a copy.
+        placed = set(pending)
+        remaining = (item for item in itertools.islice(enumerate(specs), done, None) if item[0] not in placed)
+        chunks = _chunked(remaining, self.chunksize)
+        initargs = (self.client_class, self._api_key, self._api_secret, self.budget, self.concurrency)
+        try:
+            yield from ready()
+            with self._context.Pool(self.processes, initializer=_init_worker, initargs=initargs) as pool:
+                for outcomes in pool.imap_unordered(_run_chunk, chunks):
+                    for index, ok, value in outcomes:
+                        pending[index] = (ok, value)
+                    self._save_checkpoint(done, pending)
+                    yield from ready()
+                # Let the workers exit on their own so that they close their clients.
+                pool.close()
+                pool.join()
+        finally:
+            self._save_checkpoint(done, pending)
@@ -0,0 +1,162 @@
+import threading
+from time import monotonic, time
+
+from .limiter import is_overload
+from .snapshot import is_fresh
+
+
+PROBE_PATH = "/api/v1/frontend/index-data"
+
+
+def is_endpoint_failure(error:BaseException):
+    """
+    Tells whether an exception means the endpoint itself is failing.
+
+    Server errors (5xx), timeouts and connection failures count. Rate limiting (429) does not, since the
+    limit applies to the account on every endpoint.
+    """
+    status = getattr(error, "status", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return is_overload(error) and status != 429
+
+
+class _Endpoint:
+
+    def __init__(self, url:str):
+        self.url = url
+        self.latency = None
+        self.errors = 0.0
+        self.failures = 0
+        self.healthy = True
+        self.next_probe = 0.0
+        self.probing = False
+
+
+class EndpointSelector:
+    """
+    Picks the base URL of each request among several API endpoints.
+
+    Every response updates a moving average of the latency and the error rate of its endpoint, and
+    each request goes to the healthy endpoint with the lowest latency weighted by its error rate.
+    Endpoints that have not answered yet are tried first. After `max_failures` failures in a row an
+    endpoint is taken out of rotation until a background probe of `PROBE_PATH` succeeds; probes are
+    repeated every `probe_interval` seconds.
+    """
+
+    def __init__(self, urls, smoothing:float=0.2, max_failures:int=3, probe_interval:float=5.0, clock=monotonic):
+        """
+        Parameters:
+            urls (list): The base URLs, e.g. regional or fallback hosts.
+            smoothing (float, optional): Weight of each new sample in the moving averages. Defaults to 0.2.
+            max_failures (int, optional): Failures in a row that take an endpoint out of rotation. Defaults to 3.
+            probe_interval (float, optional): Seconds between probes of an unhealthy endpoint. Defaults to 5.
+            clock (callable, optional): Returns the current time in seconds. Defaults to `time.monotonic`.
+        """
+        if not urls:
+            raise ValueError("At least one endpoint is required")
+        self.smoothing = smoothing
+        self.max_failures = max_failures
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self._endpoints = {url: _Endpoint(url) for url in urls}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._endpoints)
+
+    def _score(self, endpoint:_Endpoint):
+        return (endpoint.latency or 0.0) * (1.0 + 4.0 * endpoint.errors)
+
+    def choose(self, exclude=()):
+        """
+        Returns:
+            str: The best endpoint not in `exclude`. Unhealthy endpoints are only returned when no other is left.
+        """
+        with self._lock:
+            candidates = [endpoint for url, endpoint in self._endpoints.items() if url not in exclude]
+            healthy = [endpoint for endpoint in candidates if endpoint.healthy]
+            if healthy:
+                return min(healthy, key=self._score).url
+            if candidates:
+                return min(candidates, key=lambda endpoint: endpoint.failures).url
+            return min(self._endpoints.values(), key=lambda endpoint: endpoint.failures).url
+
+    def observe(self, url:str, latency:float, failed:bool=False):
+        """
+        Adds the outcome of one request.
+
+        Parameters:
+            url (str): The endpoint the request was sent to.
+            latency (float): Seconds until the response or error.
+            failed (bool, optional): Whether the endpoint failed, see `is_endpoint_failure`. Defaults to False.
+        """
+        with self._lock:
+            endpoint = self._endpoints[url]
+            if failed:
+                endpoint.errors += self.smoothing * (1.0 - endpoint.errors)
+                endpoint.failures += 1
+                if endpoint.healthy and endpoint.failures >= self.max_failures:
+                    endpoint.healthy = False
+                    endpoint.next_probe = self.clock() + self.probe_interval
+                return
+            endpoint.errors -= self.smoothing * endpoint.errors
+            endpoint.failures = 0
+            endpoint.healthy = True
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += self.smoothing * (latency - endpoint.latency)
+
+    def due_probes(self):
+        """
+        Returns:
+            list: The unhealthy endpoints whose probe is due. They are marked as being probed until `probed` is called.
+        """
+        now = self.clock()
+        due = []
+        with self._lock:
+            for endpoint in self._endpoints.values():
+                if not endpoint.healthy and not endpoint.probing and now >= endpoint.next_probe:
+                    endpoint.probing = True
+                    due.append(endpoint.url)
+        return due
+
+    def probed(self, url:str, latency:float, failed:bool):
+        """Records the outcome of a probe started through `due_probes`."""
+        with self._lock:
+            endpoint = self._endpoints[url]
+            endpoint.probing = False
+            if failed:
+                endpoint.next_probe = self.clock() + self.probe_interval
+                return
+        self.observe(url, latency)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: The measurements of every endpoint, for `restore` after a restart.
+        """
+        with self._lock:
+            endpoints = {url: [endpoint.latency, endpoint.errors, endpoint.failures, endpoint.healthy]
+                         for url, endpoint in self._endpoints.items()}
+        return {"taken": time(), "endpoints": endpoints}
+
+    def restore(self, state:dict):
+        """Resumes the measurements of a recent `snapshot` for the endpoints that are still configured."""
+        if not state or not is_fresh(state["taken"], "endpoints"):
+            return
+        now = self.clock()
+        with self._lock:
+            for url, (latency, errors, failures, healthy) in state["endpoints"].items():
+                endpoint = self._endpoints.get(url)
+                if endpoint is not None:
+                    endpoint.latency, endpoint.errors, endpoint.failures, endpoint.healthy = latency, errors, failures, healthy
+                    endpoint.next_probe = now
+
+    def stats(self):
+        """
+        Returns:
+            dict: The smoothed latency, error rate and health of every endpoint, keyed by URL.
+        """
+        with self._lock:
+            return {url: {"latency": endpoint.latency, "errors": endpoint.errors, "healthy": endpoint.healthy}
+                    for url, endpoint in self._endpoints.items()}
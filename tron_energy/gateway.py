@@ -0,0 +1,231 @@
+import json
+import asyncio
+import argparse
+from collections import OrderedDict
+from time import monotonic, time
+from urllib.parse import urljoin, urlsplit
+from aiohttp import web
+
+from .tron_energy import TronEnergy
+from .async_tron_energy import AsyncTronEnergy
+from .dispatcher import RateBudget
+from .scheduler import async_concurrency_slots
+from .core import HttpRequest, HTTPStatusError, parse_response
+from .transport import RequestsTransport, AiohttpTransport
+
+
+API_PREFIX = "/api/v1/frontend/"
+
+DEFAULT_CACHE_TTL = {
+    "/api/v1/frontend/index-data": 2.0,
+    "/api/v1/frontend/order/price": 2.0,
+}
+
+
+def _relative(link):
+    # Rewrites an upstream pagination link so that gateway clients follow it through the gateway.
+    if not isinstance(link, str):
+        return link
+    parts = urlsplit(link)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+class Gateway:
+    """
+    A local HTTP service that exposes the itrx endpoints to internal consumers through one `AsyncTronEnergy`.
+
+    The gateway owns the credentials and signing, caches read endpoints for a short TTL, coalesces
+    identical concurrent GET requests into one upstream call and applies a single rate limit and
+    concurrency cap to all upstream traffic. Consumers talk to it with `GatewayClient` or
+    `AsyncGatewayClient`, which do not sign requests.
+    """
+
+    def __init__(self, client:AsyncTronEnergy, cache_ttl:dict=None, max_cache_entries:int=10000, rate:float=None,
+                 burst:int=1, concurrency=64):
+        """
+        Parameters:
+            client (AsyncTronEnergy): The client used for upstream requests.
+            cache_ttl (dict, optional): Seconds to cache the GET responses of each path. Defaults to public data and price estimates.
+            max_cache_entries (int, optional): Maximum number of cached responses. Defaults to 10000.
+            rate (float, optional): Upstream requests per second. Unlimited if not given.
+            burst (int, optional): Upstream requests that may be sent back to back before `rate` applies. Defaults to 1.
+            concurrency (int or AdaptiveLimit, optional): Maximum number of upstream requests in flight. Defaults to 64.
+        """
+        self.client = client
+        self.cache_ttl = DEFAULT_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.max_cache_entries = max_cache_entries
+        self.budget = RateBudget(rate, burst) if rate else None
+        self.concurrency = concurrency
+        self.stats = {"requests": 0, "upstream": 0, "cache_hits": 0, "coalesced": 0, "errors": 0}
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._slot = None
+        self._runner = None
+
+    @property
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/gateway/stats", self._handle_stats)
+        app.router.add_route("*", API_PREFIX + "{tail:.*}", self._handle_api)
+        return app
+
+    async def _upstream(self, method:str, path:str, data:dict):
+        if self._slot is None:
+            self._slot = async_concurrency_slots(self.concurrency)
+        async with self._slot():
+            if self.budget is not None:
+                await self.budget.async_acquire()
+            self.stats["upstream"] += 1
+            response = await self.client.make_request(method, path, data)
+        if isinstance(response, dict):
+            for key in ("next", "previous"):
+                if key in response:
+                    response[key] = _relative(response[key])
+        return response
+
+    async def _cached_get(self, path:str, data:dict):
+        key = (path, tuple(sorted(data.items())))
+        ttl = self.cache_ttl.get(path)
+        if ttl:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > monotonic():
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return entry[1]
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task)
+        task = asyncio.ensure_future(self._upstream("GET", path, data or None))
+        self._inflight[key] = task
+        try:
+            response = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+        if ttl:
+            self._cache[key] = (monotonic() + ttl, response)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+        return response
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: The cached responses that have not expired, with their wall-clock expiry, for `save_snapshot`.
+        """
+        offset = time() - monotonic()
+        return {"entries": [[path, [list(item) for item in params], expires + offset, response]
+                            for (path, params), (expires, response) in self._cache.items() if expires > monotonic()]}
+
+    def restore(self, state:dict):
+        """Fills the response cache from a `snapshot`, skipping entries that have expired since."""
+        offset = time() - monotonic()
+        for path, params, expires, response in state.get("entries", ()):
+            if expires > time() and path in self.cache_ttl:
+                self._cache[(path, tuple(tuple(item) for item in params))] = (expires - offset, response)
+        while len(self._cache) > self.max_cache_entries:
+            self._cache.popitem(last=False)
+
+    async def _handle_api(self, request:web.Request):
+        self.stats["requests"] += 1
+        try:
+            if request.method == "GET":
+                response = await self._cached_get(request.path, dict(request.query))
+            elif request.method == "POST":
+                body = await request.read()
+                response = await self._upstream("POST", request.path, json.loads(body) if body else None)
+            else:
+                raise web.HTTPMethodNotAllowed(request.method, ["GET", "POST"])
+        except HTTPStatusError as e:
+            self.stats["errors"] += 1
+            message = e.body if isinstance(e.body, (dict, list)) else {"detail": str(e.body)}
+            return web.json_response(message, status=e.status)
+        except web.HTTPException:
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            return web.json_response({"detail": f"{type(e).__name__}: {e}"}, status=502)
+        return web.json_response(response)
+
+    async def _handle_stats(self, request:web.Request):
+        return web.json_response(dict(self.stats, cache_entries=len(self._cache)))
+
+    async def start(self, host:str="127.0.0.1", port:int=8080):
+        """
+        Starts serving in the running event loop.
+
+        Returns:
+            int: The port the gateway listens on, useful with `port=0`.
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class GatewayClient(TronEnergy):
+    """A `TronEnergy` that talks to a `Gateway` instead of itrx. It holds no credentials and does not sign."""
+
+    def __init__(self, gateway_url:str, **kwargs):
+        kwargs.setdefault("transport", RequestsTransport(headers={"Content-Type": "application/json"}))
+        super().__init__(api_key="gateway", api_secret="gateway", **kwargs)
+        self.base_url = gateway_url
+
+    def _gateway_request(self, method:str, url:str, data:dict=None):
+        if method.upper() == "POST":
+            return HttpRequest("POST", urljoin(self.base_url, url), body=self._jsonify(data))
+        return HttpRequest(method.upper(), urljoin(self.base_url, url), params=data)
+
+    def _dispatch(self, method:str, url:str, data:dict=None, priority:str=None):
+        return parse_response(self.transport.send(self._gateway_request(method, url, data)), self.transport.status_error)
+
+
+class AsyncGatewayClient(AsyncTronEnergy):
+    """An `AsyncTronEnergy` that talks to a `Gateway` instead of itrx. It holds no credentials and does not sign."""
+
+    def __init__(self, gateway_url:str, **kwargs):
+        kwargs.setdefault("transport", AiohttpTransport(headers={"Content-Type": "application/json"}))
+        super().__init__(api_key="gateway", api_secret="gateway", **kwargs)
+        self.base_url = gateway_url
+
+    _gateway_request = GatewayClient._gateway_request
+
+    async def _dispatch(self, method:str, url:str, data:dict=None, priority:str=None):
+        response = await self.transport.send(self._gateway_request(method, url, data))
+        return parse_response(response, self.transport.status_error)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local itrx gateway. Credentials are read from "
+                                                 "TRON_ENERGY_API_KEY and TRON_ENERGY_API_SECRET.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--rate", type=float, default=None, help="upstream requests per second")
+    parser.add_argument("--concurrency", type=int, default=64, help="upstream requests in flight")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        async with AsyncTronEnergy() as client:
+            gateway = Gateway(client, rate=args.rate, concurrency=args.concurrency)
+            await gateway.start(args.host, args.port)
+            print(f"Gateway listening on http://{args.host}:{args.port}/")
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await gateway.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import math
+import asyncio
+import threading
+from aiohttp import ClientConnectionError
+
+
+def is_overload(error:BaseException):
+    """
+    Tells whether an exception signals an overloaded or unreachable server.
+
+    Rate limiting (429), server errors (5xx), timeouts and connection failures count; client errors
+    such as a rejected order do not, since sending less would not have avoided them.
+    """
+    status = getattr(error, "status", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(error, (OSError, asyncio.TimeoutError, ClientConnectionError))
+
+
+class AdaptiveLimit:
+    """
+    A concurrency limit that follows the latency and error rate of the server.
+
+    Each completed request updates the limit with a gradient: while the smoothed round-trip time stays
+    within `tolerance` times the best one seen, the limit grows by about `sqrt(limit)` headroom; as
+    queues build up server side and latency rises, the gradient drops below one and the limit shrinks
+    towards the level the server sustains. Overload errors cut it multiplicatively by `backoff`.
+
+    Pass it as `slots` to `PriorityScheduler` or `AsyncPriorityScheduler`, or as `concurrency` to the
+    bulk APIs.
+    """
+
+    def __init__(self, initial:int=10, min_limit:int=1, max_limit:int=200, tolerance:float=1.5, backoff:float=0.9,
+                 smoothing:float=0.2):
+        """
+        Parameters:
+            initial (int, optional): The starting limit. Defaults to 10.
+            min_limit (int, optional): The lowest limit. Defaults to 1.
+            max_limit (int, optional): The highest limit. Defaults to 200.
+            tolerance (float, optional): Latency inflation over the best round trip accepted before shrinking. Defaults to 1.5.
+            backoff (float, optional): Factor applied to the limit on an overload error. Defaults to 0.9.
+            smoothing (float, optional): Weight of each new sample in the limit and latency averages. Defaults to 0.2.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.estimate = float(initial)
+        self.min_rtt = None
+        self.rtt = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self):
+        """The current number of requests allowed in flight."""
+        return max(self.min_limit, min(self.max_limit, int(self.estimate)))
+
+    def update(self, rtt:float, error:bool=False, in_flight:int=None):
+        """
+        Adds one completed request.
+
+        Parameters:
+            rtt (float): Round-trip time of the request in seconds.
+            error (bool, optional): Whether the request failed because of overload. Defaults to False.
+            in_flight (int, optional): Requests in flight when it completed; the limit only grows when it is used.
+        """
+        with self._lock:
+            if error:
+                self.estimate = max(self.min_limit, self.estimate * self.backoff)
+                return
+            if self.min_rtt is None or rtt < self.min_rtt:
+                self.min_rtt = rtt
+            else:
+                # Let the baseline follow a lasting slowdown, so the limit does not collapse forever.
+                self.min_rtt += (rtt - self.min_rtt) * 0.001
+            self.rtt = rtt if self.rtt is None else self.rtt + self.smoothing * (rtt - self.rtt)
+            gradient = max(0.5, min(1.0, self.tolerance * self.min_rtt / self.rtt))
+            if gradient >= 1.0 and in_flight is not None and in_flight < self.estimate / 2:
+                return
+            target = self.estimate * gradient + math.sqrt(self.estimate)
+            estimate = self.estimate + self.smoothing * (target - self.estimate)
+            self.estimate = max(self.min_limit, min(self.max_limit, estimate))
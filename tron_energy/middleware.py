@@ -0,0 +1,111 @@
+class Request:
+    """
+    A request passing through the middleware chain.
+
+    Middleware may read and change `method`, `url`, `data` and `priority` before calling the next
+    handler, and use `context` to pass values to middleware further down the chain.
+    """
+
+    __slots__ = ("method", "url", "data", "priority", "context")
+
+    def __init__(self, method:str, url:str, data:dict=None, priority:str=None):
+        self.method = method
+        self.url = url
+        self.data = data
+        self.priority = priority
+        self.context = {}
+
+    def __repr__(self):
+        return f"Request({self.method!r}, {self.url!r}, {self.data!r}, priority={self.priority!r})"
+
+
+class Interceptor:
+    """
+    Base class for middleware that only observes or rewrites requests and responses.
+
+    Unlike plain middleware functions, an interceptor does not call the next handler itself, so the same
+    instance works in the chain of both `TronEnergy` and `AsyncTronEnergy`. Override any of the hooks.
+    """
+
+    def before(self, request:Request):
+        """Called before the request is passed on."""
+
+    def after(self, request:Request, response):
+        """
+        Called with the response body of a successful request.
+
+        Returns:
+            The response body handed back up the chain.
+        """
+        return response
+
+    def failed(self, request:Request, error:Exception):
+        """Called with the exception of a failed request, which is re-raised afterwards."""
+
+
+def rate_limit(budget):
+    """
+    Builds async middleware that waits for a `RateBudget` slot before passing each request on.
+
+    Parameters:
+        budget (RateBudget): The budget drawn from.
+    """
+    async def middleware(request:Request, call_next):
+        await budget.async_acquire()
+        return await call_next(request)
+    return middleware
+
+
+def _bind(middleware, call_next):
+    return lambda request: middleware(request, call_next)
+
+
+def _bind_interceptor(interceptor:Interceptor, call_next):
+    def handler(request):
+        interceptor.before(request)
+        try:
+            response = call_next(request)
+        except Exception as e:
+            interceptor.failed(request, e)
+            raise
+        return interceptor.after(request, response)
+    return handler
+
+
+def _bind_async_interceptor(interceptor:Interceptor, call_next):
+    async def handler(request):
+        interceptor.before(request)
+        try:
+            response = await call_next(request)
+        except Exception as e:
+            interceptor.failed(request, e)
+            raise
+        return interceptor.after(request, response)
+    return handler
+
+
+def compose(middleware, handler, asynchronous:bool=False):
+    """
+    Builds a middleware chain around a handler.
+
+    A middleware is called as `middleware(request, call_next)` and returns the response body, usually
+    by calling `call_next(request)`; for `AsyncTronEnergy` both are coroutines. The chain is built once,
+    so a call only goes through one closure per middleware.
+
+    Parameters:
+        middleware (list): Middleware functions and `Interceptor` instances, outermost first.
+        handler (callable): The innermost handler, which sends the request.
+        asynchronous (bool, optional): Whether the handler and middleware are coroutines. Defaults to False.
+
+    Returns:
+        callable: Takes a `Request` and returns the response body, or an awaitable of it.
+    """
+    bind_interceptor = _bind_async_interceptor if asynchronous else _bind_interceptor
+    for layer in reversed(middleware):
+        if isinstance(layer, Interceptor):
+            handler = bind_interceptor(layer, handler)
+        elif callable(layer):
+            handler = _bind(layer, handler)
+        else:
+            raise ValueError(f"Middleware must be callable, got {layer!r}")
+    return handler
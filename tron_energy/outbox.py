@@ -0,0 +1,247 @@
+import os
+import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .scheduler import concurrency_slots, async_concurrency_slots, max_concurrency
+
+
+class OrderOutbox:
+    """
+    A durable, file-backed outbox of order intents.
+
+    Every intent is appended to a JSON-lines log before it is submitted, and an acknowledgement is
+    appended once `place_order` succeeds. Entries without an acknowledgement are loaded again when the
+    outbox is reopened, so an order decided just before a restart is neither lost nor forgotten.
+
+    Log writes are group-committed: `enqueue` only appends to an in-memory buffer and a background
+    thread writes and fsyncs whatever has accumulated, at most every `flush_interval` seconds or as
+    soon as `max_batch` records are waiting.
+    """
+
+    def __init__(self, path:str, flush_interval:float=0.005, max_batch:int=1024):
+        """
+        Parameters:
+            path (str): The log file. It is created if missing and replayed if it exists.
+            flush_interval (float, optional): Longest time in seconds a record waits in memory. Defaults to 5ms.
+            max_batch (int, optional): Number of buffered records that triggers an immediate flush. Defaults to 1024.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.pending = {}
+        self._inflight = set()
+        self._next_id = 1
+        self._buffer = []
+        self._written_id = 0
+        self._durable_id = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._replay()
+        self._file = open(path, "a", encoding="utf-8")
+        self._flusher = threading.Thread(target=self._flush_loop, name="tron-energy-outbox", daemon=True)
+        self._flusher.start()
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            # Only records ending in a newline were written completely. A torn tail from a crash mid-write
+            # was never acknowledged as durable; it is cut off so the next record does not land on it.
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+        for line in data[:end].decode("utf-8").splitlines():
+            if not line:
+                continue
+            record = json.loads(line)
+            if "ack" in record:
+                self.pending.pop(record["ack"], None)
+            else:
+                self.pending[record["id"]] = record["spec"]
+                self._next_id = max(self._next_id, record["id"] + 1)
+
+    def _append(self, record:dict):
+        with self._cond:
+            if self._closed:
+                raise ValueError("outbox is closed")
+            self._buffer.append(json.dumps(record, separators=(',', ':')) + "\n")
+            self._written_id += 1
+            if len(self._buffer) >= self.max_batch:
+                self._cond.notify_all()
+            return self._written_id
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                buffer, self._buffer = self._buffer, []
+                written_id = self._written_id
+                closed = self._closed
+            if buffer:
+                with self._io_lock:
+                    self._file.write("".join(buffer))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+            with self._cond:
+                self._durable_id = written_id
+                self._cond.notify_all()
+            if closed and not buffer:
+                return
+
+    def _wait_durable(self, written_id:int):
+        with self._cond:
+            self._cond.notify_all()
+            while self._durable_id < written_id:
+                self._cond.wait()
+
+    def enqueue(self, spec:dict, sync:bool=False):
+        """
+        Records an order intent.
+
+        Parameters:
+            spec (dict): Keyword arguments for `place_order`.
+            sync (bool, optional): Block until the intent has been fsynced. Defaults to False.
+
+        Returns:
+            int: The id of the outbox entry.
+        """
+        with self._cond:
+            entry_id = self._next_id
+            self._next_id += 1
+            self.pending[entry_id] = spec
+        written_id = self._append({"id": entry_id, "spec": spec})
+        if sync:
+            self._wait_durable(written_id)
+        return entry_id
+
+    def ack(self, entry_id:int):
+        """
+        Marks an entry as submitted so it is not replayed.
+
+        Parameters:
+            entry_id (int): The id returned by `enqueue`.
+        """
+        with self._cond:
+            self.pending.pop(entry_id, None)
+            self._inflight.discard(entry_id)
+        self._append({"ack": entry_id})
+
+    def flush(self):
+        """Blocks until every record appended so far is durable."""
+        with self._cond:
+            written_id = self._written_id
+        self._wait_durable(written_id)
+
+    def _take(self, limit:int, skip):
+        with self._cond:
+            batch = [(i, spec) for i, spec in self.pending.items() if i not in self._inflight and i not in skip]
+            batch = batch[:limit] if limit else batch
+            self._inflight.update(i for i, _ in batch)
+        return batch
+
+    def _release(self, entry_id:int):
+        with self._cond:
+            self._inflight.discard(entry_id)
+
+    async def drain(self, client, concurrency=8, batch_size:int=256):
+        """
+        Submits every pending entry through an `AsyncTronEnergy` client.
+
+        Parameters:
+            client (AsyncTronEnergy): The client used to place the orders.
+            concurrency (int or AdaptiveLimit, optional): Maximum number of orders in flight. Defaults to 8.
+            batch_size (int, optional): Number of entries taken from the outbox at a time. Defaults to 256.
+
+        Returns:
+            dict: The response or exception of every submitted entry, keyed by entry id. Failed entries stay pending.
+        """
+        slot = async_concurrency_slots(concurrency)
+        outcomes = {}
+
+        async def submit(entry_id, spec):
+            try:
+                async with slot():
+                    outcomes[entry_id] = await client.place_order(**spec)
+            except Exception as e:
+                outcomes[entry_id] = e
+                self._release(entry_id)
+            else:
+                self.ack(entry_id)
+
+        while True:
+            batch = self._take(batch_size, outcomes)
+            if not batch:
+                return outcomes
+            await asyncio.gather(*(submit(entry_id, spec) for entry_id, spec in batch))
+
+    def drain_sync(self, client, concurrency=8, batch_size:int=256):
+        """
+        Submits every pending entry through a `TronEnergy` client using a pool of threads.
+
+        Parameters:
+            client (TronEnergy): The client used to place the orders.
+            concurrency (int or AdaptiveLimit, optional): Maximum number of orders in flight. Defaults to 8.
+            batch_size (int, optional): Number of entries taken from the outbox at a time. Defaults to 256.
+
+        Returns:
+            dict: The response or exception of every submitted entry, keyed by entry id. Failed entries stay pending.
+        """
+        slot = concurrency_slots(concurrency)
+        outcomes = {}
+
+        def submit(entry):
+            entry_id, spec = entry
+            try:
+                with slot():
+                    outcomes[entry_id] = client.place_order(**spec)
+            except Exception as e:
+                outcomes[entry_id] = e
+                self._release(entry_id)
+            else:
+                self.ack(entry_id)
+
+        with ThreadPoolExecutor(max_workers=max_concurrency(concurrency)) as executor:
+            while True:
+                batch = self._take(batch_size, outcomes)
+                if not batch:
+                    return outcomes
+                list(executor.map(submit, batch))
+
+    def compact(self):
+        """Rewrites the log so that it only contains the pending entries."""
+        self.flush()
+        with self._io_lock:
+            with self._cond:
+                pending = list(self.pending.items())
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for entry_id, spec in pending:
+                    f.write(json.dumps({"id": entry_id, "spec": spec}, separators=(',', ':')) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp, self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        """Flushes the log and stops the background writer."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
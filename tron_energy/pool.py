@@ -0,0 +1,321 @@
+import asyncio
+import inspect
+import hashlib
+import itertools
+from collections import OrderedDict
+from time import time
+
+from .async_tron_energy import AsyncTronEnergy
+from .dispatcher import RateBudget
+from .middleware import rate_limit
+from .snapshot import is_fresh
+
+
+LEAST_LOADED = "least_loaded"
+BALANCE = "balance"
+STICKY = "sticky"
+POLICIES = (LEAST_LOADED, BALANCE, STICKY)
+
+# Account-wide reads answered by every account of a pool, besides the `list_*` methods.
+FAN_OUT = ("get_api_usage_summary",)
+
+
+def merge_responses(responses:list):
+    """
+    Merges the answers of several accounts to the same call.
+
+    The `results` of paginated lists are concatenated and their `count` added up; the `next` and
+    `previous` links of one account mean nothing for the others and are dropped, use the `iter_*`
+    methods to follow pagination. Numeric fields of other dicts, such as the usage summary, are added up.
+
+    Parameters:
+        responses (list): The responses, one per account.
+
+    Returns:
+        The merged response.
+    """
+    if all(isinstance(response, list) for response in responses):
+        return [record for response in responses for record in response]
+    if not all(isinstance(response, dict) for response in responses):
+        return responses
+    merged = dict(responses[0])
+    if all(isinstance(response.get("results"), list) for response in responses):
+        merged["results"] = [record for response in responses for record in response["results"]]
+        if all(isinstance(response.get("count"), int) for response in responses):
+            merged["count"] = sum(response["count"] for response in responses)
+        for link in ("next", "previous"):
+            if link in merged:
+                merged[link] = None
+        return merged
+    for key, value in merged.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and key != "errno":
+            merged[key] = sum(response.get(key, 0) for response in responses
+                              if isinstance(response.get(key, 0), (int, float)))
+    return merged
+
+
+class _Account:
+
+    def __init__(self, index:int, client:AsyncTronEnergy):
+        self.index = index
+        self.client = client
+        self.in_flight = 0
+        self.balance = None
+
+
+class AsyncTronEnergyPool:
+    """
+    Spreads the calls of one `AsyncTronEnergy` surface over several itrx accounts.
+
+    Every account has its own client, and so its own connection pool, and optionally its own rate
+    budget. Each call is routed to one account by `policy`:
+
+    - 'least_loaded' picks the account with the fewest calls in flight.
+    - 'balance' picks the account with the highest wallet balance, read through `get_wallet_balance`
+      and kept up to date from the `balance` of every order response.
+    - 'sticky' always sends the calls of one `receive_address` to the same account, using rendezvous
+      hashing so adding an account only moves the addresses it takes over.
+
+    `get_order` and `recycle_order` always go to the account that placed the order, and
+    `modify_smart_delegate` to the account that owns the policy. Orders and policies the pool has not
+    seen yet are looked up on every account first. The `list_*` and `iter_*` methods and
+    `get_api_usage_summary` ask every account and merge the answers. Calls without a `receive_address`
+    under the sticky policy are routed least-loaded.
+    """
+
+    def __init__(self, credentials, policy:str=LEAST_LOADED, rate:float=None, burst:int=1, max_tracked_orders:int=100000,
+                 **client_kwargs):
+        """
+        Parameters:
+            credentials (list): `(api_key, api_secret)` pairs, or dicts with `api_key`, `api_secret` and optionally `rate` and `burst`.
+            policy (str, optional): 'least_loaded', 'balance' or 'sticky'. Defaults to 'least_loaded'.
+            rate (float, optional): Requests per second allowed per account. Unlimited if not given.
+            burst (int, optional): Requests per account that may be sent back to back before `rate` applies. Defaults to 1.
+            max_tracked_orders (int, optional): Number of order serials whose account is remembered. Defaults to 100000.
+            **client_kwargs: Passed to every `AsyncTronEnergy`, e.g. `validate_addresses`.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {POLICIES}")
+        self.policy = policy
+        self.validate_addresses = client_kwargs.get("validate_addresses", False)
+        self.max_tracked_orders = max_tracked_orders
+        self._accounts = []
+        for index, account in enumerate(credentials):
+            if not isinstance(account, dict):
+                account = dict(zip(("api_key", "api_secret"), account))
+            account_rate = account.get("rate", rate)
+            client = AsyncTronEnergy(account["api_key"], account["api_secret"], **client_kwargs)
+            if account_rate:
+                client.use(rate_limit(RateBudget(account_rate, account.get("burst", burst))))
+            self._accounts.append(_Account(index, client))
+        if not self._accounts:
+            raise ValueError("At least one account is required")
+        self._owners = OrderedDict()
+        self._policy_owners = {}
+        self._turn = itertools.count()
+        self._signatures = {}
+
+    @property
+    def clients(self):
+        """The client of every account, in the order of `credentials`."""
+        return [account.client for account in self._accounts]
+
+    def stats(self):
+        """
+        Returns:
+            list: The calls in flight and last known balance of every account.
+        """
+        return [{"in_flight": account.in_flight, "balance": account.balance} for account in self._accounts]
+
+    async def refresh_balances(self):
+        """Reads the wallet balance of every account."""
+        balances = await asyncio.gather(*(account.client.get_wallet_balance() for account in self._accounts))
+        for account, balance in zip(self._accounts, balances):
+            account.balance = balance
+
+    def use(self, *middleware):
+        """
+        Appends middleware to the chain of every account.
+
+        Returns:
+            AsyncTronEnergyPool: The same pool.
+        """
+        for account in self._accounts:
+            account.client.use(*middleware)
+        return self
+
+    def verify_signature(self, signature:str, timestamp:str, data:dict):
+        """Checks a callback signature against the secret of every account."""
+        return any(account.client.verify_signature(signature, timestamp, data) for account in self._accounts)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: The account of every tracked order, the account balances and the state of every client.
+        """
+        return {
+            "owners": [[serial, account.index] for serial, account in self._owners.items()],
+            "policy_owners": [[policy_id, account.index] for policy_id, account in self._policy_owners.items()],
+            "balances": [account.balance for account in self._accounts],
+            "taken": time(),
+            "clients": [account.client.snapshot() for account in self._accounts],
+        }
+
+    def restore(self, state:dict):
+        """Warms the pool up from a `snapshot` taken with the same credentials, in the same order."""
+        for serial, index in state.get("owners", ()):
+            if index < len(self._accounts):
+                self._owners[serial] = self._accounts[index]
+        while len(self._owners) > self.max_tracked_orders:
+            self._owners.popitem(last=False)
+        for policy_id, index in state.get("policy_owners", ()):
+            if index < len(self._accounts):
+                self._policy_owners[policy_id] = self._accounts[index]
+        if is_fresh(state.get("taken"), "balances"):
+            for account, balance in zip(self._accounts, state.get("balances", ())):
+                account.balance = balance
+        for account, client_state in zip(self._accounts, state.get("clients", ())):
+            account.client.restore(client_state)
+
+    def _least_loaded(self):
+        turn = next(self._turn)
+        count = len(self._accounts)
+        return min(self._accounts, key=lambda account: (account.in_flight, (account.index - turn) % count))
+
+    def _sticky(self, receive_address:str):
+        key = receive_address.encode()
+        return max(self._accounts, key=lambda account: hashlib.blake2b(
+            key + account.index.to_bytes(4, "big"), digest_size=8).digest())
+
+    async def _route(self, name:str, arguments:dict):
+        if len(self._accounts) == 1:
+            return self._accounts[0]
+        serial = arguments.get("order_no")
+        if serial is not None:
+            if serial not in self._owners:
+                await self._locate_order(serial)
+            return self._owners[serial]
+        if name == "modify_smart_delegate":
+            if arguments["id"] not in self._policy_owners:
+                await self._locate_policy(arguments["id"])
+            return self._policy_owners[arguments["id"]]
+        if self.policy == STICKY and arguments.get("receive_address"):
+            return self._sticky(arguments["receive_address"])
+        if self.policy == BALANCE:
+            if any(account.balance is None for account in self._accounts):
+                await self.refresh_balances()
+            return max(self._accounts, key=lambda account: (account.balance, -account.in_flight))
+        return self._least_loaded()
+
+    async def _locate_order(self, serial:str):
+        # Only the account that placed an order knows it, so an unknown serial is asked of every account.
+        responses = await asyncio.gather(*(account.client.get_order(serial) for account in self._accounts),
+                                         return_exceptions=True)
+        for account, response in zip(self._accounts, responses):
+            if not isinstance(response, BaseException) and not (isinstance(response, dict) and response.get("errno")):
+                self._remember(serial, account)
+                return response
+        errors = [response for response in responses if isinstance(response, BaseException)]
+        if errors:
+            raise errors[0]
+        raise ValueError(f"No account knows order {serial!r}")
+
+    async def _locate_policy(self, policy_id:int):
+        async def scan(account):
+            async for record in account.client.iter_smart_delegate():
+                self._track_policy(account, record)
+        await asyncio.gather(*(scan(account) for account in self._accounts))
+        if policy_id not in self._policy_owners:
+            raise ValueError(f"No account owns smart delegate policy {policy_id!r}")
+
+    def _remember(self, serial:str, account:_Account):
+        self._owners[serial] = account
+        self._owners.move_to_end(serial)
+        while len(self._owners) > self.max_tracked_orders:
+            self._owners.popitem(last=False)
+
+    def _track_policy(self, account:_Account, record):
+        if isinstance(record, dict) and "id" in record:
+            self._policy_owners[record["id"]] = account
+
+    def _track(self, account:_Account, response, name:str=None):
+        if not isinstance(response, dict):
+            return
+        if "balance" in response:
+            account.balance = response["balance"]
+        if "serial" in response:
+            self._remember(response["serial"], account)
+        if name == "create_smart_delegate":
+            self._track_policy(account, response)
+        if name == "list_smart_delegate":
+            for record in response.get("results") or ():
+                self._track_policy(account, record)
+
+    async def _call(self, account:_Account, name:str, args:tuple, kwargs:dict):
+        account.in_flight += 1
+        try:
+            response = await getattr(account.client, name)(*args, **kwargs)
+        finally:
+            account.in_flight -= 1
+        self._track(account, response, name)
+        return response
+
+    async def _iter_all(self, name:str, args:tuple, kwargs:dict):
+        for account in self._accounts:
+            async for record in getattr(account.client, name)(*args, **kwargs):
+                if name == "iter_smart_delegate":
+                    self._track_policy(account, record)
+                yield record
+
+    async def _fan_out(self, name:str, args:tuple, kwargs:dict):
+        responses = await asyncio.gather(*(self._call(account, name, args, kwargs) for account in self._accounts))
+        return merge_responses(responses)
+
+    def _arguments(self, name:str, args:tuple, kwargs:dict):
+        signature = self._signatures.get(name)
+        if signature is None:
+            signature = self._signatures[name] = inspect.signature(getattr(AsyncTronEnergy, name))
+        return signature.bind(None, *args, **kwargs).arguments
+
+    def __getattr__(self, name:str):
+        method = getattr(AsyncTronEnergy, name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        if name.startswith("iter_"):
+            # Streaming methods return an async generator and are not counted as in flight.
+            def call(*args, **kwargs):
+                self._arguments(name, args, kwargs)
+                return self._iter_all(name, args, kwargs)
+            return call
+        if not inspect.iscoroutinefunction(method):
+            def call(*args, **kwargs):
+                arguments = self._arguments(name, args, kwargs)
+                if self.policy == STICKY and arguments.get("receive_address"):
+                    account = self._sticky(arguments["receive_address"])
+                else:
+                    account = self._least_loaded()
+                return getattr(account.client, name)(*args, **kwargs)
+            return call
+        if name in FAN_OUT or name.startswith("list_"):
+            async def call(*args, **kwargs):
+                self._arguments(name, args, kwargs)
+                return await self._fan_out(name, args, kwargs)
+            return call
+
+        async def call(*args, **kwargs):
+            arguments = self._arguments(name, args, kwargs)
+            if name == "get_order" and len(self._accounts) > 1 and arguments["order_no"] not in self._owners:
+                return await self._locate_order(arguments["order_no"])
+            account = await self._route(name, arguments)
+            return await self._call(account, name, args, kwargs)
+        return call
+
+    async def close(self):
+        for account in self._accounts:
+            await account.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        await self.close()
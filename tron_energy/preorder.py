@@ -0,0 +1,261 @@
+import math
+import asyncio
+from collections import OrderedDict, deque
+from time import time
+
+from .recycler import period_seconds
+
+
+HOUR = 3600
+DAY = 86400
+
+
+class _Demand:
+
+    def __init__(self, now:float):
+        self.first = now
+        self.last = now
+        self.orders = 0
+        self.level = 0.0
+        self.hours = [0.0] * 24
+
+
+class DemandModel:
+    """
+    Learns how much energy each address needs over time from the orders placed for it.
+
+    Two estimates are kept per address: an exponentially weighted rate that follows recent demand with
+    a half-life of `halflife` seconds, and a time-of-day profile of the energy ordered in each hour of
+    the day (UTC), which forgets old days with a half-life of `profile_halflife`. The predicted rate at
+    a given time is the larger of the two, so both a busy address and a daily peak trigger a forecast.
+    """
+
+    def __init__(self, halflife:float=HOUR, profile_halflife:float=7 * DAY, max_addresses:int=10000):
+        """
+        Parameters:
+            halflife (float, optional): Seconds after which a past order weighs half in the recent rate. Defaults to one hour.
+            profile_halflife (float, optional): Seconds after which a past order weighs half in the time-of-day profile. Defaults to one week.
+            max_addresses (int, optional): Addresses remembered; the least recently ordered are forgotten first. Defaults to 10000.
+        """
+        self.tau = halflife / math.log(2)
+        self.profile_tau = profile_halflife / math.log(2)
+        self.max_addresses = max_addresses
+        self._demand = OrderedDict()
+
+    def __len__(self):
+        return len(self._demand)
+
+    def addresses(self):
+        """
+        Returns:
+            list: The addresses with recorded demand.
+        """
+        return list(self._demand)
+
+    def record(self, address:str, energy_amount:int, timestamp:float):
+        """Adds an order of `energy_amount` for `address` placed at `timestamp` (seconds since the epoch)."""
+        demand = self._demand.get(address)
+        if demand is None:
+            demand = self._demand[address] = _Demand(timestamp)
+            while len(self._demand) > self.max_addresses:
+                self._demand.popitem(last=False)
+        else:
+            self._demand.move_to_end(address)
+            elapsed = max(timestamp - demand.last, 0.0)
+            demand.level *= math.exp(-elapsed / self.tau)
+            decay = math.exp(-elapsed / self.profile_tau)
+            demand.hours = [energy * decay for energy in demand.hours]
+            demand.last = max(timestamp, demand.last)
+        demand.orders += 1
+        demand.level += energy_amount
+        demand.hours[int(timestamp // HOUR) % 24] += energy_amount
+
+    def orders(self, address:str):
+        """
+        Returns:
+            int: The number of orders recorded for `address`.
+        """
+        demand = self._demand.get(address)
+        return 0 if demand is None else demand.orders
+
+    def rate(self, address:str, at:float):
+        """
+        Returns:
+            float: The predicted energy per second needed by `address` at `at`.
+        """
+        demand = self._demand.get(address)
+        if demand is None:
+            return 0.0
+        elapsed = max(at - demand.last, 0.0)
+        recent = demand.level * math.exp(-elapsed / self.tau) / self.tau
+        # The profile holds one decayed day of orders per observed day, counting the first one.
+        span = max(demand.last - demand.first, 0.0) + DAY
+        days = self.profile_tau * (1 - math.exp(-span / self.profile_tau)) / DAY
+        hourly = demand.hours[int(at // HOUR) % 24] * math.exp(-elapsed / self.profile_tau) / max(days, 1.0) / HOUR
+        return max(recent, hourly)
+
+    def expected(self, address:str, start:float, end:float):
+        """
+        Returns:
+            float: The energy `address` is predicted to need between `start` and `end`.
+        """
+        energy = 0.0
+        while start < end:
+            step = min(end, (start // HOUR + 1) * HOUR)
+            energy += self.rate(address, start) * (step - start)
+            start = step
+        return energy
+
+
+class _Preorder:
+
+    def __init__(self, expires:float, remaining:float, response:dict):
+        self.expires = expires
+        self.remaining = remaining
+        self.response = response
+
+
+class PreorderScheduler:
+    """
+    Orders energy for an address shortly before it is predicted to need it.
+
+    Every order placed through `place_order` teaches a `DemandModel`. Each `tick` looks `lead_time`
+    seconds ahead: when the predicted rate of an address would fill an order of at least `min_energy`
+    over one `period`, an order for the predicted demand of the period is placed, or renewed when the
+    current one is about to expire. Later `place_order` calls for the address are served from that
+    order while it lasts, so the order latency is off the caller's critical path. Orders are only placed
+    while their estimated price keeps the spend of the last `budget_period` seconds within `budget`.
+    """
+
+    def __init__(self, client, budget:int, budget_period:float=DAY, lead_time:float=120, period:str='1H',
+                 min_energy:int=32000, max_energy:int=None, min_orders:int=3, interval:float=60, model:DemandModel=None,
+                 clock=time):
+        """
+        Parameters:
+            client (AsyncTronEnergy): The client used to place the orders.
+            budget (int): Most SUN spent on predicted orders per `budget_period`.
+            budget_period (float, optional): Seconds the budget applies to. Defaults to one day.
+            lead_time (float, optional): Seconds before the predicted demand at which orders are placed. Defaults to 120.
+            period (str, optional): The period of the predicted orders. Defaults to '1H'.
+            min_energy (int, optional): Smallest predicted order. Defaults to 32000.
+            max_energy (int, optional): Largest predicted order. Unlimited if not given.
+            min_orders (int, optional): Orders an address needs before its demand is predicted. Defaults to 3.
+            interval (float, optional): Seconds between two ticks of `run`. Defaults to 60.
+            model (DemandModel, optional): The demand model. A new one with default half-lives if not given.
+            clock (callable, optional): Returns the current time in seconds since the epoch. Defaults to `time.time`.
+        """
+        if budget < 0:
+            raise ValueError("budget must not be negative")
+        self.client = client
+        self.budget = budget
+        self.budget_period = budget_period
+        self.lead_time = lead_time
+        self.period = period
+        self.min_energy = min_energy
+        self.max_energy = max_energy
+        self.min_orders = min_orders
+        self.interval = interval
+        self.model = DemandModel() if model is None else model
+        self.clock = clock
+        self.stats = {"preorders": 0, "hits": 0, "misses": 0, "over_budget": 0, "errors": 0}
+        self._spent = deque()
+        self._covered = {}
+
+    def spent(self):
+        """
+        Returns:
+            int: The SUN spent on predicted orders in the last `budget_period` seconds.
+        """
+        horizon = self.clock() - self.budget_period
+        while self._spent and self._spent[0][0] <= horizon:
+            self._spent.popleft()
+        return sum(amount for _, amount in self._spent)
+
+    def covered(self, receive_address:str):
+        """
+        Returns:
+            int: The energy of the predicted order for `receive_address` not yet handed out, 0 if there is none.
+        """
+        preorder = self._covered.get(receive_address)
+        if preorder is None or preorder.expires <= self.clock():
+            return 0
+        return int(preorder.remaining)
+
+    async def place_order(self, receive_address:str, energy_amount:int, period:str='1H', out_trade_no:str=None,
+                          callback_url:str=None):
+        """
+        Places an energy order, or serves it from a predicted order of the same period that still covers `energy_amount`.
+
+        Parameters:
+            receive_address (str): The Tron address where the energy will be received.
+            energy_amount (int): The amount of energy needed.
+            period (str, optional): The period for which the energy is to be ordered. Defaults to '1H'.
+            out_trade_no (str, optional): The unique identifier for the order. Always placed as its own order.
+            callback_url (str, optional): The URL the API calls back when the order is fulfilled. Always placed as its own order.
+
+        Returns:
+            dict: The response of the order. Responses served from a predicted order have `preordered` set.
+        """
+        now = self.clock()
+        self.model.record(receive_address, energy_amount, now)
+        preorder = self._covered.get(receive_address)
+        if (preorder is not None and not out_trade_no and not callback_url and period == self.period
+                and preorder.expires > now and preorder.remaining >= energy_amount):
+            preorder.remaining -= energy_amount
+            self.stats["hits"] += 1
+            return dict(preorder.response, preordered=True)
+        self.stats["misses"] += 1
+        return await self.client.place_order(receive_address, energy_amount, period, out_trade_no, callback_url)
+
+    def _plan(self, now:float):
+        length = period_seconds(self.period)
+        plans = []
+        for address in self.model.addresses():
+            soon = now + self.lead_time
+            if self.model.orders(address) < self.min_orders or self.model.rate(address, soon) * length < self.min_energy:
+                continue
+            preorder = self._covered.get(address)
+            if preorder is not None and preorder.expires > soon and \
+                    preorder.remaining >= self.model.expected(address, now, soon):
+                continue
+            energy = max(self.model.expected(address, now, now + length), self.min_energy)
+            if self.max_energy:
+                energy = min(energy, self.max_energy)
+            plans.append((int(math.ceil(energy)), address))
+        # The budget goes to the addresses with the largest predicted demand first.
+        plans.sort(reverse=True)
+        return plans
+
+    async def tick(self):
+        """
+        Places the predicted orders that are due.
+
+        Returns:
+            list: The addresses an order was placed for.
+        """
+        now = self.clock()
+        for address in [address for address, preorder in self._covered.items() if preorder.expires <= now]:
+            del self._covered[address]
+        placed = []
+        for energy, address in self._plan(now):
+            try:
+                estimate = await self.client.estimate_order(energy, self.period)
+                price = estimate.get("total_price", 0)
+                if self.spent() + price > self.budget:
+                    self.stats["over_budget"] += 1
+                    continue
+                response = await self.client.place_order(address, energy, self.period)
+            except Exception:
+                self.stats["errors"] += 1
+                continue
+            self._spent.append((now, response.get("amount", price)))
+            self._covered[address] = _Preorder(now + period_seconds(self.period), energy, response)
+            self.stats["preorders"] += 1
+            placed.append(address)
+        return placed
+
+    async def run(self):
+        """Places predicted orders once per `interval` until cancelled."""
+        while True:
+            await self.tick()
+            await asyncio.sleep(self.interval)
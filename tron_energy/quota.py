@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from urllib.parse import urlsplit
+
+
+LOW_PRIORITY_REQUESTS = frozenset([
+    ("GET", "/api/v1/frontend/index-data"),
+    ("GET", "/api/v1/frontend/order/price"),
+    ("GET", "/api/v1/frontend/auto-delegate-policy"),
+    ("GET", "/api/v1/frontend/count-delegate-policy"),
+])
+
+
+class QuotaExceeded(Exception):
+    """Raised instead of sending a low-priority request when the remaining quota is reserved."""
+
+
+class QuotaTracker:
+    """
+    Keeps a live estimate of the remaining API quota.
+
+    The tracker periodically reads `get_api_usage_summary` and counts the calls made through the client
+    in between. Once the estimate drops to the `reserved` capacity, low-priority requests (public data,
+    price estimates and policy listings) are rejected with `QuotaExceeded` so the rest of the quota is
+    left for order placement. Other requests are never rejected.
+    """
+
+    def __init__(self, quota:int, reserved:int=0, poll_interval:float=60.0, usage_key:str="today_count",
+                 low_priority=LOW_PRIORITY_REQUESTS):
+        """
+        Parameters:
+            quota (int): The number of calls your plan allows per period.
+            reserved (int, optional): Calls kept back for high-priority requests. Defaults to 0.
+            poll_interval (float, optional): Seconds between two usage summary polls. Defaults to 60.
+            usage_key (str, optional): The usage summary field counting the calls of the current period. Defaults to 'today_count'.
+            low_priority (set, optional): `(method, path)` pairs of the requests that may be shed.
+        """
+        self.quota = quota
+        self.reserved = reserved
+        self.poll_interval = poll_interval
+        self.usage_key = usage_key
+        self.low_priority = low_priority
+        self.shed_count = 0
+        self._used = 0
+        self._local = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    @property
+    def remaining(self):
+        """The estimated number of calls left in the current period."""
+        return self.quota - self._used - self._local
+
+    def update(self, summary:dict):
+        """
+        Replaces the estimate with the usage reported by the API.
+
+        Parameters:
+            summary (dict): The response of `get_api_usage_summary`.
+        """
+        with self._lock:
+            self._used = int(summary[self.usage_key])
+            self._local = 0
+
+    def reserve(self, calls:int):
+        """Sets aside additional capacity for high-priority requests."""
+        with self._lock:
+            self.reserved += calls
+
+    def release(self, calls:int):
+        """Returns capacity set aside with `reserve`."""
+        with self._lock:
+            self.reserved = max(0, self.reserved - calls)
+
+    def is_low_priority(self, method:str, url:str):
+        return (method.upper(), urlsplit(url).path) in self.low_priority
+
+    def acquire(self, method:str, url:str):
+        """
+        Accounts for one request, called by the client before sending it.
+
+        Raises:
+            QuotaExceeded: If the request is low priority and only reserved capacity is left.
+        """
+        with self._lock:
+            if self.remaining <= self.reserved and self.is_low_priority(method, url):
+                self.shed_count += 1
+                raise QuotaExceeded(f"{self.remaining} calls left, {self.reserved} reserved")
+            self._local += 1
+
+    def poll(self, client):
+        """Refreshes the estimate with a `TronEnergy` client."""
+        self.update(client.get_api_usage_summary())
+
+    async def async_poll(self, client):
+        """Refreshes the estimate with an `AsyncTronEnergy` client."""
+        self.update(await client.get_api_usage_summary())
+
+    async def run(self, client):
+        """Polls with an `AsyncTronEnergy` client every `poll_interval` seconds until cancelled."""
+        while True:
+            try:
+                await self.async_poll(client)
+            except Exception:
+                pass  # Keep counting locally until the next poll succeeds.
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self, client):
+        """Polls with a `TronEnergy` client from a background thread until `stop` is called."""
+        def loop():
+            while not self._stopped.is_set():
+                try:
+                    self.poll(client)
+                except Exception:
+                    pass  # Keep counting locally until the next poll succeeds.
+                self._stopped.wait(self.poll_interval)
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=loop, name="tron-energy-quota", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
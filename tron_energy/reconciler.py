@@ -0,0 +1,122 @@
+import asyncio
+from collections import namedtuple
+
+from .scheduler import async_concurrency_slots, max_concurrency
+
+
+DelegatePolicy = namedtuple("DelegatePolicy", ["receive_address", "period", "max_energy", "enabled"], defaults=(None, True))
+DelegatePolicy.__doc__ = "The desired smart-delegate state of one address."
+
+Change = namedtuple("Change", ["action", "receive_address", "params"])
+Change.__doc__ = "One API call needed to reach the desired state: a `create`, `enable` or `disable` action."
+
+_CurrentPolicy = namedtuple("_CurrentPolicy", ["id", "enabled", "period", "max_energy"])
+
+
+class SmartDelegateReconciler:
+    """
+    Brings the smart-delegate policies of an account in line with a desired state.
+
+    The current policies are streamed once through `iter_smart_delegate` into a hash index keyed by
+    address, the desired state is compared against it record by record, and only the resulting create
+    and status-change calls are sent, with at most `concurrency` of them in flight.
+
+    The API has no call to change the period or `max_energy` of an existing policy, so an enabled
+    policy whose parameters differ is submitted again through `create_smart_delegate`. A desired
+    `max_energy` of None accepts whatever the current policy has. The changes of one address are sent
+    one after the other, so a policy is created before it is enabled.
+    """
+
+    def __init__(self, client, concurrency=16, disable_missing:bool=False):
+        """
+        Parameters:
+            client (AsyncTronEnergy): The client used to read and change the policies.
+            concurrency (int or AdaptiveLimit, optional): Maximum number of change calls in flight. Defaults to 16.
+            disable_missing (bool, optional): Disable enabled policies whose address is not in the desired state.
+        """
+        self.client = client
+        self.concurrency = concurrency
+        self.disable_missing = disable_missing
+
+    async def current(self):
+        """
+        Returns:
+            dict: The current policies keyed by receive address.
+        """
+        index = {}
+        async for record in self.client.iter_smart_delegate():
+            index[record["receive_address"]] = _CurrentPolicy(
+                record["id"], bool(record["status"]), record.get("period"), record.get("max_energy"))
+        return index
+
+    async def plan(self, desired):
+        """
+        Computes the changes needed to reach the desired state.
+
+        Parameters:
+            desired (iterable): `DelegatePolicy` tuples or dictionaries with the same keys.
+
+        Returns:
+            list: The `Change` tuples to apply.
+        """
+        index = await self.current()
+        changes = []
+        seen = set()
+        for policy in desired:
+            if isinstance(policy, dict):
+                policy = DelegatePolicy(**policy)
+            seen.add(policy.receive_address)
+            current = index.get(policy.receive_address)
+            if policy.enabled and (current is None or current.period != policy.period or
+                                   policy.max_energy is not None and current.max_energy != policy.max_energy):
+                params = {"period": policy.period, "receive_address": policy.receive_address}
+                if policy.max_energy:
+                    params["max_energy"] = policy.max_energy
+                changes.append(Change("create", policy.receive_address, params))
+            if current is not None and current.enabled != policy.enabled:
+                action = "enable" if policy.enabled else "disable"
+                changes.append(Change(action, policy.receive_address, {"id": current.id, "status": policy.enabled}))
+        if self.disable_missing:
+            for address, current in index.items():
+                if address not in seen and current.enabled:
+                    changes.append(Change("disable", address, {"id": current.id, "status": False}))
+        return changes
+
+    async def _apply_change(self, change:Change):
+        if change.action == "create":
+            return await self.client.create_smart_delegate(**change.params)
+        return await self.client.modify_smart_delegate(**change.params)
+
+    async def apply(self, desired, dry_run:bool=False):
+        """
+        Reconciles the account with the desired state.
+
+        Parameters:
+            desired (iterable): `DelegatePolicy` tuples or dictionaries with the same keys.
+            dry_run (bool, optional): Only compute the changes without sending them. Defaults to False.
+
+        Returns:
+            list: `(change, result)` pairs, where result is the API response, the raised exception, or None on a dry run.
+        """
+        changes = await self.plan(desired)
+        if dry_run:
+            return [(change, None) for change in changes]
+
+        results = [None] * len(changes)
+        by_address = {}
+        for i, change in enumerate(changes):
+            by_address.setdefault(change.receive_address, []).append(i)
+        pending = iter(by_address.values())
+        slot = async_concurrency_slots(self.concurrency)
+
+        async def worker():
+            for indices in pending:
+                for i in indices:
+                    try:
+                        async with slot():
+                            results[i] = await self._apply_change(changes[i])
+                    except Exception as e:
+                        results[i] = e
+
+        await asyncio.gather(*(worker() for _ in range(min(max_concurrency(self.concurrency), len(by_address)))))
+        return list(zip(changes, results))
@@ -0,0 +1,209 @@
+import asyncio
+from time import monotonic, time
+
+from .scheduler import async_concurrency_slots
+
+
+PERIOD_UNITS = {"H": 3600, "D": 86400}
+
+
+def period_seconds(period):
+    """
+    Converts an order period such as '1H' or '3D' to seconds.
+
+    Parameters:
+        period (str or int): The period passed to `place_order`. Integers are days, with 0 meaning one hour.
+
+    Returns:
+        int: The length of the period in seconds.
+    """
+    if isinstance(period, int):
+        return period * PERIOD_UNITS["D"] if period else PERIOD_UNITS["H"]
+    period = period.strip().upper()
+    return int(period[:-1]) * PERIOD_UNITS[period[-1]]
+
+
+class TimerWheel:
+    """
+    A hashed timing wheel.
+
+    Deadlines are rounded to `tick` seconds and hashed into a fixed ring of slots, so scheduling and
+    cancelling a key are O(1) and advancing the clock only visits the slots that elapsed.
+    """
+
+    def __init__(self, tick:float=1.0, slots:int=4096, now:float=0.0):
+        self.tick = tick
+        self._slots = [{} for _ in range(slots)]
+        self._where = {}
+        self._current = int(now // tick)
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def schedule(self, key, deadline:float):
+        """Schedules `key` to expire at `deadline`, replacing any earlier schedule of the same key."""
+        self.cancel(key)
+        tick = max(int(deadline // self.tick), self._current)
+        index = tick % len(self._slots)
+        self._slots[index][key] = tick
+        self._where[key] = index
+
+    def deadline(self, key):
+        """The time at which `key` expires, rounded down to the tick."""
+        return self._slots[self._where[key]][key] * self.tick
+
+    def cancel(self, key):
+        index = self._where.pop(key, None)
+        if index is not None:
+            del self._slots[index][key]
+
+    def advance(self, now:float):
+        """
+        Moves the wheel forward to `now`.
+
+        Returns:
+            list: The keys whose deadline has passed.
+        """
+        end = int(now // self.tick)
+        if end < self._current:
+            return []
+        expired = []
+        for step in range(min(end - self._current + 1, len(self._slots))):
+            slot = self._slots[(self._current + step) % len(self._slots)]
+            due = [key for key, tick in slot.items() if tick <= end]
+            for key in due:
+                del slot[key]
+                del self._where[key]
+            expired.extend(due)
+        self._current = end + 1
+        return expired
+
+
+class RecycleScheduler:
+    """
+    Recycles rented energy as soon as it is no longer needed.
+
+    Orders are tracked from `place_order` responses and recycled either once they have been idle for
+    `idle_after` seconds (see `touch` and `release`) or `expiry_margin` seconds before their period ends,
+    whichever comes first. Due orders are recycled in batches with bounded concurrency.
+    """
+
+    def __init__(self, client, idle_after:float=None, expiry_margin:float=60, tick:float=1.0, batch_size:int=100,
+                 concurrency=8, clock=monotonic):
+        """
+        Parameters:
+            client (AsyncTronEnergy): The client used to recycle orders.
+            idle_after (float, optional): Seconds without `touch` after which an order is recycled. Disabled if not given.
+            expiry_margin (float, optional): Seconds before the end of the period at which an order is recycled. Defaults to 60.
+            tick (float, optional): Resolution of the timer wheel in seconds. Defaults to 1.
+            batch_size (int, optional): Maximum number of orders recycled per batch. Defaults to 100.
+            concurrency (int or AdaptiveLimit, optional): Maximum number of recycle calls in flight. Defaults to 8.
+            clock (callable, optional): Returns the current time in seconds. Defaults to `time.monotonic`.
+        """
+        self.client = client
+        self.idle_after = idle_after
+        self.expiry_margin = expiry_margin
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.clock = clock
+        self._wheel = TimerWheel(tick, now=clock())
+        self._expiry = {}
+        self._due = []
+
+    def __len__(self):
+        return len(self._expiry)
+
+    def _deadline(self, serial:str, now:float):
+        deadline = self._expiry[serial] - self.expiry_margin
+        if self.idle_after is not None:
+            deadline = min(deadline, now + self.idle_after)
+        return deadline
+
+    def track(self, order:dict, period='1H'):
+        """
+        Starts tracking an order.
+
+        Parameters:
+            order (dict): The response of `place_order`.
+            period (str, optional): The period the order was placed for. Defaults to '1H'.
+        """
+        now = self.clock()
+        serial = order["serial"]
+        self._expiry[serial] = now + period_seconds(period)
+        self._wheel.schedule(serial, self._deadline(serial, now))
+
+    def touch(self, serial:str):
+        """Records activity on an order, postponing its idle deadline."""
+        if serial in self._expiry:
+            self._wheel.schedule(serial, self._deadline(serial, self.clock()))
+
+    def release(self, serial:str):
+        """Marks an order as no longer needed so it is recycled with the next batch."""
+        if serial in self._expiry:
+            self._wheel.schedule(serial, self.clock())
+
+    def forget(self, serial:str):
+        """Stops tracking an order without recycling it."""
+        self._expiry.pop(serial, None)
+        self._wheel.cancel(serial)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: The tracked orders with their wall-clock expiry and recycle deadline, and the orders awaiting recycling.
+        """
+        offset = time() - self.clock()
+        orders = {serial: [expiry + offset, self._wheel.deadline(serial) + offset] for serial, expiry in self._expiry.items()}
+        return {"orders": orders, "due": list(self._due)}
+
+    def restore(self, state:dict):
+        """Resumes tracking the orders of a `snapshot` whose period has not ended yet."""
+        offset = time() - self.clock()
+        now = time()
+        for serial, (expiry, deadline) in state.get("orders", {}).items():
+            if expiry > now:
+                self._expiry[serial] = expiry - offset
+                self._wheel.schedule(serial, deadline - offset)
+        self._due.extend(serial for serial in state.get("due", ()) if serial not in self._due)
+
+    def due(self):
+        """
+        Returns:
+            list: The serials of the orders that are due for recycling, which are no longer tracked.
+        """
+        serials = self._wheel.advance(self.clock())
+        for serial in serials:
+            del self._expiry[serial]
+        return serials
+
+    async def recycle_due(self):
+        """
+        Recycles every order that is due.
+
+        Returns:
+            dict: The response or exception of every recycle call, keyed by serial.
+        """
+        self._due.extend(self.due())
+        slot = async_concurrency_slots(self.concurrency)
+        outcomes = {}
+
+        async def recycle(serial):
+            try:
+                async with slot():
+                    outcomes[serial] = await self.client.recycle_order(serial)
+            except Exception as e:
+                outcomes[serial] = e
+
+        while self._due:
+            batch, self._due = self._due[:self.batch_size], self._due[self.batch_size:]
+            await asyncio.gather(*(recycle(serial) for serial in batch))
+        return outcomes
+
+    async def run(self):
+        """Recycles due orders once per tick until cancelled."""
+        while True:
+            await self.recycle_due()
+            await asyncio.sleep(self._wheel.tick)
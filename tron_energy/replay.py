@@ -0,0 +1,224 @@
+import gzip
+import json
+import math
+import asyncio
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+
+
+REDACTED = "<redacted>"
+SECRET_FIELDS = frozenset(["api_key", "api_secret", "secret", "signature", "token", "callback_url"])
+
+
+def _open(path:str, mode:str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def redact(data, fields=SECRET_FIELDS):
+    """Returns a copy of `data` with the values of secret fields replaced."""
+    if isinstance(data, dict):
+        return {k: REDACTED if k.lower() in fields else redact(v, fields) for k, v in data.items()}
+    if isinstance(data, list):
+        return [redact(v, fields) for v in data]
+    return data
+
+
+def percentile(values, q:float):
+    """
+    Parameters:
+        values (list): The samples, sorted in ascending order.
+        q (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The nearest-rank percentile, or 0.0 without samples.
+    """
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values), math.ceil(q / 100 * len(values))) - 1)
+    return values[rank]
+
+
+class TrafficRecorder:
+    """
+    Records the traffic of a client to a JSON-lines file, optionally gzip compressed.
+
+    Every call of `make_request` is appended with its offset from the start of the recording, method,
+    url, redacted payload, latency and response or error. Headers are never recorded, so the API key
+    and signatures do not end up in the file.
+    """
+
+    def __init__(self, path:str, fields=SECRET_FIELDS):
+        self.path = path
+        self.fields = fields
+        self._file = _open(path, "a")
+        self._lock = threading.Lock()
+        self._start = monotonic()
+
+    def _write(self, started:float, method:str, url:str, data:dict, response=None, error:Exception=None):
+        record = {
+            "t": round(started - self._start, 6),
+            "m": method,
+            "u": url,
+            "d": redact(data, self.fields),
+            "l": round(monotonic() - started, 6),
+        }
+        if error is not None:
+            record["e"] = f"{type(error).__name__}: {error}"
+        else:
+            record["r"] = redact(response, self.fields)
+        line = json.dumps(record, separators=(',', ':')) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def attach(self, client):
+        """
+        Starts recording the requests of a `TronEnergy` or `AsyncTronEnergy` client.
+
+        Returns:
+            The same client.
+        """
+        make_request = client.make_request
+        if asyncio.iscoroutinefunction(make_request):
+            async def recorded(method:str, url:str, data:dict=None, priority:str=None):
+                started = monotonic()
+                try:
+                    response = await make_request(method, url, data, priority)
+                except Exception as e:
+                    self._write(started, method, url, data, error=e)
+                    raise
+                self._write(started, method, url, data, response)
+                return response
+        else:
+            def recorded(method:str, url:str, data:dict=None, priority:str=None):
+                started = monotonic()
+                try:
+                    response = make_request(method, url, data, priority)
+                except Exception as e:
+                    self._write(started, method, url, data, error=e)
+                    raise
+                self._write(started, method, url, data, response)
+                return response
+        client.make_request = recorded
+        return client
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+
+def load_records(path:str):
+    """Yields the records of a recording in order."""
+    with _open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ReplayReport(namedtuple("ReplayReport", ["requests", "errors", "duration", "latencies"])):
+    """The outcome of a replay. `latencies` are the sorted request latencies in seconds."""
+
+    @property
+    def throughput(self):
+        """Requests per second."""
+        return self.requests / self.duration if self.duration else 0.0
+
+    def latency(self, q:float):
+        """The q-th latency percentile in seconds."""
+        return percentile(self.latencies, q)
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "duration": self.duration,
+            "throughput": self.throughput,
+            "p50": self.latency(50),
+            "p90": self.latency(90),
+            "p99": self.latency(99),
+        }
+
+
+async def replay(client, path:str, speed:float=1.0, concurrency:int=1000):
+    """
+    Re-issues recorded traffic through an `AsyncTronEnergy` client, keeping the recorded spacing.
+
+    Parameters:
+        client (AsyncTronEnergy): The client, typically with `base_url` pointing at a local stand-in.
+        path (str): The recording.
+        speed (float, optional): Time-compression factor; 10 replays a day of traffic in 2.4 hours. Defaults to 1.
+        concurrency (int, optional): Maximum number of requests in flight. Defaults to 1000.
+
+    Returns:
+        ReplayReport: Throughput, error count and latencies of the replay.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    tasks = set()
+    start = monotonic()
+
+    async def issue(record):
+        nonlocal errors
+        sent = monotonic()
+        try:
+            await client.make_request(record["m"], record["u"], record["d"])
+        except Exception:
+            errors += 1
+        finally:
+            semaphore.release()
+        latencies.append(monotonic() - sent)
+
+    for record in load_records(path):
+        delay = record["t"] / speed - (monotonic() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await semaphore.acquire()
+        task = asyncio.ensure_future(issue(record))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    return ReplayReport(len(latencies), errors, monotonic() - start, sorted(latencies))
+
+
+def replay_sync(client, path:str, speed:float=1.0, concurrency:int=32):
+    """
+    Re-issues recorded traffic through a `TronEnergy` client from a pool of threads.
+
+    Parameters:
+        client (TronEnergy): The client, typically with `base_url` pointing at a local stand-in.
+        path (str): The recording.
+        speed (float, optional): Time-compression factor. Defaults to 1.
+        concurrency (int, optional): Number of threads issuing requests. Defaults to 32.
+
+    Returns:
+        ReplayReport: Throughput, error count and latencies of the replay.
+    """
+    latencies = []
+    errors = []
+    start = monotonic()
+
+    def issue(record):
+        sent = monotonic()
+        try:
+            client.make_request(record["m"], record["u"], record["d"])
+        except Exception:
+            errors.append(record)
+        latencies.append(monotonic() - sent)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for record in load_records(path):
+            delay = record["t"] / speed - (monotonic() - start)
+            if delay > 0:
+                sleep(delay)
+            executor.submit(issue, record)
+    return ReplayReport(len(latencies), len(errors), monotonic() - start, sorted(latencies))
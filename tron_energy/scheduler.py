@@ -0,0 +1,280 @@
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from urllib.parse import urlsplit
+
+from .limiter import AdaptiveLimit, is_overload
+
+
+CRITICAL = "critical"
+DEFAULT = "default"
+BACKGROUND = "background"
+
+DEFAULT_WEIGHTS = {CRITICAL: 16, DEFAULT: 4, BACKGROUND: 1}
+
+_priority = ContextVar("tron_energy_priority", default=None)
+
+
+def classify(method:str, url:str):
+    """
+    The default priority class of a request.
+
+    Every POST changes state (orders, recycling, transfers, policies) and is critical, order lookups
+    are default, and all other reads (public data, estimates, listings, usage) are background.
+    """
+    if method.upper() == "POST":
+        return CRITICAL
+    if urlsplit(url).path.rstrip("/").endswith("/order/query"):
+        return DEFAULT
+    return BACKGROUND
+
+
+@contextmanager
+def request_priority(priority:str):
+    """
+    Overrides the priority class of every request made inside the block, in this thread or task.
+
+    Parameters:
+        priority (str): 'critical', 'default', 'background' or any class configured on the scheduler.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _WeightedQueues:
+    """
+    Per-class FIFO queues served by stride scheduling.
+
+    Every class advances a virtual clock by 1/weight each time it is served and the non-empty class
+    that would finish its next turn first goes next, so under contention class `c` gets
+    `weight[c] / sum(weights)` of the slots while an idle class accumulates no credit.
+    """
+
+    def __init__(self, slots, weights:dict=None):
+        if isinstance(slots, AdaptiveLimit):
+            self.adaptive = slots
+        elif slots < 1:
+            raise ValueError("slots must be at least 1")
+        else:
+            self.adaptive = None
+            self._slots = slots
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self.active = 0
+        self.queue_time = 0.0
+        self._queues = {name: deque() for name in self.weights}
+        self._pass = {name: 0.0 for name in self.weights}
+        self._vtime = 0.0
+
+    @property
+    def slots(self):
+        """The number of requests allowed in flight, which follows the server when slots is an `AdaptiveLimit`."""
+        return self.adaptive.limit if self.adaptive is not None else self._slots
+
+    def resolve(self, method:str=None, url:str=None, priority:str=None):
+        priority = priority or _priority.get() or (classify(method, url) if method else DEFAULT)
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class {priority!r}")
+        return priority
+
+    def _waiting(self):
+        return any(self._queues.values())
+
+    def _push(self, priority:str, waiter):
+        queue = self._queues[priority]
+        if not queue:
+            self._pass[priority] = max(self._pass[priority], self._vtime)
+        queue.append(waiter)
+
+    def _pop(self):
+        ready = [name for name, queue in self._queues.items() if queue]
+        if not ready:
+            return None
+        name = min(ready, key=lambda name: self._pass[name] + 1.0 / self.weights[name])
+        self._vtime = self._pass[name]
+        self._pass[name] += 1.0 / self.weights[name]
+        return self._queues[name].popleft()
+
+    def _record(self, waited:float, rtt:float, error:BaseException):
+        self.queue_time += 0.1 * (waited - self.queue_time)
+        if self.adaptive is not None:
+            self.adaptive.update(rtt, error is not None and is_overload(error), self.active)
+
+    def stats(self):
+        """
+        Returns:
+            dict: The current limit, the requests in flight and waiting per class, and the smoothed queueing time in seconds.
+        """
+        return {
+            "active": self.active,
+            "slots": self.slots,
+            "queue_time": self.queue_time,
+            "queued": {name: len(q) for name, q in self._queues.items()},
+        }
+
+
+class PriorityScheduler(_WeightedQueues):
+    """
+    Limits `TronEnergy` to `slots` requests in flight and serves waiting requests by priority class
+    with weighted fairness, so critical calls keep low latency while background jobs saturate the client.
+    """
+
+    def __init__(self, slots=8, weights:dict=None):
+        """
+        Parameters:
+            slots (int or AdaptiveLimit, optional): Maximum number of requests in flight. Defaults to 8.
+            weights (dict, optional): Share of the slots per class under contention. Defaults to critical 16, default 4, background 1.
+        """
+        super().__init__(slots, weights)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, method:str=None, url:str=None, priority:str=None):
+        priority = self.resolve(method, url, priority)
+        queued = monotonic()
+        with self._lock:
+            if self.active < self.slots and not self._waiting():
+                self.active += 1
+                event = None
+            else:
+                event = threading.Event()
+                self._push(priority, event)
+        if event is not None:
+            event.wait()
+        started = monotonic()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record(started - queued, monotonic() - started, error)
+            self._release()
+
+    def _release(self):
+        with self._lock:
+            self.active -= 1
+            while self.active < self.slots:
+                waiter = self._pop()
+                if waiter is None:
+                    return
+                self.active += 1
+                waiter.set()
+
+
+class AsyncPriorityScheduler(_WeightedQueues):
+    """
+    Limits `AsyncTronEnergy` to `slots` requests in flight and serves waiting requests by priority class
+    with weighted fairness, so critical calls keep low latency while background jobs saturate the client.
+    """
+
+    def __init__(self, slots=32, weights:dict=None):
+        """
+        Parameters:
+            slots (int or AdaptiveLimit, optional): Maximum number of requests in flight. Defaults to 32.
+            weights (dict, optional): Share of the slots per class under contention. Defaults to critical 16, default 4, background 1.
+        """
+        super().__init__(slots, weights)
+
+    def _release(self):
+        self.active -= 1
+        while self.active < self.slots:
+            waiter = self._pop()
+            if waiter is None:
+                return
+            if not waiter.done():
+                self.active += 1
+                waiter.set_result(None)
+
+    async def acquire(self, priority:str=DEFAULT):
+        if self.active < self.slots and not self._waiting():
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._push(priority, waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            else:
+                waiter.cancel()
+                for queue in self._queues.values():
+                    if waiter in queue:
+                        queue.remove(waiter)
+            raise
+
+    def slot(self, method:str=None, url:str=None, priority:str=None):
+        return _AsyncSlot(self, self.resolve(method, url, priority))
+
+
+class _AsyncSlot:
+
+    def __init__(self, scheduler:AsyncPriorityScheduler, priority:str):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    async def __aenter__(self):
+        self._queued = monotonic()
+        await self.scheduler.acquire(self.priority)
+        self._started = monotonic()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.scheduler._record(self._started - self._queued, monotonic() - self._started, exc)
+        self.scheduler._release()
+
+
+class _NoSlot:
+    """Stands in for a scheduler slot when a client has no scheduler."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+NO_SLOT = _NoSlot()
+
+
+def concurrency_slots(concurrency):
+    """
+    Returns a factory of context managers that bound threaded work to `concurrency`.
+
+    Parameters:
+        concurrency (int or AdaptiveLimit): A fixed or adaptive number of calls in flight.
+    """
+    if isinstance(concurrency, AdaptiveLimit):
+        return PriorityScheduler(concurrency).slot
+    semaphore = threading.BoundedSemaphore(concurrency)
+    return lambda: semaphore
+
+
+def async_concurrency_slots(concurrency):
+    """
+    Returns a factory of async context managers that bound coroutines to `concurrency`.
+
+    Parameters:
+        concurrency (int or AdaptiveLimit): A fixed or adaptive number of calls in flight.
+    """
+    if isinstance(concurrency, AdaptiveLimit):
+        return AsyncPriorityScheduler(concurrency).slot
+    semaphore = asyncio.Semaphore(concurrency)
+    return lambda: semaphore
+
+
+def max_concurrency(concurrency):
+    """The most calls `concurrency` can ever allow in flight, used to size worker pools."""
+    return concurrency.max_limit if isinstance(concurrency, AdaptiveLimit) else concurrency
@@ -0,0 +1,311 @@
+import os
+import json
+import mmap
+import struct
+import asyncio
+import hashlib
+import threading
+from contextlib import contextmanager
+from time import time
+
+try:
+    import fcntl
+except ImportError:
+    # Without POSIX record locks, writers are only serialised within one process.
+    fcntl = None
+
+
+SHARED_CACHE_TTL = {
+    "/api/v1/frontend/index-data": 2.0,
+    "/api/v1/frontend/order/price": 2.0,
+    "/api/v1/frontend/order/query": 2.0,
+}
+
+_MAGIC = b"TESC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIII")  # magic, version, slots, slot size
+_SLOT = struct.Struct("<IQdI")     # sequence, key hash, expiry (seconds since the epoch), payload length
+_SEQUENCE = struct.Struct("<I")
+_PROBES = 8
+_STRIPES = 64
+_READ_RETRIES = 100
+_MISS = object()
+
+
+def _key_hash(key:str):
+    # Python's hash() is salted per process, so the slot of a key comes from a stable digest instead.
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+
+class SharedCache:
+    """
+    A bounded TTL cache in a memory-mapped file, shared by every process on the host that opens the same path.
+
+    The file holds a fixed number of slots, so its size never changes. A key lives in one of `_PROBES`
+    slots next to its hash; when they are all taken, the entry closest to expiry is evicted. Every slot
+    carries a sequence number that writers make odd while they update it, so reads take no lock: a
+    reader retries when the sequence was odd or changed under it. Writers hold an exclusive lock on the
+    file while they update a slot, and `get_or_fetch` holds a lock per key stripe while it calls the
+    upstream, so the processes of a host make one upstream call per key and TTL between them.
+    """
+
+    def __init__(self, path:str, slots:int=4096, slot_size:int=2048, clock=time):
+        """
+        Parameters:
+            path (str): The cache file, created if missing. Every process must use the same `slots` and `slot_size`.
+            slots (int, optional): Number of entries the cache holds. Defaults to 4096.
+            slot_size (int, optional): Bytes per entry, including a 24 byte header. Larger responses are not cached. Defaults to 2048.
+            clock (callable, optional): Returns the current time in seconds since the epoch. Defaults to `time.time`.
+        """
+        if slots < 1:
+            raise ValueError("slots must be at least 1")
+        if slot_size <= _SLOT.size:
+            raise ValueError(f"slot_size must be larger than {_SLOT.size}")
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "fills": 0, "evictions": 0}
+        self._size = _HEADER.size + slots * slot_size
+        self._write_lock = threading.Lock()
+        self._stripe_locks = [threading.Lock() for _ in range(_STRIPES)]
+        # The async path has its own locks: it holds one across an await, and a synchronous caller on the
+        # event loop thread waiting for it would block the loop that has to release it.
+        self._async_stripe_locks = [threading.Lock() for _ in range(_STRIPES)]
+        self._inflight = {}
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with self._writing():
+                if os.fstat(self._fd).st_size == 0:
+                    os.ftruncate(self._fd, self._size)
+                self._mm = mmap.mmap(self._fd, 0)
+                magic, version, file_slots, file_slot_size = _HEADER.unpack_from(self._mm, 0)
+                if magic == b"\0\0\0\0":
+                    _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, slots, slot_size)
+                elif (magic, version, file_slots, file_slot_size) != (_MAGIC, _VERSION, slots, slot_size):
+                    self._mm.close()
+                    raise ValueError(f"{path} is not a shared cache with slots={slots} and slot_size={slot_size}")
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def close(self):
+        """Unmaps the file. Entries stay available to the other processes."""
+        self._mm.close()
+        os.close(self._fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _lock_range(self, offset:int, blocking:bool=True):
+        # Record locks past the end of the file guard the cache without touching its bytes.
+        if fcntl is None:
+            return True
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB, 1, self._size + offset)
+        except (BlockingIOError, PermissionError):
+            return False
+        return True
+
+    def _unlock_range(self, offset:int):
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self._size + offset)
+
+    @contextmanager
+    def _writing(self):
+        with self._write_lock:
+            self._lock_range(0)
+            try:
+                yield
+            finally:
+                self._unlock_range(0)
+
+    def _offsets(self, key_hash:int):
+        first = key_hash % self.slots
+        for i in range(min(_PROBES, self.slots)):
+            yield _HEADER.size + (first + i) % self.slots * self.slot_size
+
+    def _read(self, key_hash:int):
+        mm = self._mm
+        now = self.clock()
+        for offset in self._offsets(key_hash):
+            for _ in range(_READ_RETRIES):
+                sequence, slot_hash, expires, length = _SLOT.unpack_from(mm, offset)
+                if sequence & 1:
+                    continue
+                if slot_hash != key_hash:
+                    break
+                payload = mm[offset + _SLOT.size:offset + _SLOT.size + length]
+                if _SEQUENCE.unpack_from(mm, offset)[0] != sequence:
+                    continue
+                return json.loads(payload) if expires > now else _MISS
+        return _MISS
+
+    def get(self, key:str, default=None):
+        """
+        Returns:
+            The unexpired value cached under `key`, or `default`.
+        """
+        value = self._read(_key_hash(key))
+        if value is _MISS:
+            self.stats["misses"] += 1
+            return default
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key:str, value, ttl:float):
+        """
+        Caches a JSON-serialisable value for `ttl` seconds.
+
+        Returns:
+            bool: Whether the value was stored; values larger than a slot are not.
+        """
+        payload = json.dumps(value, separators=(',', ':')).encode()
+        if len(payload) > self.slot_size - _SLOT.size:
+            return False
+        key_hash = _key_hash(key)
+        now = self.clock()
+        mm = self._mm
+        with self._writing():
+            target = free = oldest = None
+            oldest_expires = None
+            for offset in self._offsets(key_hash):
+                _, slot_hash, expires, _ = _SLOT.unpack_from(mm, offset)
+                if slot_hash == key_hash:
+                    target = offset
+                    break
+                if free is None and (slot_hash == 0 or expires <= now):
+                    free = offset
+                if oldest is None or expires < oldest_expires:
+                    oldest, oldest_expires = offset, expires
+            if target is None:
+                target = free
+            if target is None:
+                target = oldest
+                self.stats["evictions"] += 1
+            # A writer that died mid-update leaves the sequence odd, so force it odd rather than adding one.
+            sequence = _SEQUENCE.unpack_from(mm, target)[0]
+            writing = sequence | 1
+            _SEQUENCE.pack_into(mm, target, writing)
+            mm[target + _SLOT.size:target + _SLOT.size + len(payload)] = payload
+            _SLOT.pack_into(mm, target, writing, key_hash, now + ttl, len(payload))
+            _SEQUENCE.pack_into(mm, target, (writing + 1) & 0xFFFFFFFF)
+        return True
+
+    def get_or_fetch(self, key:str, ttl:float, fetch):
+        """
+        Returns the cached value of `key`, calling `fetch()` and caching its result on a miss.
+
+        Only one caller on the host fetches a key at a time; the others wait and read its result.
+
+        Parameters:
+            key (str): The cache key.
+            ttl (float): Seconds to cache a fetched value.
+            fetch (callable): Returns the value.
+        """
+        key_hash = _key_hash(key)
+        value = self._read(key_hash)
+        if value is not _MISS:
+            self.stats["hits"] += 1
+            return value
+        self.stats["misses"] += 1
+        stripe = key_hash % _STRIPES
+        with self._stripe_locks[stripe]:
+            self._lock_range(1 + stripe)
+            try:
+                value = self._read(key_hash)
+                if value is _MISS:
+                    value = fetch()
+                    self.stats["fills"] += 1
+                    self.set(key, value, ttl)
+            finally:
+                self._unlock_range(1 + stripe)
+        return value
+
+    async def async_get_or_fetch(self, key:str, ttl:float, fetch, poll_interval:float=0.005):
+        """
+        Same as `get_or_fetch` for a coroutine function `fetch`, without blocking the event loop while another caller fetches.
+        """
+        key_hash = _key_hash(key)
+        value = self._read(key_hash)
+        if value is not _MISS:
+            self.stats["hits"] += 1
+            return value
+        self.stats["misses"] += 1
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await self._async_fill(key, key_hash, ttl, fetch, poll_interval)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            del self._inflight[key]
+        return value
+
+    async def _async_fill(self, key:str, key_hash:int, ttl:float, fetch, poll_interval:float):
+        stripe = key_hash % _STRIPES
+        lock = self._async_stripe_locks[stripe]
+        while True:
+            if lock.acquire(blocking=False):
+                if self._lock_range(1 + stripe, blocking=False):
+                    break
+                lock.release()
+            # Another caller is fetching a key of this stripe; its result may already be cached.
+            await asyncio.sleep(poll_interval)
+            value = self._read(key_hash)
+            if value is not _MISS:
+                return value
+        try:
+            value = self._read(key_hash)
+            if value is _MISS:
+                value = await fetch()
+                self.stats["fills"] += 1
+                self.set(key, value, ttl)
+            return value
+        finally:
+            self._unlock_range(1 + stripe)
+            lock.release()
+
+
+def _cache_key(namespace:str, request):
+    return f"{namespace}{request.url}?{json.dumps(request.data, sort_keys=True, separators=(',', ':'))}"
+
+
+def shared_cache(cache:SharedCache, ttl:dict=None, namespace:str=""):
+    """
+    Builds middleware that serves the read endpoints of a `TronEnergy` from a `SharedCache`.
+
+    Parameters:
+        cache (SharedCache): The cache shared by the processes of the host.
+        ttl (dict, optional): Seconds to cache the GET responses of each path. Defaults to `SHARED_CACHE_TTL`.
+        namespace (str, optional): Prefix of the keys, e.g. the API key when several accounts share one file.
+    """
+    ttl = SHARED_CACHE_TTL if ttl is None else ttl
+
+    def middleware(request, call_next):
+        seconds = ttl.get(request.url) if request.method == "GET" else None
+        if not seconds:
+            return call_next(request)
+        return cache.get_or_fetch(_cache_key(namespace, request), seconds, lambda: call_next(request))
+    return middleware
+
+
+def async_shared_cache(cache:SharedCache, ttl:dict=None, namespace:str=""):
+    """Same as `shared_cache` for `AsyncTronEnergy`."""
+    ttl = SHARED_CACHE_TTL if ttl is None else ttl
+
+    async def middleware(request, call_next):
+        seconds = ttl.get(request.url) if request.method == "GET" else None
+        if not seconds:
+            return await call_next(request)
+        return await cache.async_get_or_fetch(_cache_key(namespace, request), seconds, lambda: call_next(request))
+    return middleware
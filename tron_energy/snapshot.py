@@ -0,0 +1,69 @@
+import os
+import gzip
+import json
+from time import time
+
+
+SNAPSHOT_VERSION = 1
+
+# Seconds after which restored measurements no longer describe the service and are dropped.
+FRESHNESS = {
+    "clock": 6 * 3600.0,
+    "endpoints": 300.0,
+    "balances": 60.0,
+}
+
+
+def is_fresh(taken:float, kind:str):
+    """Tells whether state of the given kind captured at `taken` (seconds since the epoch) may still be used."""
+    return taken is not None and 0 <= time() - taken <= FRESHNESS[kind]
+
+
+def save_snapshot(path:str, **components):
+    """
+    Writes the in-memory state of several components to one gzip-compressed JSON file.
+
+    The file is written next to `path` and renamed over it, so a crash never leaves a torn snapshot.
+
+    Parameters:
+        path (str): The snapshot file.
+        **components: Objects with a `snapshot()` method, e.g. `client=client, gateway=gateway`.
+    """
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "taken": time(),
+        "components": {name: component.snapshot() for name, component in components.items()},
+    }
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def load_snapshot(path:str, **components):
+    """
+    Restores components from a file written by `save_snapshot`.
+
+    Every component checks the freshness of its own entries, so stale ones are skipped. A missing or
+    unreadable snapshot restores nothing.
+
+    Parameters:
+        path (str): The snapshot file.
+        **components: Objects with a `restore(state)` method, under the names they were saved with.
+
+    Returns:
+        list: The names of the components that were found in the snapshot and restored.
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, EOFError, ValueError):
+        return []
+    if data.get("version") != SNAPSHOT_VERSION:
+        return []
+    restored = []
+    for name, component in components.items():
+        if name in data["components"]:
+            component.restore(data["components"][name])
+            restored.append(name)
+    return restored
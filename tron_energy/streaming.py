@@ -0,0 +1,134 @@
+import re
+import json
+import codecs
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+_START, _KEY, _COLON, _VALUE, _ELEMENT, _ELEMENT_SEP, _AFTER_VALUE, _DONE = range(8)
+
+
+class RecordStream:
+    """
+    Incrementally decodes a JSON object of the form `{..., "results": [record, ...], ...}`.
+
+    Bytes are fed as they arrive from the socket and every complete record of the `results` array is
+    returned as soon as it has been received, so memory use is bounded by the largest record instead
+    of the whole body. The other top-level fields (`count`, `next`, ...) are collected in `meta`.
+
+    Each value is decoded with the C JSON decoder; a value cut off at the end of a chunk simply fails
+    to decode and is retried once more data has arrived.
+    """
+
+    def __init__(self, key:str="results"):
+        self.key = key
+        self.meta = {}
+        self._buf = ""
+        self._state = _START
+        self._current_key = None
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+
+    def feed(self, chunk:bytes):
+        """
+        Parameters:
+            chunk (bytes): The next part of the body.
+
+        Returns:
+            list: The records completed by this chunk.
+        """
+        self._buf += self._text.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        Returns:
+            list: The remaining records.
+
+        Raises:
+            ValueError: If the body ended before the JSON object was complete.
+        """
+        self._buf += self._text.decode(b"", final=True)
+        records = self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError("Incomplete JSON response")
+        return records
+
+    def _decode(self, buf:str, pos:int, final:bool):
+        # Returns (value, end), or None if more data is needed. A scalar at the very end of the buffer may
+        # still be cut off (`12` of `123`), so a value only counts once something follows it.
+        try:
+            value, end = self._json.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError(f"Invalid JSON at position {pos}") from None
+            return None
+        if not final and _WHITESPACE.match(buf, end).end() >= len(buf):
+            return None
+        return value, end
+
+    def _expect(self, c:str, allowed:str):
+        if c not in allowed:
+            raise ValueError(f"Unexpected {c!r} in JSON response, expected one of {allowed!r}")
+
+    def _parse(self, final:bool):
+        records = []
+        buf = self._buf
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            c = buf[pos]
+            state = self._state
+            if state == _START:
+                self._expect(c, "{")
+                pos += 1
+                self._state = _KEY
+            elif state == _KEY:
+                if c == "}":
+                    pos += 1
+                    self._state = _DONE
+                    continue
+                decoded = self._decode(buf, pos, final)
+                if decoded is None:
+                    break
+                self._current_key, pos = decoded
+                self._state = _COLON
+            elif state == _COLON:
+                self._expect(c, ":")
+                pos += 1
+                self._state = _VALUE
+            elif state == _VALUE:
+                if c == "[" and self._current_key == self.key:
+                    pos += 1
+                    self._state = _ELEMENT
+                    continue
+                decoded = self._decode(buf, pos, final)
+                if decoded is None:
+                    break
+                self.meta[self._current_key], pos = decoded
+                self._state = _AFTER_VALUE
+            elif state == _ELEMENT:
+                if c == "]":
+                    pos += 1
+                    self._state = _AFTER_VALUE
+                    continue
+                decoded = self._decode(buf, pos, final)
+                if decoded is None:
+                    break
+                record, pos = decoded
+                records.append(record)
+                self._state = _ELEMENT_SEP
+            elif state == _ELEMENT_SEP:
+                self._expect(c, ",]")
+                pos += 1
+                self._state = _ELEMENT if c == "," else _AFTER_VALUE
+            elif state == _AFTER_VALUE:
+                self._expect(c, ",}")
+                pos += 1
+                self._state = _KEY if c == "," else _DONE
+            else:
+                raise ValueError("Unexpected data after the JSON response")
+        self._buf = buf[pos:]
+        return records
@@ -0,0 +1,183 @@
+import asyncio
+from collections import namedtuple
+from time import monotonic
+
+from .address import validate_address
+from .scheduler import async_concurrency_slots, max_concurrency
+
+
+MIN_TIMES = 5
+MAX_TIMES = 1000
+
+TopUpRule = namedtuple("TopUpRule", ["threshold", "times"], defaults=(100,))
+TopUpRule.__doc__ = "Buy `times` more transfers for an address once fewer than `threshold` are left."
+
+_REMAINING_FIELDS = ("remain_times", "remaining_times", "left_times")
+
+
+def remaining_transfers(record:dict):
+    """
+    Returns:
+        int: The transfers left on a count-delegate policy, or None if the record does not say.
+    """
+    for field in _REMAINING_FIELDS:
+        if record.get(field) is not None:
+            return int(record[field])
+    if record.get("times") is not None and record.get("used_times") is not None:
+        return int(record["times"]) - int(record["used_times"])
+    return None
+
+
+class CountDelegateManager:
+    """
+    Keeps count-delegate purchases topped up.
+
+    Every scan streams all count-delegate policies once through `iter_purchases_by_number_of_transfers`
+    into an index of the transfers left per address, so monitoring costs one paginated scan per
+    `interval` however many addresses are watched. Addresses whose count fell below the threshold of
+    their `TopUpRule` are topped up together through `purchase_by_number_of_transfers`, with at most
+    `concurrency` calls in flight. A topped-up address is not bought for again until a scan shows the
+    new transfers or `pending_timeout` seconds have passed. An address whose policies do not report
+    the transfers left is never topped up, since its count is unknown rather than zero; it is listed
+    in `unreadable` and counted in `stats`.
+    """
+
+    def __init__(self, client, rules:dict, interval:float=60, concurrency=8, pending_timeout:float=300, clock=monotonic):
+        """
+        Parameters:
+            client (AsyncTronEnergy): The client used to read and buy the policies.
+            rules (dict): `TopUpRule` tuples, or plain thresholds, keyed by receive address.
+            interval (float, optional): Seconds between two scans of `run`. Defaults to 60.
+            concurrency (int or AdaptiveLimit, optional): Maximum number of purchases in flight. Defaults to 8.
+            pending_timeout (float, optional): Seconds after which an unconfirmed top-up may be repeated. Defaults to 300.
+            clock (callable, optional): Returns the current time in seconds. Defaults to `time.monotonic`.
+        """
+        self.client = client
+        self.rules = {}
+        for address, rule in rules.items():
+            self.set_rule(address, rule)
+        self.interval = interval
+        self.concurrency = concurrency
+        self.pending_timeout = pending_timeout
+        self.clock = clock
+        self.index = {}
+        self.unreadable = set()
+        self.stats = {"scans": 0, "records": 0, "unreadable": 0, "top_ups": 0, "errors": 0}
+        self._pending = {}
+
+    def set_rule(self, receive_address:str, rule):
+        """
+        Sets the top-up rule of an address.
+
+        Parameters:
+            receive_address (str): The Tron address.
+            rule (TopUpRule or int): The rule, or a threshold topped up with the default number of transfers.
+        """
+        if not isinstance(rule, TopUpRule):
+            rule = TopUpRule(*rule) if isinstance(rule, (tuple, list)) else TopUpRule(rule)
+        if not MIN_TIMES <= rule.times <= MAX_TIMES:
+            raise ValueError(f"times must be between {MIN_TIMES} and {MAX_TIMES}, got {rule.times}")
+        if getattr(self.client, "validate_addresses", False):
+            validate_address(receive_address)
+        self.rules[receive_address] = rule
+
+    def remove_rule(self, receive_address:str):
+        """Stops topping up an address."""
+        self.rules.pop(receive_address, None)
+        self._pending.pop(receive_address, None)
+
+    async def scan(self):
+        """
+        Rebuilds the index of transfers left per address from one scan of every count-delegate policy.
+
+        Returns:
+            dict: The transfers left, summed over the policies of each address.
+        """
+        index = {}
+        unreadable = set()
+        records = 0
+        async for record in self.client.iter_purchases_by_number_of_transfers():
+            records += 1
+            address = record["receive_address"]
+            remaining = remaining_transfers(record)
+            if remaining is None:
+                unreadable.add(address)
+            else:
+                index[address] = index.get(address, 0) + max(remaining, 0)
+        self.index = index
+        self.unreadable = unreadable - set(index)
+        self.stats["scans"] += 1
+        self.stats["records"] += records
+        self.stats["unreadable"] += len(self.unreadable)
+        return index
+
+    def plan(self):
+        """
+        Returns:
+            list: `(receive_address, times)` pairs of the addresses below their threshold in the current index.
+            Addresses in `unreadable` are left out.
+        """
+        now = self.clock()
+        due = []
+        for address, rule in self.rules.items():
+            if address in self.unreadable:
+                continue
+            remaining = self.index.get(address, 0)
+            if remaining >= rule.threshold:
+                self._pending.pop(address, None)
+                continue
+            if self._pending.get(address, 0) > now:
+                continue
+            due.append((address, rule.times))
+        return due
+
+    async def top_up(self, due=None):
+        """
+        Buys transfers for the addresses that need them.
+
+        Parameters:
+            due (list, optional): `(receive_address, times)` pairs. Defaults to `plan()`.
+
+        Returns:
+            list: `(receive_address, result)` pairs, where result is the API response or the raised exception.
+        """
+        due = self.plan() if due is None else due
+        results = [None] * len(due)
+        pending = iter(enumerate(due))
+        slot = async_concurrency_slots(self.concurrency)
+
+        async def worker():
+            for i, (address, times) in pending:
+                try:
+                    async with slot():
+                        results[i] = await self.client.purchase_by_number_of_transfers(times, address)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    results[i] = e
+                else:
+                    self.stats["top_ups"] += 1
+                    self._pending[address] = self.clock() + self.pending_timeout
+
+        await asyncio.gather(*(worker() for _ in range(min(max_concurrency(self.concurrency), len(due)))))
+        return [(address, result) for (address, _), result in zip(due, results)]
+
+    async def tick(self):
+        """
+        Scans the policies once and tops up the addresses below their threshold.
+
+        Returns:
+            list: `(receive_address, result)` pairs of the top-ups, see `top_up`.
+        """
+        await self.scan()
+        return await self.top_up()
+
+    async def run(self):
+        """Scans and tops up once per `interval` until cancelled. A failed scan is retried on the next interval."""
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats["errors"] += 1
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,333 @@
+import os
+import asyncio
+import requests
+from contextlib import contextmanager, asynccontextmanager
+from aiohttp import ClientSession, ClientConnectionError, ClientResponseError
+
+from .core import HttpRequest, HttpResponse, HTTPStatusError
+
+try:
+    import httpx
+except ImportError:  # httpx is optional; only the HTTP/2 transports need it.
+    httpx = None
+
+
+def _params(request:HttpRequest):
+    # None values are left out of the query string, as requests does.
+    if not request.params:
+        return None
+    return {key: value for key, value in request.params.items() if value is not None}
+
+
+class RequestsHTTPStatusError(HTTPStatusError, requests.exceptions.HTTPError):
+    """The `HTTPStatusError` of `RequestsTransport`, still caught by handlers of `requests.HTTPError`."""
+
+
+class AiohttpHTTPStatusError(HTTPStatusError, ClientResponseError):
+    """The `HTTPStatusError` of `AiohttpTransport`, still caught by handlers of `aiohttp.ClientResponseError`."""
+
+    def __init__(self, status:int, body):
+        ClientResponseError.__init__(self, None, (), status=status, message=body)
+        self.body = body
+        self.args = (f"{status}: {body}",)
+
+    def __str__(self):
+        return self.args[0]
+
+
+class Transport:
+    """
+    Sends the requests built by the sans-I/O core for `TronEnergy`.
+
+    Subclasses implement `send`, which returns an `HttpResponse` and raises `OSError` (e.g.
+    `ConnectionError`) when the server cannot be reached, so endpoint failover treats every transport alike.
+    They may override `stream` to hand out the body as it arrives; by default it is read at once.
+    `status_error` is the `HTTPStatusError` subclass the clients raise for responses outside the 2xx range.
+    """
+
+    status_error = HTTPStatusError
+
+    def send(self, request:HttpRequest):
+        raise NotImplementedError
+
+    @contextmanager
+    def stream(self, request:HttpRequest, chunk_size:int=65536):
+        """
+        Sends a request and yields its `HttpResponse`, whose `body` is an iterable of byte chunks.
+        """
+        response = self.send(request)
+        yield HttpResponse(response.status, response.headers, (response.body,))
+
+    def close(self):
+        pass
+
+
+class AsyncTransport:
+    """Sends the requests built by the sans-I/O core for `AsyncTronEnergy`. See `Transport`."""
+
+    status_error = HTTPStatusError
+
+    async def send(self, request:HttpRequest):
+        raise NotImplementedError
+
+    @asynccontextmanager
+    async def stream(self, request:HttpRequest, chunk_size:int=65536):
+        """
+        Sends a request and yields its `HttpResponse`, whose `body` is an async iterable of byte chunks.
+        """
+        response = await self.send(request)
+
+        async def body():
+            yield response.body
+        yield HttpResponse(response.status, response.headers, body())
+
+    async def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    HTTP/1.1 through a `requests.Session`, one connection per request in flight. The default of `TronEnergy`.
+
+    A session inherited through `os.fork()` shares its pooled sockets with the parent process, so a
+    fresh one is built the first time the transport is used in a new process.
+    """
+
+    status_error = RequestsHTTPStatusError
+
+    def __init__(self, headers:dict=None, session_factory=None):
+        """
+        Parameters:
+            headers (dict, optional): Extra headers sent with every request. The clients add the account headers themselves.
+            session_factory (callable, optional): Returns a new `requests.Session`. Defaults to `requests.Session`.
+        """
+        self.headers = headers or {}
+        self.session_factory = session_factory or requests.Session
+        self._session = None
+        self._pid = None
+
+    @property
+    def session(self):
+        """The `requests.Session` of the current process."""
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            self._session = self.session_factory()
+            self._session.headers.update(self.headers)
+            self._pid = pid
+        return self._session
+
+    @session.setter
+    def session(self, value:requests.Session):
+        self._session = value
+        self._pid = os.getpid()
+
+    def _request(self, request:HttpRequest, **kwargs):
+        send = getattr(self.session, request.method.lower())
+        return send(request.url, params=_params(request), data=request.body, headers=request.headers, **kwargs)
+
+    def send(self, request:HttpRequest):
+        try:
+            response = self._request(request)
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionError(str(e)) from e
+        return HttpResponse(response.status_code, response.headers, response.content)
+
+    @contextmanager
+    def stream(self, request:HttpRequest, chunk_size:int=65536):
+        try:
+            with self._request(request, stream=True) as response:
+                yield HttpResponse(response.status_code, response.headers, response.iter_content(chunk_size))
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionError(str(e)) from e
+
+    def close(self):
+        session, self._session = self._session, None
+        if session is not None and self._pid == os.getpid():
+            session.close()
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    HTTP/1.1 through an aiohttp `ClientSession`, one connection per request in flight. The default of `AsyncTronEnergy`.
+
+    A `ClientSession` is bound to the loop and process it was created in, so the session is created
+    inside the running event loop and rebuilt after `os.fork()` or when used from another loop. The
+    stale session is dropped without closing it, since its sockets belong to the other process or loop.
+    """
+
+    status_error = AiohttpHTTPStatusError
+
+    def __init__(self, headers:dict=None, session_factory=None, **session_kwargs):
+        """
+        Parameters:
+            headers (dict, optional): Extra headers sent with every request. The clients add the account headers themselves.
+            session_factory (callable, optional): Returns a new `ClientSession`. `headers` and `session_kwargs` are ignored when given.
+            **session_kwargs: Passed to `ClientSession`, e.g. a `connector` with other connection limits.
+        """
+        self.headers = headers or {}
+        self.session_factory = session_factory
+        self.session_kwargs = session_kwargs
+        self._session = None
+        self._owner = None
+
+    @property
+    def session(self):
+        """The `ClientSession` of the running event loop."""
+        owner = (os.getpid(), asyncio.get_running_loop())
+        if self._session is None or self._session.closed or self._owner != owner:
+            if self.session_factory is not None:
+                self._session = self.session_factory()
+            else:
+                self._session = ClientSession(headers=self.headers, **self.session_kwargs)
+            self._owner = owner
+        return self._session
+
+    @session.setter
+    def session(self, value:ClientSession):
+        self._session = value
+        self._owner = (os.getpid(), asyncio.get_running_loop())
+
+    def _request(self, request:HttpRequest):
+        send = getattr(self.session, request.method.lower())
+        return send(request.url, params=_params(request), data=request.body, headers=request.headers)
+
+    async def send(self, request:HttpRequest):
+        try:
+            async with self._request(request) as response:
+                return HttpResponse(response.status, response.headers, await response.read())
+        except ClientConnectionError as e:
+            raise ConnectionError(str(e)) from e
+
+    @asynccontextmanager
+    async def stream(self, request:HttpRequest, chunk_size:int=65536):
+        try:
+            async with self._request(request) as response:
+                yield HttpResponse(response.status, response.headers, response.content.iter_chunked(chunk_size))
+        except ClientConnectionError as e:
+            raise ConnectionError(str(e)) from e
+
+    async def close(self):
+        session, self._session = self._session, None
+        if session is None or session.closed:
+            return
+        try:
+            current = (os.getpid(), asyncio.get_running_loop())
+        except RuntimeError:
+            current = None
+        if self._owner == current:
+            await session.close()
+        else:
+            # Closing from a foreign loop or process would touch sockets we do not own.
+            session.detach()
+
+
+def _require_httpx():
+    if httpx is None:
+        raise ImportError("The HTTP/2 transports need httpx with HTTP/2 support: pip install 'Tron-Energy[http2]'")
+
+
+class HttpxTransport(Transport):
+    """
+    HTTP/2 through `httpx.Client`, which multiplexes concurrent requests over a few connections.
+
+    Servers that do not offer HTTP/2 during the TLS handshake are spoken to over HTTP/1.1. As with
+    `RequestsTransport`, a fresh client is built the first time the transport is used in a new process.
+    """
+
+    def __init__(self, headers:dict=None, http1:bool=True, **client_kwargs):
+        """
+        Parameters:
+            headers (dict, optional): Extra headers sent with every request. The clients add the account headers themselves.
+            http1 (bool, optional): Allow falling back to HTTP/1.1. Pass False to speak HTTP/2 to plain `http://` servers.
+            **client_kwargs: Passed to `httpx.Client`, e.g. `limits` or `timeout`.
+        """
+        _require_httpx()
+        self.headers = headers
+        self.http1 = http1
+        self.client_kwargs = client_kwargs
+        self._client = None
+        self._pid = None
+
+    @property
+    def client(self):
+        """The `httpx.Client` of the current process."""
+        pid = os.getpid()
+        if self._client is None or self._client.is_closed or self._pid != pid:
+            self._client = httpx.Client(http2=True, http1=self.http1, headers=self.headers, **self.client_kwargs)
+            self._pid = pid
+        return self._client
+
+    def send(self, request:HttpRequest):
+        try:
+            response = self.client.request(request.method, request.url, params=_params(request), content=request.body,
+                                           headers=request.headers)
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+        return HttpResponse(response.status_code, response.headers, response.content)
+
+    @contextmanager
+    def stream(self, request:HttpRequest, chunk_size:int=65536):
+        try:
+            with self.client.stream(request.method, request.url, params=_params(request), content=request.body,
+                                    headers=request.headers) as response:
+                yield HttpResponse(response.status_code, response.headers, response.iter_bytes(chunk_size))
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+
+    def close(self):
+        client, self._client = self._client, None
+        if client is not None and self._pid == os.getpid():
+            client.close()
+
+
+class AsyncHttpxTransport(AsyncTransport):
+    """
+    HTTP/2 through `httpx.AsyncClient`, which multiplexes concurrent requests over a few connections.
+
+    Hundreds of calls in flight share one connection instead of opening one each. The client is
+    created inside the running event loop and rebuilt after `os.fork()` or when used from another loop.
+    """
+
+    def __init__(self, headers:dict=None, http1:bool=True, **client_kwargs):
+        """
+        Parameters:
+            headers (dict, optional): Extra headers sent with every request. The clients add the account headers themselves.
+            http1 (bool, optional): Allow falling back to HTTP/1.1. Pass False to speak HTTP/2 to plain `http://` servers.
+            **client_kwargs: Passed to `httpx.AsyncClient`, e.g. `limits` or `timeout`.
+        """
+        _require_httpx()
+        self.headers = headers
+        self.http1 = http1
+        self.client_kwargs = client_kwargs
+        self._client = None
+        self._owner = None
+
+    @property
+    def client(self):
+        owner = (os.getpid(), asyncio.get_running_loop())
+        if self._client is None or self._client.is_closed or self._owner != owner:
+            self._client = httpx.AsyncClient(http2=True, http1=self.http1, headers=self.headers, **self.client_kwargs)
+            self._owner = owner
+        return self._client
+
+    async def send(self, request:HttpRequest):
+        try:
+            response = await self.client.request(request.method, request.url, params=_params(request),
+                                                 content=request.body, headers=request.headers)
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+        return HttpResponse(response.status_code, response.headers, response.content)
+
+    @asynccontextmanager
+    async def stream(self, request:HttpRequest, chunk_size:int=65536):
+        try:
+            async with self.client.stream(request.method, request.url, params=_params(request), content=request.body,
+                                          headers=request.headers) as response:
+                yield HttpResponse(response.status_code, response.headers, response.aiter_bytes(chunk_size))
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+
+    async def close(self):
+        client, self._client = self._client, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
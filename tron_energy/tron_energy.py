@@ -1,10 +1,19 @@
 import os
-import requests
 import hmac
-import hashlib
-import json
+import threading
 from urllib.parse import urljoin
-from time import time
+from contextlib import ExitStack
+from time import time, monotonic
+
+from .address import validate_address, known_addresses, remember_addresses
+from .clock import ClockOffset
+from .streaming import RecordStream
+from .scheduler import NO_SLOT
+from .middleware import Request, compose
+from .endpoints import EndpointSelector, is_endpoint_failure, PROBE_PATH
+from .transport import RequestsTransport
+from . import core
+from .core import HttpRequest, HttpResponse, build_request, parse_response, session_headers, jsonify, sign
 
 
 TronAddress = str
@@ -13,7 +22,8 @@ TronAddress = str
 class TronEnergy(object):
     base_url = 'https://itrx.io/'
 
-    def __init__(self, api_key:str=None, api_secret:str=None):
+    def __init__(self, api_key:str=None, api_secret:str=None, validate_addresses:bool=False, quota_tracker=None,
+                 scheduler=None, middleware=None, base_url=None, transport=None):
         
         if not api_secret:
             api_secret = os.getenv('TRON_ENERGY_API_SECRET')
@@ -24,37 +34,200 @@ class TronEnergy(object):
         if api_key is None:
             raise ValueError("API key is required")
 
+        self._api_key = api_key
         self._api_secret = str(api_secret)
-        self.sess = requests.session()
-        self.sess.headers["API-KEY"] = api_key
-        self.sess.headers["Content-Type"] = "application/json"
+        self.validate_addresses = validate_addresses
+        self.quota_tracker = quota_tracker
+        self.scheduler = scheduler
+        self.transport = transport if transport is not None else RequestsTransport(headers=session_headers(self._api_key))
+        self.clock = ClockOffset()
+        self.endpoints = None
+        if isinstance(base_url, (list, tuple)) and len(base_url) > 1:
+            self.endpoints = EndpointSelector(base_url)
+        elif base_url:
+            self.base_url = base_url if isinstance(base_url, str) else base_url[0]
+        self.middleware = []
+        self._pipeline = None
+        self.use(*(middleware or ()))
+
+    @property
+    def sess(self):
+        """
+        The `requests` session of the default `RequestsTransport`, rebuilt after `os.fork()`.
+
+        Other transports have no session.
+        """
+        return self.transport.session
+
+    @sess.setter
+    def sess(self, value):
+        self.transport.session = value
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: The clock offset, endpoint measurements and known-good addresses, for `save_snapshot`.
+        """
+        addresses = known_addresses() if self.validate_addresses else []
+        return {
+            "clock": self.clock.snapshot(),
+            "endpoints": self.endpoints.snapshot() if self.endpoints is not None else None,
+            "addresses": addresses,
+            "addresses_signature": self._sign("\n".join(addresses)),
+        }
+
+    def restore(self, state:dict):
+        """
+        Warms the client up from a `snapshot`, skipping measurements that are no longer fresh.
+
+        The addresses are trusted without decoding them again only if they are signed with this client's
+        API secret; otherwise they are ignored.
+        """
+        self.clock.restore(state.get("clock"))
+        if self.endpoints is not None:
+            self.endpoints.restore(state.get("endpoints"))
+        addresses = state.get("addresses") or []
+        if hmac.compare_digest(self._sign("\n".join(addresses)), state.get("addresses_signature") or ""):
+            remember_addresses(addresses)
 
     def _get_timestamp(self):
-        return str(int(time()))
+        return str(int(self.clock.time()))
+
+    @property
+    def clock_offset(self):
+        """The estimated server clock offset in seconds, as used for the TIMESTAMP header."""
+        return self.clock.offset
     
     def _sign(self, message:str):
-        return hmac.new(self._api_secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+        return sign(self._api_secret, message)
     
     def _jsonify(self, data:dict):
-        if data:
-            return json.dumps(data, sort_keys=True, separators=(',', ':'))
-        return ""
+        return jsonify(data)
+
+    def _check_address(self, receive_address:TronAddress):
+        # Rejects malformed addresses before any network I/O when address validation is enabled.
+        if self.validate_addresses and receive_address is not None:
+            validate_address(receive_address)
     
-    def make_request(self, method:str, url:str, data:dict=None):
-        timestamp = self._get_timestamp()
-        headers = {"TIMESTAMP": timestamp}
-        if method.upper() == "POST":
-            json_data = self._jsonify(data)
-            headers["SIGNATURE"] = self._sign(f'{timestamp}&{json_data}')
-            response = self.sess.post(urljoin(self.base_url, url), data=json_data, headers=headers)
-        else:
-           response = self.sess.get(urljoin(self.base_url, url), params=data, headers=headers) 
-
-        if response.status_code == 400:
-            raise requests.exceptions.HTTPError(response.json())
-        else:
-            response.raise_for_status()
-        return response.json()
+    def use(self, *middleware):
+        """
+        Appends middleware to the chain every `make_request` call passes through.
+
+        Parameters:
+            *middleware: Functions called as `middleware(request, call_next)` or `Interceptor` instances.
+
+        Returns:
+            TronEnergy: The same client.
+        """
+        self.middleware.extend(middleware)
+        self._pipeline = compose(self.middleware, self._handle) if self.middleware else None
+        return self
+
+    def _handle(self, request:Request):
+        return self._dispatch(request.method, request.url, request.data, request.priority)
+
+    def make_request(self, method:str, url:str, data:dict=None, priority:str=None):
+        if self._pipeline is not None:
+            return self._pipeline(Request(method, url, data, priority))
+        return self._dispatch(method, url, data, priority)
+
+    def _dispatch(self, method:str, url:str, data:dict=None, priority:str=None):
+        if self.quota_tracker is not None:
+            self.quota_tracker.acquire(method, url)
+        if self.scheduler is None:
+            return self._send(method, url, data)
+        with self.scheduler.slot(method, url, priority):
+            return self._send(method, url, data)
+
+    def _send(self, method:str, url:str, data:dict=None):
+        if self.endpoints is None:
+            return self._send_to(self.base_url, method, url, data)
+        self._start_probes()
+        tried = []
+        while True:
+            base_url = self.endpoints.choose(tried)
+            started = monotonic()
+            try:
+                response = self._send_to(base_url, method, url, data)
+            except Exception as e:
+                failed = is_endpoint_failure(e)
+                self.endpoints.observe(base_url, monotonic() - started, failed)
+                tried.append(base_url)
+                # Only reads are retried elsewhere; an order may have reached the server before the failure.
+                if failed and method.upper() != "POST" and len(tried) < len(self.endpoints):
+                    continue
+                raise
+            self.endpoints.observe(base_url, monotonic() - started)
+            return response
+
+    def _start_probes(self):
+        for base_url in self.endpoints.due_probes():
+            threading.Thread(target=self._probe, args=(base_url,), daemon=True).start()
+
+    def _probe(self, base_url:str):
+        started = monotonic()
+        try:
+            failed = self.transport.send(HttpRequest("GET", urljoin(base_url, PROBE_PATH))).status >= 500
+        except Exception:
+            failed = True
+        self.endpoints.probed(base_url, monotonic() - started, failed)
+
+    def _build_request(self, base_url:str, method:str, url:str, data:dict=None):
+        request = build_request(base_url, method, url, data, self._api_secret, self._get_timestamp())
+        request.headers.update(session_headers(self._api_key))
+        return request
+
+    def _send_to(self, base_url:str, method:str, url:str, data:dict=None):
+        request = self._build_request(base_url, method, url, data)
+        sent = time()
+        response = self.transport.send(request)
+        self.clock.observe(response.headers, sent, time())
+        return parse_response(response, self.transport.status_error)
+
+    def stream_records(self, url:str, data:dict=None, chunk_size:int=65536):
+        """
+        Streams the `results` of a paginated GET endpoint, following the `next` links.
+
+        The body is decoded incrementally as the transport receives it, so only one record is held in memory
+        at a time with a transport that streams, such as the default one. A scheduler slot is only held until
+        the response headers of each page arrive, so a slow consumer does not keep other calls waiting.
+
+        Parameters:
+            url (str): The endpoint.
+            data (dict, optional): The query parameters of the first page.
+            chunk_size (int, optional): Number of bytes read from the socket at a time. Defaults to 64KiB.
+
+        Returns:
+            generator: The records, one at a time.
+        """
+        while url:
+            if self.quota_tracker is not None:
+                self.quota_tracker.acquire("GET", url)
+            slot = self.scheduler.slot("GET", url) if self.scheduler is not None else NO_SLOT
+            with ExitStack() as stack:
+                with slot:
+                    base_url = self.endpoints.choose() if self.endpoints is not None else self.base_url
+                    request = self._build_request(base_url, "GET", url, data)
+                    sent = time()
+                    response = stack.enter_context(self.transport.stream(request, chunk_size))
+                    self.clock.observe(response.headers, sent, time())
+                    if not 200 <= response.status < 300:
+                        parse_response(HttpResponse(response.status, response.headers, b"".join(response.body)),
+                                       self.transport.status_error)
+                stream = RecordStream()
+                for chunk in response.body:
+                    yield from stream.feed(chunk)
+                yield from stream.close()
+            url, data = stream.meta.get("next"), None
 
     def verify_signature(self, signature:str, timestamp:str, data:dict):
        json_data = self._jsonify(data)
@@ -68,8 +241,7 @@ class TronEnergy(object):
         Returns:
         dict: A dictionary containing the public data retrieved from the API.
         """
-        url = "/api/v1/frontend/index-data"
-        return self.make_request("GET", url)
+        return self.make_request(*core.public_data())
     
     def get_wallet_balance(self):
         """
@@ -105,17 +277,8 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order"
-        data = {
-            "receive_address": receive_address,
-            "energy_amount": energy_amount,
-            "period": period,
-        }
-        if out_trade_no:
-            data["out_trade_no"] = out_trade_no
-        if callback_url:
-            data["callback_url"] = callback_url
-        return self.make_request("POST", url, data)
+        self._check_address(receive_address)
+        return self.make_request(*core.place_order(receive_address, energy_amount, period, out_trade_no, callback_url))
     
     def transfer_small_trx_amount(self, amount:int, receive_address:TronAddress):
         """
@@ -128,12 +291,8 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order/transfer"
-        data = {
-            "amount": amount,
-            "receive_address": receive_address,
-        }
-        return self.make_request("POST", url, data)
+        self._check_address(receive_address)
+        return self.make_request(*core.transfer_small_trx_amount(amount, receive_address))
     
     def purchase_by_number_of_transfers(self, times:int, receive_address:TronAddress):
         """
@@ -144,12 +303,8 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/count-delegate-policy"
-        data = {
-            "times": times,
-            "receive_address": receive_address,
-        }
-        return self.make_request("POST", url, data)
+        self._check_address(receive_address)
+        return self.make_request(*core.purchase_by_number_of_transfers(times, receive_address))
     
     def list_purchases_by_number_of_transfers(self, receive_address:TronAddress=None): # Note: We will have to do something about pagination here.
         """
@@ -159,10 +314,23 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = f"/api/v1/frontend/count-delegate-policy"
-        data = {"receive_address": receive_address} if receive_address else None
-        return self.make_request("GET", url, data)
+        self._check_address(receive_address)
+        return self.make_request(*core.list_purchases_by_number_of_transfers(receive_address))
     
+    def iter_purchases_by_number_of_transfers(self, receive_address:TronAddress=None):
+        """
+        Streaming variant of `list_purchases_by_number_of_transfers` that follows pagination.
+
+        Parameters:
+            receive_address (TronAddress): Query a specific address, if not filled in, return all.
+
+        Returns:
+            generator: The count-delegate policies, one at a time.
+        """
+        self._check_address(receive_address)
+        _, url, data = core.list_purchases_by_number_of_transfers(receive_address)
+        return self.stream_records(url, data)
+
     def create_smart_delegate(self, period:int, receive_address:TronAddress, max_energy:int=None):
         """
         Parameters:
@@ -173,14 +341,8 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/auto-delegate-policy"
-        data = {
-            "period": period,
-            "receive_address": receive_address,
-        }
-        if max_energy:
-            data["max_energy"] = max_energy
-        return self.make_request("POST", url, data)
+        self._check_address(receive_address)
+        return self.make_request(*core.create_smart_delegate(period, receive_address, max_energy))
     
     def list_smart_delegate(self, receive_address:TronAddress=None): # Note: We will have to do something about pagination here.
         """
@@ -190,9 +352,22 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/auto-delegate-policy"
-        data = {"receive_address": receive_address} if receive_address else None
-        return self.make_request("GET", url, data)
+        self._check_address(receive_address)
+        return self.make_request(*core.list_smart_delegate(receive_address))
+
+    def iter_smart_delegate(self, receive_address:TronAddress=None):
+        """
+        Streaming variant of `list_smart_delegate` that follows pagination.
+
+        Parameters:
+            receive_address (TronAddress): Query a specific address, if not filled in, return all.
+
+        Returns:
+            generator: The smart delegate policies, one at a time.
+        """
+        self._check_address(receive_address)
+        _, url, data = core.list_smart_delegate(receive_address)
+        return self.stream_records(url, data)
 
     def modify_smart_delegate(self, id:int, status:bool):
         """
@@ -203,9 +378,7 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = f"/api/v1/frontend/auto-delegate-policy/{id}/change-status"
-        data = {"status": int(status)} 
-        return self.make_request("POST", url, data)
+        return self.make_request(*core.modify_smart_delegate(id, status))
 
     def get_order(self, order_no:str):
         """
@@ -215,9 +388,7 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order/query"
-        data = {"serial": order_no}
-        return self.make_request("GET", url, data)
+        return self.make_request(*core.get_order(order_no))
     
     def recycle_order(self, order_no:str):
         """
@@ -227,9 +398,7 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order/reclaim"
-        data = {"serial": order_no}
-        return self.make_request("POST", url, data)
+        return self.make_request(*core.recycle_order(order_no))
     
     def estimate_order(self, energy_amount:int, period:str="1H"):
         """
@@ -242,12 +411,7 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the response from the API.
         """
-        url = "/api/v1/frontend/order/price"
-        data = {
-            "energy_amount": energy_amount,
-            "period": period,
-        }
-        return self.make_request("GET", url, data)
+        return self.make_request(*core.estimate_order(energy_amount, period))
     
     def get_api_usage_summary(self):
         """
@@ -256,8 +420,4 @@ class TronEnergy(object):
         Returns:
             dict: A dictionary containing the API usage summary.
         """
-        url = "/api/v1/frontend/userapi/summary"
-        return self.make_request("GET", url)
-        
-
- 
\ No newline at end of file
+        return self.make_request(*core.api_usage_summary())
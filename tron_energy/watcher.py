@@ -0,0 +1,155 @@
+import asyncio
+from collections import deque
+
+
+def diff_fields(old:dict, new:dict):
+    """
+    Returns:
+        dict: `{field: (old_value, new_value)}` for every top-level field that changed, appeared or disappeared.
+    """
+    changes = {field: (old.get(field), value) for field, value in new.items()
+               if field not in old or old[field] != value}
+    for field in old.keys() - new.keys():
+        changes[field] = (old[field], None)
+    return changes
+
+
+class _Subscriber:
+
+    def __init__(self, fields, buffer:int):
+        self.fields = fields
+        self.buffer = buffer
+        self.pending = deque()
+        self.ready = asyncio.Event()
+        self.merged = 0
+
+    def push(self, changes:dict):
+        if self.fields is not None:
+            changes = {field: change for field, change in changes.items() if field in self.fields}
+            if not changes:
+                return
+        if len(self.pending) >= self.buffer:
+            # A slow reader gets the two oldest diffs folded into one, so no change is lost and the
+            # buffer never grows past `buffer` entries.
+            self.merged += 1
+            oldest = self.pending.popleft()
+            newer = self.pending[0] if self.pending else changes
+            for field, (before, after) in oldest.items():
+                newer[field] = (before, newer[field][1]) if field in newer else (before, after)
+                if newer[field][0] == newer[field][1]:
+                    del newer[field]
+            if not newer:
+                if newer is changes:
+                    return
+                self.pending.popleft()
+        self.pending.append(changes)
+        self.ready.set()
+
+
+class PublicDataWatcher:
+    """
+    Polls one coroutine function on a fixed interval and pushes the changed fields to every subscriber.
+
+    However many coroutines subscribe, there is a single poller, so the upstream sees one request per
+    `interval`. The poller starts with the first subscriber and stops when the last one leaves. Every
+    subscriber has its own buffer of at most `buffer` diffs; when a slow subscriber falls behind, its
+    oldest diffs are merged instead of blocking the poller or the other subscribers.
+    """
+
+    def __init__(self, fetch, interval:float=3.0, buffer:int=16):
+        """
+        Parameters:
+            fetch (coroutine function): Returns the current data as a dict, e.g. `client.get_public_data`.
+            interval (float, optional): Seconds between two polls. Defaults to 3.
+            buffer (int, optional): Most diffs held for one subscriber. Defaults to 16.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if buffer < 1:
+            raise ValueError("buffer must be at least 1")
+        self.fetch = fetch
+        self.interval = interval
+        self.buffer = buffer
+        self.polls = 0
+        self.errors = 0
+        self._latest = None
+        self._subscribers = set()
+        self._task = None
+        self._closed = False
+
+    async def subscribe(self, fields=None, buffer:int=None):
+        """
+        Yields the changes of the polled data until the subscriber stops iterating or the watcher is closed.
+
+        The first diff holds the current value of every field, with `None` as the old value.
+
+        Parameters:
+            fields (iterable, optional): Only report changes of these fields. Every field if not given.
+            buffer (int, optional): Most diffs held for this subscriber. Defaults to the watcher's `buffer`.
+
+        Returns:
+            async generator: Dicts of `{field: (old_value, new_value)}`.
+        """
+        if buffer is not None and buffer < 1:
+            raise ValueError("buffer must be at least 1")
+        subscriber = _Subscriber(None if fields is None else frozenset(fields), buffer or self.buffer)
+        if self._latest is not None:
+            subscriber.push(diff_fields({}, self._latest))
+        self._subscribers.add(subscriber)
+        self._closed = False
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._poll())
+        try:
+            while True:
+                if not subscriber.pending:
+                    if self._closed:
+                        return
+                    subscriber.ready.clear()
+                    await subscriber.ready.wait()
+                    continue
+                yield subscriber.pending.popleft()
+        finally:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    async def _poll(self):
+        while True:
+            try:
+                data = await self.fetch()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A failed poll is retried on the next tick; the subscribers keep the last known state.
+                self.errors += 1
+            else:
+                self.polls += 1
+                if isinstance(data, dict):
+                    self._publish(data)
+            await asyncio.sleep(self.interval)
+
+    def _publish(self, data:dict):
+        changes = diff_fields(self._latest or {}, data)
+        self._latest = data
+        if changes:
+            for subscriber in list(self._subscribers):
+                subscriber.push(dict(changes))
+
+    def close(self):
+        """Stops the poller and ends every subscription once its buffered diffs are read."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for subscriber in self._subscribers:
+            subscriber.ready.set()
+
+    def stats(self):
+        """
+        Returns:
+            dict: The number of subscribers, polls, failed polls and merged diffs.
+        """
+        return {"subscribers": len(self._subscribers), "polls": self.polls, "errors": self.errors,
+                "merged": sum(subscriber.merged for subscriber in self._subscribers)}